@@ -1,11 +1,203 @@
 import sys
+import threading
+from collections import namedtuple
 import mss
 import mss.tools
+import mss.exception
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton,
                             QLabel, QMainWindow, QComboBox)
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor, QPen
-from PyQt5.QtCore import Qt, QPoint, QRect, pyqtSignal, QTimer, QObject
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor, QPen, QCursor
+from PyQt5.QtCore import Qt, QPoint, QRect, QRectF, pyqtSignal, QTimer, QObject
+
+from image_bridge import array_to_qimage
+
+# Selections smaller than this (logical pixels per side) cancel the capture
+MIN_SELECTION = 10
+
+# How much the frozen desktop is darkened outside the selection
+DIM_COLOR = QColor(0, 0, 0, 100)
+
+# A screen's geometry in logical and in device pixels
+ScreenArea = namedtuple("ScreenArea", "screen logical device ratio")
+
+
+class MssGrabber:
+    """
+    Long-lived mss grabber that hands out captured pixels without copying.
+    
+    mss keeps native display handles that belong to the thread that opened
+    them, so one instance is kept per thread and reused for every capture.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+    
+    def grab_array(self, x, y, width, height):
+        """Capture a region as a (height, width, 4) BGRA view of mss's buffer"""
+        monitor = {"top": y, "left": x, "width": width, "height": height}
+        sct_img = self._sct().grab(monitor)
+        return np.frombuffer(sct_img.raw, np.uint8).reshape(sct_img.height, sct_img.width, 4)
+    
+    def grab(self, x, y, width, height):
+        """Capture a region as a QImage that wraps mss's BGRA buffer directly"""
+        pixels = self.grab_array(x, y, width, height)
+        image = array_to_qimage(pixels)
+        # The QImage does not own its memory; keep the buffer alive with it
+        image.pixels = pixels
+        return image
+    
+    def desktop(self):
+        """The bounding box of all monitors in device pixels, as an mss monitor dict"""
+        return dict(self._sct().monitors[0])
+    
+    def close(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+
+_mss_grabber = None
+
+
+def get_mss_grabber():
+    """Return the grabber shared by all captures"""
+    global _mss_grabber
+    if _mss_grabber is None:
+        _mss_grabber = MssGrabber()
+    return _mss_grabber
+
+
+def screen_areas():
+    """
+    Every screen's geometry in logical and in device pixels. Qt 5 keeps a
+    screen's top-left corner in device pixels and divides only its size by
+    the device pixel ratio, so both rectangles share their origin.
+    """
+    areas = []
+    for screen in QApplication.screens():
+        logical = screen.geometry()
+        ratio = screen.devicePixelRatio()
+        device = QRect(logical.x(), logical.y(), round(logical.width() * ratio),
+                       round(logical.height() * ratio))
+        areas.append(ScreenArea(screen, logical, device, ratio))
+    return areas
+
+
+def area_at(areas, point):
+    """The screen area containing a global logical point, else the nearest one"""
+    for area in areas:
+        if area.logical.contains(point):
+            return area
+    
+    def distance(area):
+        rect = area.logical
+        dx = max(rect.left() - point.x(), 0, point.x() - rect.right())
+        dy = max(rect.top() - point.y(), 0, point.y() - rect.bottom())
+        return dx * dx + dy * dy
+    
+    return min(areas, key=distance)
+
+
+def logical_to_device(areas, rect):
+    """
+    (x, y, width, height) in device pixels for a global logical QRect. The
+    part on each screen is scaled by that screen's ratio, so a selection
+    spanning screens with different scale factors covers what was selected.
+    """
+    device = QRect()
+    for area in areas:
+        part = rect.intersected(area.logical)
+        if part.isEmpty():
+            continue
+        ratio = area.ratio
+        device = device.united(QRect(
+            area.device.x() + round((part.x() - area.logical.x()) * ratio),
+            area.device.y() + round((part.y() - area.logical.y()) * ratio),
+            round(part.width() * ratio), round(part.height() * ratio)))
+    return rect_tuple(device)
+
+
+def rect_tuple(rect):
+    return rect.x(), rect.y(), rect.width(), rect.height()
+
+
+class DesktopFrame:
+    """
+    One capture of the whole virtual desktop in device pixels, so regions
+    are cut out of it at native resolution instead of grabbing again.
+    """
+    
+    def __init__(self, image, origin):
+        self.image = image  # QImage covering every screen
+        self.origin = origin  # Device position of its top-left pixel
+    
+    @classmethod
+    def grab(cls, areas):
+        """Capture every screen, or return None if the desktop cannot be read"""
+        try:
+            # One grab of all monitors; the BGRA buffer is wrapped as is
+            grabber = get_mss_grabber()
+            desktop = grabber.desktop()
+            image = grabber.grab(desktop["left"], desktop["top"], desktop["width"],
+                                 desktop["height"])
+            return cls(image, QPoint(desktop["left"], desktop["top"]))
+        except mss.exception.ScreenShotError:
+            return cls._grab_screens(areas)
+    
+    @classmethod
+    def _grab_screens(cls, areas):
+        """Fallback: grab each screen through Qt and place it at its device position"""
+        shots = []
+        for area in areas:
+            shot = area.screen.grabWindow(0).toImage()
+            if shot.isNull():
+                return None
+            # Place by pixels, not by the logical size Qt would scale to
+            shot.setDevicePixelRatio(1)
+            shots.append((area.device.topLeft(), shot))
+        
+        bounds = QRect()
+        for area in areas:
+            bounds = bounds.united(area.device)
+        image = QImage(bounds.size(), QImage.Format_RGB32)
+        image.fill(Qt.black)
+        painter = QPainter(image)
+        for position, shot in shots:
+            painter.drawImage(position - bounds.topLeft(), shot)
+        painter.end()
+        return cls(image, bounds.topLeft())
+    
+    def crop(self, x, y, width, height):
+        """A copy of a region in device pixels; parts off the desktop are black"""
+        return self.image.copy(QRect(x - self.origin.x(), y - self.origin.y(), width, height))
+
+
+def grab_region(x, y, width, height):
+    """Capture a region given in device pixels of the virtual desktop as a QImage"""
+    try:
+        # mss reads device pixels on every monitor; the BGRA buffer is wrapped as is
+        return get_mss_grabber().grab(x, y, width, height)
+    except mss.exception.ScreenShotError:
+        pass
+    
+    # Fall back to the screen holding the region's top-left corner
+    areas = screen_areas()
+    area = next((area for area in areas if area.device.contains(x, y)), areas[0])
+    left = (x - area.device.x()) / area.ratio
+    top = (y - area.device.y()) / area.ratio
+    pixmap = area.screen.grabWindow(0, round(left), round(top), round(width / area.ratio),
+                                    round(height / area.ratio))
+    return pixmap.toImage()
+
 
 class ScreenCapture(QObject):
     screenshot_taken = pyqtSignal(object)
@@ -15,12 +207,15 @@ class ScreenCapture(QObject):
         self.screen_selector = ScreenSelector()
         self.screen_selector.region_selected.connect(self.capture_region)
     
+    def prepare(self):
+        self.screen_selector.prepare()
+    
     def start(self):
         # Start the screen selection process
-        self.screen_selector.showFullScreen()
+        self.screen_selector.start()
     
     def capture_region(self, region):
-        """Capture the selected region of the screen"""
+        """Capture the selected region (device pixels) of the screen"""
         if region is None:
             self.screenshot_taken.emit(None)
             return
@@ -33,57 +228,178 @@ class ScreenCapture(QObject):
                 self.screenshot_taken.emit(None)
                 return
                 
-            # Use native QScreen method for better quality
-            screen = QApplication.primaryScreen()
-            if screen:
-                # Capture the screenshot using QScreen for better quality
-                screenshot = screen.grabWindow(0, x, y, width, height)
-                
-                # Emit the captured screenshot
-                self.screenshot_taken.emit(screenshot)
-                return
-                
-            # Fallback to mss if QScreen fails
-            with mss.mss() as sct:
-                # Define the region to capture
-                monitor = {"top": y, "left": x, "width": width, "height": height}
-                
-                # Capture the specified region
-                sct_img = sct.grab(monitor)
-                
-                # Convert to QPixmap for Qt compatibility
-                # Use RGB format (without alpha channel)
-                img_array = np.array(sct_img)
-                height, width, _ = img_array.shape
-                bytes_per_line = 4 * width
-                
-                img = QImage(sct_img.rgb, width, height, bytes_per_line, QImage.Format_RGBA8888)
-                pixmap = QPixmap.fromImage(img)
-                
-                # Emit the captured screenshot
-                self.screenshot_taken.emit(pixmap)
+            # Emit the captured pixels as a QImage so preview and OCR
+            # can share them in memory
+            self.screenshot_taken.emit(self.screen_selector.crop(region))
                 
         except Exception as e:
             print(f"Screenshot error: {str(e)}")
             self.screenshot_taken.emit(None)
 
 
-class ScreenSelector(QWidget):
+class ScreenSelector(QObject):
+    """
+    Lets the user drag a rectangle anywhere on the desktop, across screens.
+    
+    start() captures the whole desktop once and covers every screen with an
+    overlay that paints that frozen frame, so repaints while dragging never
+    capture again and the selected pixels are exactly what was shown. If
+    the desktop cannot be captured, the overlays are translucent and the
+    region is grabbed live after they close. region_selected is emitted
+    with (x, y, width, height) in device pixels, or None when cancelled.
+    """
     region_selected = pyqtSignal(object)
     
-    def __init__(self):
+    def __init__(self, freeze=True, parent=None):
+        super().__init__(parent)
+        self.freeze = freeze
+        self.areas = []
+        self.frame = None  # DesktopFrame for the current session
+        self.frozen = False  # Whether the overlays were made to paint a frame
+        self.overlays = []
+        self.begin = None  # Global logical points of the drag
+        self.end = None
+    
+    def start(self):
+        """Capture the desktop and cover every screen with a selection overlay"""
+        self.end_session()
+        areas = screen_areas()
+        self.frame = DesktopFrame.grab(areas) if self.freeze else None
+        frozen = self.frame is not None
+        self.make_overlays(areas, frozen)
+        for overlay in self.overlays:
+            if frozen:
+                overlay.background = QPixmap.fromImage(
+                    self.frame.crop(*rect_tuple(overlay.area.device)))
+            overlay.showFullScreen()
+        
+        # Keyboard input (Esc) goes to the screen under the pointer
+        pointer = area_at(self.areas, QCursor.pos())
+        for overlay in self.overlays:
+            if overlay.area is pointer:
+                overlay.raise_()
+                overlay.activateWindow()
+    
+    def prepare(self):
+        """Create the overlays and open the capture backend ahead of the first start()"""
+        self.make_overlays(screen_areas(), self.freeze)
+        for overlay in self.overlays:
+            overlay.winId()  # Creates the native window now instead of on first show
+        try:
+            get_mss_grabber().desktop()  # Connects to the display server for this thread
+        except mss.exception.ScreenShotError:
+            pass
+    
+    def make_overlays(self, areas, frozen):
+        """Overlays for these screens; kept between sessions until the screens change"""
+        if (areas, frozen) == (self.areas, self.frozen):
+            return
+        self.close_overlays()
+        self.overlays = [SelectionOverlay(self, area, frozen) for area in areas]
+        self.areas = areas
+        self.frozen = frozen
+    
+    def selection_rect(self):
+        """The selection in global logical coordinates, or an empty QRect"""
+        if self.begin is None:
+            return QRect()
+        return QRect(self.begin, self.end).normalized()
+    
+    def device_region(self):
+        return logical_to_device(self.areas, self.selection_rect())
+    
+    def begin_selection(self, point):
+        self.begin = self.end = point
+        self.repaint_selection(QRect())
+    
+    def update_selection(self, point):
+        if self.begin is None:
+            return
+        previous = self.selection_rect()
+        self.end = point
+        self.repaint_selection(previous)
+    
+    def repaint_selection(self, previous):
+        """Repaint only what the old and new selection and their labels cover"""
+        current = self.selection_rect()
+        dirty = previous.united(label_rect(previous)).united(current).united(label_rect(current))
+        for overlay in self.overlays:
+            local = dirty.translated(-overlay.area.logical.topLeft()).adjusted(-2, -2, 2, 2)
+            overlay.update(local.intersected(overlay.rect()))
+    
+    def finish_selection(self, point):
+        if self.begin is None:
+            return
+        self.end = point
+        rect = self.selection_rect()
+        self.hide_overlays()
+        if rect.width() < MIN_SELECTION or rect.height() < MIN_SELECTION:
+            # Selection too small, cancel
+            self.region_selected.emit(None)
+        else:
+            if self.frame is None:
+                # The region is grabbed live; let the overlays disappear first
+                QApplication.processEvents()
+            self.region_selected.emit(logical_to_device(self.areas, rect))
+        self.end_session()
+    
+    def cancel(self):
+        self.hide_overlays()
+        self.region_selected.emit(None)
+        self.end_session()
+    
+    def crop(self, region):
+        """The pixels of a selected region: cut from the frozen frame, or grabbed now"""
+        if self.frame is not None:
+            return self.frame.crop(*region)
+        return grab_region(*region)
+    
+    def hide_overlays(self):
+        for overlay in self.overlays:
+            overlay.hide()
+    
+    def end_session(self):
+        """Hide the overlays and release the desktop frame and its pixmaps"""
+        for overlay in self.overlays:
+            overlay.hide()
+            overlay.background = None
+        self.frame = None
+        self.begin = self.end = None
+    
+    def close_overlays(self):
+        for overlay in self.overlays:
+            overlay.close()
+            overlay.deleteLater()
+        self.overlays = []
+
+
+def label_rect(selection):
+    """Where the size label of a selection is drawn, in the same coordinates"""
+    if selection.isEmpty():
+        return QRect()
+    text_y = selection.top() - 20
+    if text_y < 10:
+        text_y = selection.bottom() + 20
+    return QRect(selection.left(), text_y, 100, 20)
+
+
+class SelectionOverlay(QWidget):
+    """Covers one screen during a selection and draws the selection on it"""
+    
+    def __init__(self, selector, area, frozen):
         super().__init__()
+        self.selector = selector
+        self.area = area
+        self.background = None  # This screen from the frozen frame, in device pixels
         
-        # Make fullscreen widget with translucent background
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setStyleSheet("background-color: rgba(0, 0, 0, 30);")
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        if not frozen:
+            self.setAttribute(Qt.WA_TranslucentBackground)
+        else:
+            # Every pixel is painted from the frame; nothing to clear first
+            self.setAttribute(Qt.WA_OpaquePaintEvent)
         self.setCursor(Qt.CrossCursor)
-        
-        # Initialize selection variables
-        self.begin = QPoint()
-        self.end = QPoint()
-        self.is_selecting = False
+        self.setGeometry(area.logical)
         
         # Add text instructions
         self.help_label = QLabel("Click and drag to select an area. Press Esc to cancel.", self)
@@ -94,79 +410,53 @@ class ScreenSelector(QWidget):
     
     def paintEvent(self, event):
         painter = QPainter(self)
+        area = event.rect()
+        selected_rect = self.selector.selection_rect().translated(-self.area.logical.topLeft())
         
-        # Main background
-        painter.fillRect(self.rect(), QColor(0, 0, 0, 30))
+        if self.background is not None:
+            # Frozen desktop, darkened except inside the selection
+            self.draw_background(painter, area)
+            painter.fillRect(area, DIM_COLOR)
+            if not selected_rect.isEmpty():
+                self.draw_background(painter, area.intersected(selected_rect))
+        else:
+            painter.fillRect(area, QColor(0, 0, 0, 30))
+            if not selected_rect.isEmpty():
+                # Clear the area inside the selection
+                painter.setCompositionMode(QPainter.CompositionMode_Clear)
+                painter.fillRect(selected_rect, Qt.transparent)
+                painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
         
-        # If we're selecting, draw the selection rectangle
-        if self.is_selecting:
-            # Get the selection rectangle
-            selected_rect = QRect(self.begin, self.end)
-            
-            # Clear the area inside the selection
-            painter.setCompositionMode(QPainter.CompositionMode_Clear)
-            painter.fillRect(selected_rect, Qt.transparent)
-            
-            # Reset composition and draw border
-            painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-            painter.setPen(QPen(QColor(255, 255, 255), 2))
-            painter.drawRect(selected_rect)
-            
-            # Draw dimensions text
-            width = abs(self.end.x() - self.begin.x())
-            height = abs(self.end.y() - self.begin.y())
-            dim_text = f"{width} x {height}"
-            
-            # Position the text near the selection
-            text_x = min(self.begin.x(), self.end.x())
-            text_y = min(self.begin.y(), self.end.y()) - 20
-            if text_y < 10:
-                text_y = min(self.begin.y(), self.end.y()) + height + 20
-                
-            # Draw the text with background
-            text_rect = QRect(text_x, text_y, 100, 20)
-            painter.fillRect(text_rect, QColor(0, 0, 0, 150))
-            painter.setPen(QColor(255, 255, 255))
-            painter.drawText(text_rect, Qt.AlignCenter, dim_text)
+        if selected_rect.isEmpty():
+            return
+        painter.setPen(QPen(QColor(255, 255, 255), 2))
+        painter.drawRect(selected_rect)
+        
+        # Size in device pixels, i.e. what will be captured
+        _, _, width, height = self.selector.device_region()
+        text_rect = label_rect(selected_rect)
+        painter.fillRect(text_rect, QColor(0, 0, 0, 150))
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(text_rect, Qt.AlignCenter, f"{width} x {height}")
+    
+    def draw_background(self, painter, rect):
+        """Paint part of the frame 1:1 onto the screen's device pixels"""
+        ratio = self.area.ratio
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio,
+                        rect.height() * ratio)
+        painter.drawPixmap(QRectF(rect), self.background, source)
     
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self.begin = event.pos()
-            self.end = event.pos()
-            self.is_selecting = True
-            self.update()
+            self.selector.begin_selection(event.globalPos())
     
     def mouseMoveEvent(self, event):
-        if self.is_selecting:
-            self.end = event.pos()
-            self.update()
+        self.selector.update_selection(event.globalPos())
     
     def mouseReleaseEvent(self, event):
-        if event.button() == Qt.LeftButton and self.is_selecting:
-            self.end = event.pos()
-            self.is_selecting = False
-            
-            # Calculate selection coordinates
-            x1 = min(self.begin.x(), self.end.x())
-            y1 = min(self.begin.y(), self.end.y())
-            width = abs(self.end.x() - self.begin.x())
-            height = abs(self.end.y() - self.begin.y())
-            
-            # Validate selection size
-            if width >= 10 and height >= 10:
-                # Hide this window before capturing to avoid it being in the screenshot
-                self.hide()
-                QApplication.processEvents()
-                
-                # Emit the selected region
-                self.region_selected.emit((x1, y1, width, height))
-                self.close()
-            else:
-                # Selection too small, cancel
-                self.region_selected.emit(None)
-                self.close()
+        if event.button() == Qt.LeftButton:
+            self.selector.finish_selection(event.globalPos())
     
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
-            self.region_selected.emit(None)
-            self.close()
\ No newline at end of file
+            self.selector.cancel()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+"""
+Headless batch OCR.
+Runs the same preprocessing and Tesseract config as the GUI over
+directories, globs or single files, spread across a process pool.
+Results are streamed as each file finishes. This module never imports PyQt5.
+
+Usage: python batch_ocr.py scans/ "shots/*.png" --jsonl results.jsonl
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import ocr_core
+import preprocessing
+import tiling
+import prepass
+import documents
+from ocr_cache import OCRCache
+from structured import OCRResult
+
+# Per-process cache, opened lazily in each worker
+_cache = None
+
+
+def find_images(inputs, recursive=False):
+    """Yield image files from directories, glob patterns and file paths"""
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = sorted(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(item):
+            candidates = sorted(glob.glob(item, recursive=recursive))
+        else:
+            candidates = [item]
+
+        for path in candidates:
+            if path in seen or not os.path.isfile(path):
+                continue
+            extension = os.path.splitext(path)[1].lower()
+            if extension in ocr_core.IMAGE_EXTENSIONS or extension in documents.DOCUMENT_EXTENSIONS:
+                seen.add(path)
+                yield path
+
+
+def worker_cache(cache_db):
+    """Return this worker process's cache, or None when caching is off"""
+    global _cache
+    if cache_db and _cache is None:
+        _cache = OCRCache(db_path=cache_db)
+    return _cache
+
+
+def check_image(image, decisions):
+    """Run the pre-pass on an image; returns it upright, or None when OCR can be skipped"""
+    decision = prepass.classify(image)
+    decisions.append(str(decision))
+    return None if decision.skip else prepass.apply(image, decision)
+
+
+def ocr_file(path, config, lang, engine, cache_db=None, steps=None, tile=False, structured=False,
+             use_prepass=False):
+    """OCR one file in a worker process and return a JSON-friendly result"""
+    start = time.perf_counter()
+    result = {"path": path, "text": None, "error": None}
+    decisions = []
+    if use_prepass:
+        result["prepass"] = decisions  # One decision per image or page
+    try:
+        if documents.is_document(path):
+            # Pages are decoded one at a time; this worker process is the parallelism
+            texts = []
+            words = []
+            for _, page in documents.iter_pages(path):
+                if use_prepass:
+                    upright = check_image(page, decisions)
+                    if upright is None:
+                        texts.append("")
+                        if structured:
+                            words.append(OCRResult.from_tsv("", page.size).to_dict())
+                        continue
+                    page = upright
+                geometry = preprocessing.Geometry()
+                processed = ocr_core.preprocess_image(page, steps=steps, geometry=geometry)
+                if structured:
+                    page_result = ocr_core.recognize_structured(processed, config=config,
+                                                                lang=lang, engine=engine,
+                                                                cache=worker_cache(cache_db),
+                                                                source=page, geometry=geometry)
+                    words.append(page_result.to_dict())
+                    texts.append(page_result.text())
+                else:
+                    texts.append(ocr_core.recognize(processed, config=config, lang=lang,
+                                                    engine=engine, cache=worker_cache(cache_db)))
+            result["pages"] = len(texts)
+            result["text"] = "\f".join(texts)
+            if structured:
+                result["words"] = words
+        else:
+            image = ocr_core.load_image(path)
+            upright = check_image(image, decisions) if use_prepass else image
+            if upright is None:
+                result["text"] = ""
+                if structured:
+                    result["words"] = OCRResult.from_tsv("", image.size).to_dict()
+            else:
+                geometry = preprocessing.Geometry()
+                image = ocr_core.preprocess_image(upright, steps=steps, geometry=geometry)
+                if structured:
+                    ocr_result = ocr_core.recognize_structured(image, config=config, lang=lang,
+                                                               engine=engine,
+                                                               cache=worker_cache(cache_db),
+                                                               source=upright, geometry=geometry)
+                    result["text"] = ocr_result.text()
+                    result["words"] = ocr_result.to_dict()
+                elif tile and tiling.should_tile(image):
+                    result["text"] = tiling.recognize_tiled(image, config=config, lang=lang,
+                                                            engine=engine,
+                                                            cache=worker_cache(cache_db))
+                else:
+                    result["text"] = ocr_core.recognize(image, config=config, lang=lang,
+                                                        engine=engine,
+                                                        cache=worker_cache(cache_db))
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def iter_results(paths, config=ocr_core.TESSERACT_CONFIG, lang=None, engine=None, workers=None,
+                 cache_db=None, steps=None, tile=False, structured=False, use_prepass=False):
+    """
+    OCR paths across a process pool, yielding results in completion order.
+    Only a bounded number of files is in flight, so huge directories are
+    never queued all at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    paths = iter(paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(ocr_file, path, config, lang, engine, cache_db, steps, tile,
+                                        structured, use_prepass))
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                path = next(paths, None)
+                if path is not None:
+                    pending.add(executor.submit(ocr_file, path, config, lang, engine, cache_db, steps,
+                                                tile, structured, use_prepass))
+
+
+def write_result(result, stream, as_json):
+    if as_json:
+        stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+    elif result["error"]:
+        stream.write(f"==> {result['path']} <==\nERROR: {result['error']}\n\n")
+    else:
+        stream.write(f"==> {result['path']} <==\n{result['text'].rstrip()}\n\n")
+    stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract text from many images without the GUI")
+    parser.add_argument("inputs", nargs="+", help="image files, directories or glob patterns")
+    parser.add_argument("-r", "--recursive", action="store_true", help="descend into subdirectories")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--jsonl", metavar="FILE",
+                        help="write one JSON object per file to FILE ('-' for stdout)")
+    parser.add_argument("--config", default=ocr_core.TESSERACT_CONFIG,
+                        help="tesseract config string; '--psm auto' picks single line or "
+                             "block mode per image")
+    parser.add_argument("--lang", default=None, help="tesseract language(s), e.g. eng+deu")
+    parser.add_argument("--engine", default=None, help="OCR engine name (subprocess, tesserocr)")
+    parser.add_argument("--cache-db", metavar="FILE", default=None,
+                        help="reuse results from an OCR cache database (e.g. the GUI's cache)")
+    parser.add_argument("--preprocess", default=",".join(preprocessing.DEFAULT_STEPS),
+                        help="comma-separated preprocessing steps "
+                             f"(available: {', '.join(preprocessing.STEPS)})")
+    parser.add_argument("--tile", action="store_true",
+                        help="split very large images into bands OCRed in parallel "
+                             "(best with few, large files)")
+    parser.add_argument("--structured", action="store_true",
+                        help="include word boxes and confidences in JSONL output")
+    parser.add_argument("--prepass", action="store_true",
+                        help="skip blank images and pages and turn rotated ones upright before "
+                             "OCR; the decisions are included in JSONL output")
+    args = parser.parse_args(argv)
+    steps = [name for name in args.preprocess.split(",") if name]
+    unknown = [name for name in steps if name not in preprocessing.STEPS]
+    if unknown:
+        parser.error(f"unknown preprocessing step(s): {', '.join(unknown)}")
+
+    paths = find_images(args.inputs, recursive=args.recursive)
+    as_json = args.jsonl is not None
+    if as_json and args.jsonl != "-":
+        stream = open(args.jsonl, "w", encoding="utf-8")
+    else:
+        stream = sys.stdout
+
+    failures = 0
+    try:
+        for result in iter_results(paths, config=args.config, lang=args.lang,
+                                   engine=args.engine, workers=args.workers,
+                                   cache_db=args.cache_db, steps=steps, tile=args.tile,
+                                   structured=args.structured, use_prepass=args.prepass):
+            if result["error"]:
+                failures += 1
+            write_result(result, stream, as_json)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Measure screen capture latency.
+Times the QScreen path, the shared zero-copy mss grabber, the previous
+per-capture mss path and a whole-desktop frame grab plus crop (what a
+ScreenSelector session does), for a full-screen grab and a small region.
+Needs a real display.
+
+Usage: python benchmarks/bench_capture.py [--runs 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mss
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage
+
+from alt_screenshot import MssGrabber, DesktopFrame, screen_areas
+
+
+def qscreen_capture(screen, x, y, width, height):
+    return screen.grabWindow(0, x, y, width, height).toImage()
+
+
+def legacy_mss_capture(x, y, width, height):
+    """The old fallback: a new mss context and an array copy per capture"""
+    with mss.mss() as sct:
+        sct_img = sct.grab({"top": y, "left": x, "width": width, "height": height})
+        img_array = np.array(sct_img)
+        h, w, _ = img_array.shape
+        return QImage(sct_img.rgb, w, h, 4 * w, QImage.Format_RGBA8888).copy()
+
+
+def time_calls(func, runs):
+    func()  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark screen capture backends")
+    parser.add_argument("--runs", type=int, default=50, help="timed captures per case")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    screen = app.primaryScreen()
+    geometry = screen.geometry()
+    grabber = MssGrabber()
+    areas = screen_areas()
+
+    regions = {
+        "full screen": (geometry.x(), geometry.y(), geometry.width(), geometry.height()),
+        "small region": (geometry.x() + 100, geometry.y() + 100, 320, 40),
+    }
+    backends = {
+        "qscreen": lambda region: qscreen_capture(screen, *region),
+        "mss shared": lambda region: grabber.grab(*region),
+        "mss per call": lambda region: legacy_mss_capture(*region),
+        "desktop frame": lambda region: DesktopFrame.grab(areas).crop(*region),
+    }
+
+    print(f"{'region':<14} {'backend':<14} {'median ms':>10} {'p95 ms':>9}")
+    for label, region in regions.items():
+        for name, backend in backends.items():
+            try:
+                median, p95 = time_calls(lambda: backend(region), args.runs)
+            except Exception as e:
+                print(f"{label:<14} {name:<14} failed: {e}")
+                continue
+            print(f"{label:<14} {name:<14} {median:>10.2f} {p95:>9.2f}")
+
+    grabber.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Compare OCR engine latency.
+Renders synthetic text images of several sizes and times every available
+engine on them, e.g. the per-call tesseract subprocess against the warm
+tesserocr pool.
+
+Usage: python benchmarks/bench_engines.py [--runs 20] [--engines subprocess tesserocr]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+import ocr_core
+import ocr_engines
+
+SIZES = {
+    "small region": (320, 40, 1),
+    "paragraph": (800, 240, 6),
+    "page": (1600, 1200, 30),
+}
+
+
+def render_text_image(width, height, lines):
+    """Render black-on-white lines of text, similar to a screenshot region"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("arial.ttf", 24)
+    except IOError:
+        font = ImageFont.load_default().font_variant(size=24)
+
+    line_height = max(height // max(lines, 1), 1)
+    for i in range(lines):
+        draw.text((10, i * line_height + 4), f"The quick brown fox {i} jumps over the lazy dog",
+                  fill="black", font=font)
+    return image
+
+
+def bench(engine_name, image, runs):
+    engine = ocr_engines.get_engine(engine_name)
+    # Warm-up call; for pooled engines this creates the instance
+    engine.recognize(image, ocr_core.TESSERACT_CONFIG)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.recognize(image, ocr_core.TESSERACT_CONFIG)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR engines")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per image size")
+    parser.add_argument("--engines", nargs="+", default=ocr_engines.available_engines(),
+                        help="engines to compare")
+    args = parser.parse_args()
+
+    missing = [name for name in args.engines if name not in ocr_engines.available_engines()]
+    if missing:
+        print(f"Skipping unavailable engines: {', '.join(missing)}")
+    engines = [name for name in args.engines if name not in missing]
+
+    print(f"{'image':<14} {'engine':<12} {'mean ms':>9} {'median ms':>10} {'p95 ms':>9}")
+    for label, (width, height, lines) in SIZES.items():
+        image = ocr_core.preprocess_image(render_text_image(width, height, lines))
+        baseline = None
+        for name in engines:
+            result = bench(name, image, args.runs)
+            speedup = ""
+            if baseline is None:
+                baseline = result["median"]
+            else:
+                speedup = f"  ({baseline / result['median']:.1f}x vs {engines[0]})"
+            print(f"{label:<14} {name:<12} {result['mean']:>9.1f} {result['median']:>10.1f} "
+                  f"{result['p95']:>9.1f}{speedup}")
+
+    ocr_engines.close_engines()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""
+Load test for the local OCR server.
+Starts the server in-process on a free localhost port (or uses --url),
+sends rendered text images from many concurrent clients, and prints the
+client-side latency next to the server's /metrics. Some requests repeat
+the same image, so batch deduplication and the cache show up as well.
+
+Usage: python benchmarks/bench_server.py [--requests 200] [--clients 16] [--url http://127.0.0.1:8765]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_server
+from bench_engines import render_text_image
+
+
+def encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def post_image(host, port, body):
+    """Send one image and return (HTTP status, seconds)"""
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        connection.request("POST", "/ocr", body=body, headers={"Content-Type": "image/png"})
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - start
+    finally:
+        connection.close()
+
+
+def get_metrics(host, port):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        connection.request("GET", "/metrics")
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local OCR server")
+    parser.add_argument("--requests", type=int, default=200, help="total requests to send")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client connections")
+    parser.add_argument("--distinct", type=int, default=20, help="number of different images")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=None, help="server workers when started here")
+    parser.add_argument("--max-queue", type=int, default=64, help="server queue limit when started here")
+    args = parser.parse_args()
+
+    server = service = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        service = ocr_server.OCRService(workers=args.workers, max_queue=args.max_queue)
+        server = ocr_server.make_server(service, port=0, quiet=True)
+        service.start()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+    # Different widths make the images distinct
+    images = [encode_png(render_text_image(600 + 8 * i, 120, 3)) for i in range(args.distinct)]
+    bodies = [images[i % len(images)] for i in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        results = list(executor.map(lambda body: post_image(host, port, body), bodies))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+
+    print(f"{args.requests} requests from {args.clients} clients in {elapsed:.2f} s "
+          f"({args.requests / elapsed:.1f} req/s)")
+    print(f"status codes: {statuses}")
+    if latencies:
+        print(f"client latency: p50 {ocr_server.percentile(latencies, 50)} ms, "
+              f"p99 {ocr_server.percentile(latencies, 99)} ms")
+    print("server metrics:")
+    print(json.dumps(get_metrics(host, port), indent=2))
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark suite and regression check for the OCR pipeline.
+Generates a synthetic corpus (see corpus.py) and measures each stage:
+decoding, every preprocessing step, OCR, and with PyQt5 the GUI paths
+behind extract_text, display_image and ScreenCapture.capture_region.
+For every stage it records latency percentiles, throughput and peak
+Python/NumPy memory, plus character accuracy for stages that produce text.
+
+Results can be saved as a JSON baseline. When --baseline is given, the run
+is compared against it and the script exits with status 1 if any stage is
+slower, uses more memory or is less accurate than the thresholds allow.
+Baselines are only comparable on the same machine.
+
+Usage: python benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+       python benchmarks/bench_suite.py --baseline benchmarks/baseline.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_core
+import ocr_engines
+import preprocessing
+from corpus import SIZES, NOISE_LEVELS, generate_corpus, save_corpus, character_accuracy
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    rank = max(-(-len(sorted_values) * percent // 100), 1)
+    return sorted_values[int(rank) - 1]
+
+
+class StageSkipped(Exception):
+    pass
+
+
+class Suite:
+    """Runs stages over the corpus and collects their measurements"""
+
+    def __init__(self, cases, runs, engine=None):
+        self.cases = cases
+        self.runs = runs
+        self.engine = engine
+        self.stages = {}
+        self.step_timings = {}  # preprocessing step -> list of ms
+
+    def measure(self, name, func, inputs, texts=None):
+        """
+        Time func(input) runs times for every input, then run it once more
+        under tracemalloc for the peak memory. When texts holds the expected
+        text per input, func's output is scored for character accuracy.
+        """
+        try:
+            outputs = [func(item) for item in inputs]  # Warm-up, and the outputs for scoring
+        except StageSkipped as e:
+            self.stages[name] = {"skipped": str(e)}
+            return None
+        except Exception as e:
+            self.stages[name] = {"skipped": f"{type(e).__name__}: {e}"}
+            return None
+
+        latencies = []
+        total = 0.0
+        for _ in range(self.runs):
+            for item in inputs:
+                start = time.perf_counter()
+                func(item)
+                elapsed = time.perf_counter() - start
+                latencies.append(elapsed * 1000)
+                total += elapsed
+        latencies.sort()
+
+        tracemalloc.start()
+        try:
+            for item in inputs:
+                func(item)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        pixels = sum(case.image.width * case.image.height for case in self.cases)
+        stage = {
+            "images": len(latencies),
+            "mean_ms": round(total * 1000 / len(latencies), 3),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "throughput_per_s": round(len(latencies) / total, 2) if total else None,
+            "megapixels_per_s": round(pixels * self.runs / total / 1e6, 2) if total else None,
+            "peak_mb": round(peak / (1024 * 1024), 2),
+        }
+        if texts is not None:
+            scores = [character_accuracy(expected, actual) for expected, actual in zip(texts, outputs)]
+            stage["accuracy"] = round(sum(scores) / len(scores), 4)
+            by_noise = {}
+            for case, score in zip(self.cases, scores):
+                by_noise.setdefault(case.noise, []).append(score)
+            stage["accuracy_by_noise"] = {noise: round(sum(values) / len(values), 4)
+                                          for noise, values in by_noise.items()}
+        self.stages[name] = stage
+        return outputs
+
+    def preprocess(self, image):
+        timings = {}
+        result = ocr_core.preprocess_image(image, timings=timings)
+        for step, ms in timings.items():
+            self.step_timings.setdefault(step, []).append(ms)
+        return result
+
+    def run_core(self):
+        """Stages that need no GUI: decode, preprocess and OCR"""
+        encoded = []
+        for case in self.cases:
+            buffer = io.BytesIO()
+            case.image.save(buffer, format="PNG")
+            encoded.append(buffer.getvalue())
+        texts = [case.text for case in self.cases]
+
+        def decode(data):
+            image = ocr_core.load_image(io.BytesIO(data))
+            image.load()
+            return image
+
+        images = self.measure("decode", decode, encoded)
+        if images is None:
+            return
+
+        self.step_timings.clear()
+        preprocessed = self.measure("preprocess", self.preprocess, images)
+        for step, values in self.step_timings.items():
+            values.sort()
+            self.stages[f"preprocess.{step}"] = {
+                "images": len(values),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+            }
+
+        # Grayscale only, to show what the rest of the preprocessing buys in accuracy
+        raw = [ocr_core.preprocess_image(image, steps=["grayscale"]) for image in images]
+        self.measure("ocr_unprocessed",
+                     lambda image: ocr_core.recognize(image, engine=self.engine), raw, texts)
+        if preprocessed is not None:
+            self.measure("ocr", lambda image: ocr_core.recognize(image, engine=self.engine),
+                         preprocessed, texts)
+
+    def run_gui(self, corpus_dir):
+        """GUI paths: extract_text's background job, display_image and capture_region"""
+        if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        try:
+            from PyQt5.QtWidgets import QApplication
+            from PyQt5.QtCore import QEventLoop, QTimer
+        except ImportError as e:
+            for name in ("extract_text", "display_image", "capture_region"):
+                self.stages[name] = {"skipped": f"PyQt5 is not available: {e}"}
+            return
+
+        from ocr_jobs import OCRJobEngine
+        from ocr_app import OCRApp
+        from alt_screenshot import ScreenCapture
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        paths = save_corpus(self.cases, corpus_dir)
+        texts = [case.text for case in self.cases]
+
+        jobs = OCRJobEngine()
+        outcome = {}
+        loop = QEventLoop()
+
+        def finished(job_id, text):
+            outcome[job_id] = (text, None)
+            loop.quit()
+
+        def failed(job_id, message):
+            outcome[job_id] = (None, message)
+            loop.quit()
+
+        jobs.job_finished.connect(finished)
+        jobs.job_failed.connect(failed)
+
+        def extract_text(path):
+            # The same background job the Extract Text button submits
+            job_id = jobs.submit(path, engine=self.engine)
+            while job_id not in outcome:
+                loop.exec_()
+            text, error = outcome.pop(job_id)
+            if error is not None:
+                raise StageSkipped(error)
+            return text
+
+        self.measure("extract_text", extract_text, paths, texts)
+        jobs.shutdown()
+
+        window = OCRApp()
+        window.resize(800, 600)
+        window.show()
+        app.processEvents()
+
+        def display_image(path):
+            # Time a cold preview: decoding in the background until it is shown
+            window.preview_loader.cache.clear()
+            window.display_image(path)
+            while window.preview_request is not None:
+                app.processEvents(QEventLoop.WaitForMoreEvents)
+
+        self.measure("display_image", display_image, paths)
+
+        screen = app.primaryScreen().geometry()
+        capture = ScreenCapture()
+        captured = []
+        capture.screenshot_taken.connect(captured.append)
+        regions = [(screen.x(), screen.y(), min(case.image.width, screen.width()),
+                    min(case.image.height, screen.height())) for case in self.cases]
+
+        def capture_region(region):
+            captured.clear()
+            capture.capture_region(region)
+            if not captured or captured[0] is None or captured[0].isNull():
+                raise StageSkipped("Screen capture returned no image")
+            return captured[0]
+
+        self.measure("capture_region", capture_region, regions)
+
+        window.close()
+        QTimer.singleShot(0, app.quit)
+        app.exec_()
+
+
+def compare(current, baseline, max_slowdown, max_memory_growth, max_accuracy_drop):
+    """Return a list of regression messages, printing a comparison table"""
+    regressions = []
+    print(f"\n{'stage':<28} {'p50 ms':>18} {'peak MB':>16} {'accuracy':>18}")
+    old_stages = baseline.get("stages", {})
+    # Stages that only the baseline has are included: a stage that stops running is a regression
+    names = list(current["stages"]) + [name for name in old_stages if name not in current["stages"]]
+    for name in names:
+        stage, old = current["stages"].get(name), old_stages.get(name)
+        if old is None or "skipped" in old:
+            continue
+        if stage is None or "skipped" in stage:
+            reason = "missing" if stage is None else f"skipped: {stage['skipped']}"
+            regressions.append(f"{name} ran in the baseline but is {reason}")
+            print(f"{name:<28} {reason}")
+            continue
+
+        columns = []
+        for key, limit, lower_is_better in (("p50_ms", max_slowdown, True),
+                                            ("peak_mb", max_memory_growth, True),
+                                            ("accuracy", max_accuracy_drop, False)):
+            if stage.get(key) is None or old.get(key) is None:
+                columns.append("")
+                continue
+            new_value, old_value = stage[key], old[key]
+            if lower_is_better:
+                # Relative limit, with a little slack for tiny absolute values
+                regressed = new_value > old_value * (1 + limit) + 0.05
+            else:
+                regressed = new_value < old_value - limit
+            if regressed:
+                regressions.append(f"{name} {key}: {old_value} -> {new_value}")
+            columns.append(f"{old_value}->{new_value}{' !' if regressed else ''}")
+        print(f"{name:<28} {columns[0]:>18} {columns[1]:>16} {columns[2]:>18}")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'stage':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'img/s':>8} {'MP/s':>7} "
+          f"{'peak MB':>8} {'accuracy':>9}")
+    for name, stage in results["stages"].items():
+        if "skipped" in stage:
+            print(f"{name:<28} skipped: {stage['skipped']}")
+            continue
+
+        def cell(key, width):
+            value = stage.get(key)
+            return f"{'' if value is None else value:>{width}}"
+
+        print(f"{name:<28} {cell('p50_ms', 9)} {cell('p95_ms', 9)} {cell('p99_ms', 9)} "
+              f"{cell('throughput_per_s', 8)} {cell('megapixels_per_s', 7)} {cell('peak_mb', 8)} "
+              f"{cell('accuracy', 9)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OCR pipeline and check for regressions")
+    parser.add_argument("--runs", type=int, default=3, help="timed passes over the corpus per stage")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), help="image sizes to include")
+    parser.add_argument("--noise", nargs="+", choices=list(NOISE_LEVELS), help="noise levels to include")
+    parser.add_argument("--engine", choices=ocr_engines.available_engines(), help="OCR engine")
+    parser.add_argument("--no-gui", action="store_true", help="skip the PyQt5 stages")
+    parser.add_argument("--corpus-dir", help="keep the generated corpus images in this folder")
+    parser.add_argument("--output", help="write this run's results as JSON")
+    parser.add_argument("--save-baseline", help="write this run's results as the new baseline")
+    parser.add_argument("--baseline", help="compare against this baseline and fail on regressions")
+    parser.add_argument("--max-slowdown", type=float, default=0.25,
+                        help="allowed relative increase in p50 latency (default 0.25)")
+    parser.add_argument("--max-memory-growth", type=float, default=0.25,
+                        help="allowed relative increase in peak memory (default 0.25)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="allowed absolute drop in character accuracy (default 0.01)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cases = generate_corpus(seed=args.seed, sizes=args.sizes, noise_levels=args.noise)
+    print(f"Generated {len(cases)} corpus images in {time.perf_counter() - start:.1f} s")
+
+    try:
+        tesseract = ocr_engines.tesseract_version()
+    except Exception:
+        tesseract = None
+
+    suite = Suite(cases, args.runs, args.engine)
+    suite.run_core()
+    if not args.no_gui:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            suite.run_gui(args.corpus_dir or temp_dir)
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpus": os.cpu_count(), "tesseract": tesseract},
+        "engine": ocr_engines.get_engine(args.engine).name,
+        "preprocessing": list(preprocessing.DEFAULT_STEPS),
+        "corpus": {"seed": args.seed, "images": len(cases), "runs": args.runs},
+        "stages": suite.stages,
+    }
+    print_results(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != results["corpus"]:
+            print("Warning: the baseline was recorded with a different corpus or run count")
+        regressions = compare(results, baseline, args.max_slowdown, args.max_memory_growth,
+                              args.max_accuracy_drop)
+        if regressions:
+            print("\nFAIL: performance regressed:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nOK: no regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Check the engine-facing parts of OCR that run without Tesseract:
+- every config the app and batch mode build can be parsed by the
+  in-process engines. parse_config() turns a tesseract command line into
+  the psm, oem and variables set on a tesserocr instance; a config it
+  cannot parse makes tesserocr warm-ups and recognitions fail.
+- the result cache keeps each engine's results apart, so switching
+  engines never serves the other engine's text or word boxes.
+Exits with status 1 on any mismatch. Needs neither Tesseract nor tesserocr.
+
+Usage: python benchmarks/check_engines.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import ocr_core
+import ocr_engines
+from ocr_cache import OCRCache
+from ocr_engines import parse_config
+
+# (config, expected (psm, oem, variables))
+CASES = [
+    (ocr_core.make_config(), (None, 3, {})),
+    (ocr_core.AUTO_PSM_CONFIG, (None, 3, {})),
+    (ocr_core.TESSERACT_CONFIG, (6, 3, {})),
+    (ocr_core.make_config(psm=7, oem=1), (7, 1, {})),
+    ("--psm 11 -c preserve_interword_spaces=1", (11, None, {"preserve_interword_spaces": "1"})),
+    ("", (None, None, {})),
+]
+
+
+class LabelEngine:
+    """Stand-in engine that answers with its own name"""
+    name = None
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def recognize(self, image, config, lang=None):
+        return self.name
+
+    def recognize_data(self, image, config, lang=None):
+        return f"5\t1\t1\t1\t1\t1\t0\t0\t10\t10\t90\t{self.name}"
+
+
+def check_cache():
+    """Names of the engines whose cached result was served to another engine"""
+    engines = []
+    for name in ("engine-a", "engine-b"):
+        ocr_engines.ENGINES[name] = type(name, (LabelEngine,), {"name": name})
+        engines.append(name)
+    cache = OCRCache()
+    image = Image.new("L", (64, 32), 255)
+    wrong = []
+    for _ in range(2):  # The second round is served from the cache
+        for name in engines:
+            text = ocr_core.recognize(image, lang="eng", engine=name, cache=cache)
+            words = ocr_core.recognize_structured(image, lang="eng", engine=name, cache=cache)
+            ok = text == name and list(words.words) == [name]
+            print(f"cached result for {name:<26} {text!r} {list(words.words)}"
+                  f"{'' if ok else '  FAIL'}")
+            if not ok:
+                wrong.append(name)
+    return wrong
+
+
+def main():
+    failures = 0
+    for config, expected in CASES:
+        try:
+            parsed = parse_config(config)
+        except ValueError as e:
+            parsed = f"ValueError: {e}"
+        ok = parsed == expected
+        failures += not ok
+        print(f"{config!r:<48} {parsed}{'' if ok else f'  FAIL, expected {expected}'}")
+    if failures:
+        print("FAIL: configs were parsed incorrectly")
+        return 1
+    if check_cache():
+        print("FAIL: the cache served one engine's result to another")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
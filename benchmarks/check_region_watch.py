@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+Check that watch mode notices small edits in wide regions.
+Renders a wide log/ticker pane, changes a single character and checks that
+frames_differ reports the change, while an identical frame and one with
+slight brightness noise are treated as unchanged. Exits with status 1 on
+any mismatch. Runs headless with QT_QPA_PLATFORM=offscreen.
+
+Usage: python benchmarks/check_region_watch.py [--width 1600] [--height 400]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter, QColor, QFont
+from PyQt5.QtCore import Qt
+
+from image_bridge import qimage_to_array, array_to_qimage
+from region_watch import frame_signature, frames_differ
+
+LINES = ["EURUSD  1.0842  +0.12%", "GBPUSD  1.2711  -0.05%", "USDJPY  151.33  +0.31%"]
+
+
+def render_pane(width, height, price):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setPen(QColor(0, 0, 0))
+    painter.setFont(QFont("Sans", 11))
+    for row, line in enumerate(LINES + [f"ACME    {price}  +0.01%"]):
+        painter.drawText(12, 24 + row * 22, line)
+    painter.end()
+    return image
+
+
+def add_noise(image, amount):
+    """Copy of image with every pixel's brightness shifted by up to +-amount"""
+    pixels = qimage_to_array(image).astype(np.int16)
+    noise = np.random.default_rng(0).integers(-amount, amount + 1, pixels.shape[:2])
+    pixels[:, :, :3] += noise[:, :, None].astype(np.int16)
+    noisy = np.ascontiguousarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return array_to_qimage(noisy).copy()  # Own the pixels once the array is gone
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check change detection for watched regions")
+    parser.add_argument("--width", type=int, default=1600, help="region width")
+    parser.add_argument("--height", type=int, default=400, help="region height")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    before = frame_signature(render_pane(args.width, args.height, "101.25"))
+    checks = [
+        ("one character changed", render_pane(args.width, args.height, "101.26"), True),
+        ("identical frame", render_pane(args.width, args.height, "101.25"), False),
+        ("brightness noise", add_noise(render_pane(args.width, args.height, "101.25"), 6), False),
+    ]
+    failures = 0
+    for name, frame, expected in checks:
+        differ = frames_differ(before, frame_signature(frame))
+        print(f"{name:<24} differ={differ}{'' if differ == expected else '  FAIL'}")
+        failures += differ != expected
+    if failures:
+        print("FAIL: change detection is wrong")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Check that the local OCR server spreads different requests over its workers.
+Starts the server on a free localhost port with OCR replaced by a fixed
+delay, sends a burst of distinct images at once and compares the time the
+burst takes with ceil(requests / workers) x the delay, which is what it
+takes when every worker is busy. Exits with status 1 if the burst takes
+more than --max-ratio times that.
+
+Usage: python benchmarks/check_server.py [--requests 8] [--workers 4] [--delay 0.2]
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_server
+from bench_server import post_image, get_metrics
+
+
+class DelayService(ocr_server.OCRService):
+    """Answers every request after a fixed delay instead of running OCR"""
+
+    def __init__(self, delay, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def _recognize(self, request):
+        time.sleep(self.delay)
+        return {"text": "", "ocr_seconds": self.delay}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that distinct requests run in parallel")
+    parser.add_argument("--requests", type=int, default=8, help="distinct requests in the burst")
+    parser.add_argument("--workers", type=int, default=4, help="server worker threads")
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds each OCR run takes")
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="largest allowed burst time relative to the ideal")
+    args = parser.parse_args()
+
+    service = DelayService(args.delay, workers=args.workers, max_queue=args.requests)
+    server = ocr_server.make_server(service, port=0, quiet=True)
+    service.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+
+    # The bodies only need to differ; the delay service never decodes them
+    bodies = [f"image {i}".encode() for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.requests) as pool:
+        results = list(pool.map(lambda body: post_image(host, port, body), bodies))
+    seconds = time.perf_counter() - start
+    metrics = get_metrics(host, port)
+
+    server.shutdown()
+    server.server_close()
+    service.stop()
+
+    ideal = math.ceil(args.requests / args.workers) * args.delay
+    print(f"{args.requests} distinct requests on {args.workers} workers: {seconds:.2f} s "
+          f"(ideal {ideal:.2f} s), p99 {metrics['latency_ms']['p99']} ms, "
+          f"{metrics['batches']} batches")
+    failed = [status for status, _ in results if status != 200]
+    if failed:
+        print(f"FAIL: {len(failed)} requests did not succeed (HTTP {failed[0]})")
+        return 1
+    if seconds > ideal * args.max_ratio:
+        print("FAIL: the burst was not spread across the workers")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Check tile-parallel OCR against a single untiled pass.
+Renders a large synthetic page, verifies that no band boundary cuts through
+a text line, then OCRs the page both ways and compares the text and timing.
+Exits with status 1 if the results disagree by more than --max-diff.
+
+Usage: python benchmarks/check_tiling.py [--lines 120] [--max-diff 0.01]
+"""
+
+import os
+import sys
+import time
+import argparse
+import difflib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import ocr_core
+import tiling
+from preprocessing import ink_mask
+from bench_engines import render_text_image
+
+
+def normalize(text):
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tiled and untiled OCR output")
+    parser.add_argument("--lines", type=int, default=120, help="text lines on the test page")
+    parser.add_argument("--max-diff", type=float, default=0.01,
+                        help="largest allowed fraction of differing characters")
+    args = parser.parse_args()
+
+    page = render_text_image(2400, args.lines * 40, args.lines)
+    image = ocr_core.preprocess_image(page, steps=["grayscale"])
+    gray = np.asarray(image)
+
+    ranges = tiling.find_bands(gray)
+    ink_rows = ink_mask(gray).any(axis=1)
+    cut_through_text = [top for top, _ in ranges[1:] if ink_rows[top]]
+    print(f"{len(ranges)} bands: {ranges}")
+    if cut_through_text:
+        print(f"FAIL: bands cut through text at rows {cut_through_text}")
+        return 1
+
+    start = time.perf_counter()
+    untiled = ocr_core.recognize(image)
+    untiled_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tiled = tiling.recognize_tiled(image)
+    tiled_seconds = time.perf_counter() - start
+
+    similarity = difflib.SequenceMatcher(None, normalize(untiled), normalize(tiled)).ratio()
+    print(f"untiled: {untiled_seconds:.2f} s, tiled: {tiled_seconds:.2f} s "
+          f"({untiled_seconds / tiled_seconds:.1f}x)")
+    print(f"text similarity: {similarity:.4f}")
+
+    if 1 - similarity > args.max_diff:
+        print("FAIL: tiled text differs from the untiled result")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
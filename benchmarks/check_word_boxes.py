@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+"""
+Check that structured OCR reports word boxes on the user's image.
+Draws a word at a known offset in an image that preprocessing crops and
+upscales (and, in a second case, deskews), runs structured recognition
+and checks that the reported box lies on the drawn word in the original
+image, not in the preprocessed one. The stand-in engine reports the ink
+of the preprocessed image as a single word, so no Tesseract is needed;
+with --tesseract the real engine is checked too. Exits with status 1 when
+a box is off by more than --tolerance pixels.
+
+Usage: python benchmarks/check_word_boxes.py [--tolerance 4] [--tesseract]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import ocr_core
+import ocr_engines
+import preprocessing
+
+WORD = "Invoice"
+
+
+class InkBoxEngine:
+    """Reports the ink of the image it is given as one word, the way Tesseract boxes it"""
+    name = "ink-box"
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def recognize_data(self, image, config, lang=None):
+        box = ink_box(image)
+        header = ("level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\t"
+                  "left\ttop\twidth\theight\tconf\ttext")
+        if box is None:
+            return header
+        left, top, right, bottom = box
+        word = f"5\t1\t1\t1\t1\t1\t{left}\t{top}\t{right - left}\t{bottom - top}\t96\t{WORD}"
+        return f"{header}\n{word}"
+
+
+def ink_box(image):
+    """(left, top, right, bottom) around the dark pixels of an image, or None"""
+    gray = np.asarray(image.convert("L"))
+    rows = np.flatnonzero((gray < 128).any(axis=1))
+    cols = np.flatnonzero((gray < 128).any(axis=0))
+    if not rows.size:
+        return None
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def draw_word(size, offset, angle=0.0, lines=1):
+    """
+    A white image with WORD drawn small at offset, repeated on a few lines
+    when lines > 1, and optionally turned by angle degrees
+    """
+    image = Image.new("L", size, 255)
+    font = ImageFont.load_default().font_variant(size=14)
+    draw = ImageDraw.Draw(image)
+    for line in range(lines):
+        draw.text((offset[0], offset[1] + 22 * line), " ".join([WORD] * 4), fill=0, font=font)
+    if angle:
+        image = image.rotate(angle, resample=Image.BICUBIC, fillcolor=255)
+    return image.convert("RGB")
+
+
+def check(name, image, steps, engine, tolerance, rotated=False):
+    geometry = preprocessing.Geometry()
+    processed = ocr_core.preprocess_image(image, steps=steps, geometry=geometry)
+    result = ocr_core.recognize_structured(processed, config=ocr_core.TESSERACT_CONFIG,
+                                           engine=engine, source=image, geometry=geometry)
+    expected = ink_box(image)
+    index = [i for i, word in enumerate(result.words) if WORD.lower() in word.lower()]
+    if not index:
+        print(f"{name:<34} FAIL: {WORD!r} was not recognized ({list(result.words)})")
+        return False
+    c = result.columns
+    i = index[0]
+    box = (int(c["left"][i]), int(c["top"][i]), int(c["left"][i] + c["width"][i]),
+           int(c["top"][i] + c["height"][i]))
+    # The box around a turned box is larger than the turned word's own box
+    slack = tolerance + (0.1 * (expected[2] - expected[0]) if rotated else 0)
+    error = max(abs(a - b) for a, b in zip(box, expected))
+    ok = error <= slack and result.image is image and result.image_size == image.size
+    print(f"{name:<34} drawn at {expected}, reported {box}, processed size {processed.size}"
+          f"{'' if ok else '  FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that word boxes refer to the source image")
+    parser.add_argument("--tolerance", type=float, default=4,
+                        help="largest allowed box edge error in pixels")
+    parser.add_argument("--tesseract", action="store_true", help="also check the real engine")
+    args = parser.parse_args()
+
+    ocr_engines.ENGINES[InkBoxEngine.name] = InkBoxEngine
+    engines = [InkBoxEngine.name] + ([ocr_engines.DEFAULT_ENGINE] if args.tesseract else [])
+
+    plain = draw_word((900, 600), (430, 310))
+    # Deskewing needs a few lines of text to find the angle
+    turned = draw_word((900, 600), (300, 250), angle=3.0, lines=5)
+    ok = True
+    for engine in engines:
+        ok &= check(f"{engine}: crop, upscale, binarize", plain,
+                    ["grayscale", "crop", "upscale", "threshold"], engine, args.tolerance)
+        ok &= check(f"{engine}: deskew, crop, upscale", turned,
+                    ["grayscale", "deskew", "crop", "upscale", "threshold"], engine,
+                    args.tolerance, rotated=True)
+    if not ok:
+        print("FAIL: word boxes do not match the source image")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
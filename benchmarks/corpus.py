@@ -0,0 +1,156 @@
+"""
+Synthetic OCR corpus.
+Renders text images with known ground truth at several sizes, fonts and
+noise levels, the same way generate_icon.py draws text with PIL. The
+output is deterministic for a given seed, so runs on the same machine
+can be compared.
+"""
+
+import os
+import random
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# label -> (width, height, text lines)
+SIZES = {
+    "region": (480, 48, 1),
+    "paragraph": (960, 288, 6),
+    "page": (1700, 2200, 40),
+}
+
+# Tried in order; the first three that load are used
+FONT_CANDIDATES = (
+    "arial.ttf",
+    "DejaVuSans.ttf",
+    "LiberationSans-Regular.ttf",
+    "times.ttf",
+    "DejaVuSerif.ttf",
+    "LiberationSerif-Regular.ttf",
+    "cour.ttf",
+    "DejaVuSansMono.ttf",
+)
+
+# Standard deviation of the Gaussian noise added to the rendered pixels
+NOISE_LEVELS = {"clean": 0, "noisy": 20, "very noisy": 45}
+
+FONT_SIZE = 24
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog invoice total amount due date "
+    "account number reference payment received balance order shipped item "
+    "quantity price customer address street city postal code phone email "
+    "report summary error warning status running stopped connected server "
+    "window screen capture region text image value result page section 2024 "
+    "17.50 #4821 v3.2 100% (draft) user@example.com 09:45"
+).split()
+
+CorpusCase = namedtuple("CorpusCase", "name image text size font noise")
+
+
+def available_fonts(limit=3):
+    """(name, font) pairs for installed fonts, or PIL's built-in font"""
+    fonts = []
+    for name in FONT_CANDIDATES:
+        try:
+            fonts.append((os.path.splitext(name)[0], ImageFont.truetype(name, FONT_SIZE)))
+        except IOError:
+            continue
+        if len(fonts) == limit:
+            break
+    if not fonts:
+        try:
+            fonts.append(("default", ImageFont.load_default(size=FONT_SIZE)))
+        except TypeError:
+            # Pillow < 10.1 only has the small bitmap font
+            fonts.append(("default", ImageFont.load_default()))
+    return fonts
+
+
+def random_lines(rng, count, width, font):
+    """Lines of random words that fit the image width"""
+    lines = []
+    for _ in range(count):
+        words = []
+        while True:
+            word = rng.choice(WORDS)
+            if font.getlength(" ".join(words + [word])) > width - 40:
+                break
+            words.append(word)
+        lines.append(" ".join(words))
+    return lines
+
+
+def render_case(rng, size, font, noise):
+    width, height, line_count = SIZES[size]
+    lines = random_lines(rng, line_count, width, font)
+
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    line_height = height // line_count
+    for index, line in enumerate(lines):
+        draw.text((20, index * line_height + (line_height - FONT_SIZE) // 2), line,
+                  fill=0, font=font)
+
+    sigma = NOISE_LEVELS[noise]
+    if sigma:
+        pixels = np.asarray(image, dtype=np.float32)
+        noise_rng = np.random.default_rng(rng.randrange(2 ** 32))
+        pixels = pixels + noise_rng.normal(0, sigma, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    return image.convert('RGB'), "\n".join(lines)
+
+
+def generate_corpus(seed=0, sizes=None, noise_levels=None, fonts=None):
+    """Return the list of CorpusCase for every size, font and noise level"""
+    rng = random.Random(seed)
+    sizes = sizes or list(SIZES)
+    noise_levels = noise_levels or list(NOISE_LEVELS)
+    fonts = fonts or available_fonts()
+
+    cases = []
+    for size in sizes:
+        for font_name, font in fonts:
+            for noise in noise_levels:
+                image, text = render_case(rng, size, font, noise)
+                name = f"{size}-{font_name}-{noise.replace(' ', '_')}"
+                cases.append(CorpusCase(name, image, text, size, font_name, noise))
+    return cases
+
+
+def save_corpus(cases, directory):
+    """Write each case as <name>.png with its ground truth in <name>.gt.txt"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for case in cases:
+        path = os.path.join(directory, f"{case.name}.png")
+        case.image.save(path)
+        with open(os.path.join(directory, f"{case.name}.gt.txt"), "w", encoding="utf-8") as f:
+            f.write(case.text + "\n")
+        paths.append(path)
+    return paths
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_accuracy(expected, actual):
+    """1 - character error rate, ignoring differences in whitespace"""
+    expected = " ".join(expected.split())
+    actual = " ".join(actual.split())
+    if not expected:
+        return 1.0 if not actual else 0.0
+    return max(0.0, 1 - edit_distance(expected, actual) / len(expected))
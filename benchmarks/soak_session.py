@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""
+Soak test for long GUI sessions.
+Runs thousands of capture/extract cycles through the main window: each
+cycle hands a synthetic screenshot to the window the way the screen
+capture does, extracts its text, waits for the result and lets
+auto-cleanup release the image. Every few cycles the reused selection
+overlay is also opened and cancelled. Resident memory is sampled
+throughout; the run fails (exit status 1) if RSS after warm-up grows by
+more than --max-growth-mb.
+
+--stub-engine replaces Tesseract with an engine that returns fixed text,
+which isolates the app's own memory use and makes thousands of cycles
+take seconds. Runs headless with QT_QPA_PLATFORM=offscreen.
+
+Usage: python benchmarks/soak_session.py [--cycles 2000] [--stub-engine]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter, QColor, QFont
+from PyQt5.QtCore import Qt, QEventLoop
+
+import memory
+from instrumentation import TRACER
+
+# Screenshot sizes cycled through, from a word to most of a screen
+SIZES = [(320, 48), (800, 200), (1600, 900), (2560, 1400)]
+
+
+class StubEngine:
+    """Stands in for Tesseract; returns the same text without running OCR"""
+    name = "soak-stub"
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def recognize(self, image, config, lang=None):
+        return "soak test text\nsecond line"
+
+    def recognize_data(self, image, config, lang=None):
+        return ""
+
+    def warm_up(self, config, lang=None):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_screenshot(cycle):
+    width, height = SIZES[cycle % len(SIZES)]
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setPen(QColor(0, 0, 0))
+    painter.setFont(QFont("Sans", 18))
+    painter.drawText(20, 36, f"Soak cycle {cycle}")
+    painter.end()
+    return image
+
+
+def wait_until(app, condition, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("the window did not finish in time")
+        app.processEvents(QEventLoop.AllEvents, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that memory stays flat over many cycles")
+    parser.add_argument("--cycles", type=int, default=2000, help="capture/extract cycles to run")
+    parser.add_argument("--warmup", type=int, default=200,
+                        help="cycles before the baseline is taken")
+    parser.add_argument("--sample-every", type=int, default=200, help="cycles between samples")
+    parser.add_argument("--selector-every", type=int, default=10,
+                        help="cycles between opening and cancelling the selection overlay")
+    parser.add_argument("--max-growth-mb", type=float, default=20.0,
+                        help="largest allowed RSS growth after warm-up")
+    parser.add_argument("--stub-engine", action="store_true",
+                        help="return fixed text instead of running Tesseract")
+    args = parser.parse_args()
+
+    if memory.rss_bytes() is None:
+        print("Resident memory cannot be read on this platform")
+        return 1
+
+    import ocr_engines
+    if args.stub_engine:
+        ocr_engines.ENGINES[StubEngine.name] = StubEngine
+        ocr_engines.DEFAULT_ENGINE = StubEngine.name
+
+    from ocr_app import OCRApp
+    from ocr_cache import OCRCache
+
+    app = QApplication(sys.argv)
+    window = OCRApp()
+    # Keep the user's result cache and history out of the run
+    window._ocr_cache = OCRCache()
+    window.record_history = lambda job_id, source, text: None
+    window.show()
+    window.auto_cleanup_checkbox.setChecked(True)
+    wait_until(app, window.engine_combo.isEnabled)
+
+    baseline = None
+    samples = []
+    start = time.perf_counter()
+    for cycle in range(1, args.cycles + 1):
+        window.process_screenshot(make_screenshot(cycle))
+        window.extract_text()
+        wait_until(app, lambda: not window.ocr_jobs)
+        if cycle % args.selector_every == 0:
+            selector = window.screen_capture.screen_selector
+            selector.start()
+            app.processEvents()
+            selector.cancel()
+            app.processEvents()
+            window.showNormal()
+
+        if cycle % args.sample_every == 0 or cycle == args.warmup:
+            # The timing trace keeps up to 100k spans by design; empty it so
+            # only memory that is never released shows up as growth
+            TRACER.clear()
+        if cycle == args.warmup:
+            baseline = memory.rss_bytes()
+        if cycle % args.sample_every == 0:
+            rss = memory.rss_bytes()
+            samples.append((cycle, rss))
+            print(f"cycle {cycle:>6}  rss {memory.format_bytes(rss):>8}  "
+                  f"{cycle / (time.perf_counter() - start):6.1f} cycles/s")
+
+    window.close()
+    if baseline is None:
+        print("Not enough cycles to get past the warm-up")
+        return 1
+    final = memory.rss_bytes()
+    growth_mb = (final - baseline) / (1024 * 1024)
+    print(f"\nbaseline {memory.format_bytes(baseline)} after {args.warmup} cycles, "
+          f"final {memory.format_bytes(final)}, growth {growth_mb:+.1f} MB, "
+          f"peak {memory.format_bytes(memory.peak_rss_bytes())}")
+    if growth_mb > args.max_growth_mb:
+        print(f"FAIL: memory grew by more than {args.max_growth_mb:.0f} MB")
+        return 1
+    print("OK: memory stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Multi-page document ingestion.
+
+Pages of multi-frame TIFFs and PDFs are produced one at a time by a
+generator, so a long document is never decoded into memory all at once.
+PDF rendering uses the optional pypdfium2 package, or pdf2image (which
+needs poppler) if pypdfium2 is not installed.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from PIL import Image
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+try:
+    import pdf2image
+except ImportError:
+    pdf2image = None
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.tif', '.tiff')
+
+# Resolution PDF pages are rendered at for OCR
+PDF_DPI = 300
+
+
+def is_pdf(path):
+    return os.path.splitext(path)[1].lower() == '.pdf'
+
+
+def page_count(path):
+    if is_pdf(path):
+        if pypdfium2 is not None:
+            pdf = pypdfium2.PdfDocument(path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        if pdf2image is not None:
+            return pdf2image.pdfinfo_from_path(path)["Pages"]
+        raise RuntimeError("PDF support requires the pypdfium2 or pdf2image package")
+
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def is_document(path):
+    """True for files that should be OCRed page by page"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in DOCUMENT_EXTENSIONS:
+        return False
+    return is_pdf(path) or page_count(path) > 1
+
+
+def iter_pages(path, dpi=PDF_DPI):
+    """Yield (page index, PIL image) for each page, decoding one page at a time"""
+    if not is_pdf(path):
+        with Image.open(path) as image:
+            for index in range(getattr(image, "n_frames", 1)):
+                image.seek(index)
+                # Copy, because the next seek reuses the frame buffer
+                yield index, image.copy()
+        return
+
+    if pypdfium2 is not None:
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    yield index, page.render(scale=dpi / 72).to_pil()
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+        return
+
+    if pdf2image is not None:
+        for index in range(page_count(path)):
+            yield index, pdf2image.convert_from_path(path, dpi=dpi, first_page=index + 1,
+                                                     last_page=index + 1)[0]
+        return
+
+    raise RuntimeError("PDF support requires the pypdfium2 or pdf2image package")
+
+
+def ocr_pages(pages, executor, ocr_page, max_in_flight=4, should_stop=None):
+    """
+    Run ocr_page(image) for each (index, image) from pages on an executor and
+    yield (index, text) in page order as soon as each page is ready.
+    At most max_in_flight pages are decoded and waiting at any time.
+    """
+    pending = {}  # future -> page index
+    finished = {}  # page index -> text, for pages that finished early
+    next_index = 0
+    pages = iter(pages)
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) + len(finished) < max_in_flight:
+                if should_stop is not None and should_stop():
+                    return
+                page = next(pages, None)
+                if page is None:
+                    exhausted = True
+                    break
+                index, image = page
+                pending[executor.submit(ocr_page, image)] = index
+
+            if not pending and not finished:
+                return
+
+            if next_index not in finished:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+
+            while next_index in finished:
+                yield next_index, finished.pop(next_index)
+                next_index += 1
+    finally:
+        for future in pending:
+            future.cancel()
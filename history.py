@@ -0,0 +1,221 @@
+"""
+Searchable history of past extractions.
+
+Every extraction is stored with its text, source, OCR settings, time and
+a small thumbnail in an SQLite database in the user's data folder. The
+text is indexed with FTS5, so a search over thousands of extractions is
+an index lookup rather than a scan; SQLite builds without FTS5 fall back
+to LIKE. add() only queues an entry: a background thread writes queued
+entries in one transaction per batch, so callers never wait on the disk.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Entries written per transaction, and how long an entry may wait to be written
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 1.0
+
+# Search results returned at most
+MAX_RESULTS = 200
+
+# Characters of text shown for entries listed without a search
+PREVIEW_CHARS = 120
+
+HistoryEntry = namedtuple("HistoryEntry", "entry_id created source config lang engine snippet")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    "id INTEGER PRIMARY KEY, created REAL NOT NULL, source TEXT NOT NULL, "
+    "config TEXT, lang TEXT, engine TEXT, text TEXT NOT NULL)",
+    # Kept apart so listing and LIKE searches do not read the image data
+    "CREATE TABLE IF NOT EXISTS history_thumbnails ("
+    "id INTEGER PRIMARY KEY REFERENCES history (id) ON DELETE CASCADE, data BLOB NOT NULL)",
+)
+
+# External content index: the text is stored once, in the history table
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+    "text, source, content='history', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN "
+    "INSERT INTO history_fts (rowid, text, source) VALUES (new.id, new.text, new.source); END",
+    "CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, text, source) "
+    "VALUES ('delete', old.id, old.text, old.source); END",
+)
+
+_COLUMNS = "h.id, h.created, h.source, h.config, h.lang, h.engine"
+
+
+def default_history_path():
+    """Location of the history database in the user's data directory"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_DATA_HOME",
+                              os.path.join(os.path.expanduser("~"), ".local", "share"))
+    return os.path.join(base, "ocr_app", "history.sqlite3")
+
+
+def search_words(query):
+    """The words of a search box query"""
+    return re.findall(r"\w+", query or "")
+
+
+def fts_query(words):
+    """An FTS5 query matching all words, the last one as a prefix (search as you type)"""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class HistoryStore:
+    """Extraction history with full-text search. Safe to share between threads"""
+
+    def __init__(self, db_path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        try:
+            for statement in _FTS_SCHEMA:
+                self._db.execute(statement)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite compiled without FTS5
+            self.has_fts = False
+
+        self._lock = threading.Lock()  # Serializes use of the connection
+        self._pending = []  # Entries queued by add(), oldest first
+        self._pending_changed = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def add(self, text, source, config=None, lang=None, engine=None, thumbnail=None):
+        """Queue an extraction for writing; thumbnail is encoded image bytes or None"""
+        with self._pending_changed:
+            self._pending.append((time.time(), source, config, lang, engine, text, thumbnail))
+            if len(self._pending) >= self.batch_size:
+                self._pending_changed.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._pending_changed:
+                self._pending_changed.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # Let a few more entries arrive so they share the transaction
+                self._pending_changed.wait_for(
+                    lambda: len(self._pending) >= self.batch_size or self._closed,
+                    timeout=self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing history: {str(e)}")
+
+    def flush(self):
+        """Write all queued entries now, in one transaction. Returns how many"""
+        with self._lock:
+            with self._pending_changed:
+                batch, self._pending = self._pending, []
+            if not batch or self._db is None:
+                return 0
+            self._db.execute("BEGIN")
+            try:
+                for created, source, config, lang, engine, text, thumbnail in batch:
+                    cursor = self._db.execute(
+                        "INSERT INTO history (created, source, config, lang, engine, text) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (created, source, config, lang, engine, text))
+                    if thumbnail:
+                        self._db.execute("INSERT INTO history_thumbnails (id, data) VALUES (?, ?)",
+                                         (cursor.lastrowid, thumbnail))
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+            return len(batch)
+
+    def search(self, query="", limit=MAX_RESULTS):
+        """
+        Newest extractions matching every word of query, as HistoryEntry
+        with a snippet around the match; the newest of all when query is empty
+        """
+        self.flush()
+        words = search_words(query)
+        with self._lock:
+            if not words:
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS}, substr(h.text, 1, ?) FROM history h "
+                    "ORDER BY h.id DESC LIMIT ?", (PREVIEW_CHARS, limit)).fetchall()
+            elif self.has_fts:
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS}, snippet(history_fts, 0, '[', ']', '...', 12) "
+                    "FROM history_fts JOIN history h ON h.id = history_fts.rowid "
+                    "WHERE history_fts MATCH ? ORDER BY h.id DESC LIMIT ?",
+                    (fts_query(words), limit)).fetchall()
+            else:
+                patterns = ["%" + word.replace("\\", "\\\\").replace("%", "\\%")
+                            .replace("_", "\\_") + "%" for word in words]
+                condition = " AND ".join(["h.text LIKE ? ESCAPE '\\'"] * len(words))
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS}, substr(h.text, 1, ?) FROM history h "
+                    f"WHERE {condition} ORDER BY h.id DESC LIMIT ?",
+                    (PREVIEW_CHARS, *patterns, limit)).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def text(self, entry_id):
+        """Full text of an entry, or None if it was deleted"""
+        with self._lock:
+            row = self._db.execute("SELECT text FROM history WHERE id = ?", (entry_id,)).fetchone()
+        return row[0] if row else None
+
+    def thumbnails(self, entry_ids):
+        """{entry id: thumbnail bytes} for the entries that have one"""
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return {}
+        placeholders = ", ".join("?" * len(entry_ids))
+        with self._lock:
+            return dict(self._db.execute(
+                f"SELECT id, data FROM history_thumbnails WHERE id IN ({placeholders})",
+                entry_ids))
+
+    def delete(self, entry_id):
+        self.flush()
+        with self._lock:
+            self._db.execute("DELETE FROM history WHERE id = ?", (entry_id,))
+
+    def clear(self):
+        with self._pending_changed:
+            self._pending.clear()
+        with self._lock:
+            self._db.execute("DELETE FROM history")
+
+    def count(self):
+        self.flush()
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def close(self):
+        """Write what is still queued and close the database"""
+        with self._pending_changed:
+            self._closed = True
+            self._pending_changed.notify()
+        self._writer.join()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,48 @@
+"""
+System-wide hotkeys.
+
+Global hotkeys use pynput's keyboard listener when pynput is installed
+(pip install pynput); without it, the app's shortcuts only work while its
+window has focus. The listener runs on its own thread, so activations are
+forwarded to the GUI thread through a queued signal.
+"""
+
+import importlib.util
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class GlobalHotkey(QObject):
+    """Emits activated whenever a key combination such as "<ctrl>+<shift>+q" is pressed"""
+    activated = pyqtSignal()
+
+    def __init__(self, hotkey, parent=None):
+        super().__init__(parent)
+        self.hotkey = hotkey
+        self._listener = None
+
+    @staticmethod
+    def is_available():
+        return importlib.util.find_spec("pynput") is not None
+
+    def start(self):
+        """Start listening; returns False when global hotkeys cannot be used here"""
+        if self._listener is not None:
+            return True
+        if not self.is_available():
+            return False
+        try:
+            # Imported here: pynput connects to the display server on import
+            from pynput import keyboard
+
+            self._listener = keyboard.GlobalHotKeys({self.hotkey: self.activated.emit})
+            self._listener.start()
+        except Exception as e:
+            print(f"Global hotkey unavailable: {str(e)}")
+            self._listener = None
+            return False
+        return True
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
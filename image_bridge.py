@@ -0,0 +1,94 @@
+"""
+Conversions between QImage, NumPy arrays and PIL images.
+
+Wherever the pixel layouts agree the result is a view onto the QImage's own
+memory rather than a copy, so the QImage must be kept alive for as long as
+the array or PIL image is in use.
+"""
+
+import sys
+import numpy as np
+from PIL import Image
+from PyQt5.QtGui import QImage
+
+# QImage formats that can be viewed directly, with their channel counts
+_CHANNELS = {
+    QImage.Format_Grayscale8: 1,
+    QImage.Format_RGB32: 4,
+    QImage.Format_ARGB32: 4,
+    QImage.Format_ARGB32_Premultiplied: 4,
+    QImage.Format_RGBX8888: 4,
+    QImage.Format_RGBA8888: 4,
+}
+
+# 32-bit QImage formats store 0xAARRGGBB words, so the byte order in memory
+# depends on the platform
+_ARGB32_RAWMODE = "BGRX" if sys.byteorder == "little" else "XRGB"
+
+
+def _buffer(qimage):
+    ptr = qimage.constBits()
+    ptr.setsize(qimage.sizeInBytes())
+    return ptr
+
+
+def viewable_format(qimage):
+    """Return the image unchanged if it can be viewed, else an RGB32 copy"""
+    if qimage.format() in _CHANNELS:
+        return qimage
+    return qimage.convertToFormat(QImage.Format_RGB32)
+
+
+def qimage_to_array(qimage):
+    """
+    View a QImage's pixels as a uint8 array without copying.
+    Grayscale images give (height, width), 32-bit images (height, width, 4)
+    with channels in memory order (BGRA for RGB32/ARGB32 on little-endian).
+    """
+    channels = _CHANNELS.get(qimage.format())
+    if channels is None:
+        raise ValueError(f"Unsupported QImage format: {qimage.format()}")
+
+    width, height = qimage.width(), qimage.height()
+    rows = np.frombuffer(_buffer(qimage), np.uint8).reshape(height, qimage.bytesPerLine())
+    pixels = rows[:, :width * channels]
+    if channels == 1:
+        return pixels
+    return pixels.reshape(height, width, channels)
+
+
+def qimage_to_pil(qimage):
+    """
+    Wrap a QImage as a PIL image. Grayscale and RGBA8888/RGBX8888 images share
+    the QImage's memory; RGB32/ARGB32 images are swizzled to RGB in one pass.
+    """
+    qimage = viewable_format(qimage)
+    fmt = qimage.format()
+    size = (qimage.width(), qimage.height())
+    stride = qimage.bytesPerLine()
+
+    if fmt == QImage.Format_Grayscale8:
+        return Image.frombuffer('L', size, _buffer(qimage), 'raw', 'L', stride, 1)
+    if fmt == QImage.Format_RGBA8888:
+        return Image.frombuffer('RGBA', size, _buffer(qimage), 'raw', 'RGBA', stride, 1)
+    if fmt == QImage.Format_RGBX8888:
+        return Image.frombuffer('RGBX', size, _buffer(qimage), 'raw', 'RGBX', stride, 1)
+    return Image.frombuffer('RGB', size, _buffer(qimage), 'raw', _ARGB32_RAWMODE, stride, 1)
+
+
+def array_to_qimage(array):
+    """
+    Wrap a C-contiguous uint8 array as a QImage without copying.
+    Accepts (height, width) grayscale or (height, width, 4) BGRA/BGRX arrays
+    (the memory order of RGB32 on little-endian machines).
+    The array must outlive the returned QImage.
+    """
+    if not array.flags["C_CONTIGUOUS"]:
+        raise ValueError("Array must be C-contiguous")
+
+    height, width = array.shape[:2]
+    if array.ndim == 2:
+        return QImage(array.data, width, height, array.strides[0], QImage.Format_Grayscale8)
+    if array.ndim == 3 and array.shape[2] == 4:
+        return QImage(array.data, width, height, array.strides[0], QImage.Format_RGB32)
+    raise ValueError(f"Unsupported array shape: {array.shape}")
@@ -0,0 +1,151 @@
+"""
+Low-overhead timing of the OCR hot path.
+
+A Run groups the stages of one user action (an extraction, a preview, a
+clipboard copy). Stages are timed with perf_counter_ns and appended to
+bounded deques, so recording costs a few hundred nanoseconds and memory
+stays flat however long the app runs. Finished runs feed the GUI timing
+panel; the raw spans can be exported in Chrome's trace event format and
+opened in chrome://tracing or https://ui.perfetto.dev.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+from collections import deque
+
+# Finished runs kept for the timing panel
+MAX_RUNS = 50
+
+# Spans kept for trace export
+MAX_EVENTS = 100_000
+
+
+class _Span:
+    """Context manager that records one stage when it exits"""
+    __slots__ = ("run", "name", "args", "start_ns")
+
+    def __init__(self, run, name, args):
+        self.run = run
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.run.add(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns, self.args)
+        return False
+
+
+class Run:
+    """The timed stages of one action; stages may be recorded from any thread"""
+
+    def __init__(self, tracer, run_id, label):
+        self.tracer = tracer
+        self.run_id = run_id
+        self.label = label
+        self.started_at = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.status = None
+        self.stages = {}  # stage name -> total ms, in first-seen order
+        self._lock = threading.Lock()
+
+    def stage(self, name, **args):
+        """Time a with-block as the named stage"""
+        return _Span(self, name, args)
+
+    def add(self, name, start_ns, duration_ns, args=None):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + duration_ns / 1e6
+        self.tracer.record(name, start_ns, duration_ns, self, args)
+
+    def add_sequence(self, prefix, start_ns, durations_ms):
+        """Record back-to-back sub-stages from (name, ms) pairs measured elsewhere"""
+        cursor = start_ns
+        for name, ms in durations_ms:
+            duration_ns = int(ms * 1e6)
+            self.add(f"{prefix}.{name}", cursor, duration_ns)
+            cursor += duration_ns
+
+    @property
+    def total_ms(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def finish(self, status="ok"):
+        """Close the run and hand it to the tracer's recent runs; later calls are ignored"""
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+            self.status = status
+            self.tracer.end_run(self)
+        return self
+
+
+class Tracer:
+    """Collects runs and spans; safe to use from worker threads"""
+
+    def __init__(self, max_runs=MAX_RUNS, max_events=MAX_EVENTS):
+        self.epoch_ns = time.perf_counter_ns()
+        self.runs = deque(maxlen=max_runs)
+        self.events = deque(maxlen=max_events)  # (name, start ns, duration ns, thread id, run label, args)
+        self._thread_names = {}
+        self._ids = itertools.count(1)
+
+    def begin_run(self, label):
+        return Run(self, next(self._ids), label)
+
+    def end_run(self, run):
+        self.runs.append(run)
+
+    def record(self, name, start_ns, duration_ns, run=None, args=None):
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+        self.events.append((name, start_ns, duration_ns, thread_id,
+                            run.label if run is not None else None, args))
+
+    def recent_runs(self):
+        """Finished runs, newest first"""
+        return list(reversed(self.runs))
+
+    def clear(self):
+        self.runs.clear()
+        self.events.clear()
+
+    def chrome_trace(self):
+        """The recorded spans as a Chrome trace event dict"""
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                   "args": {"name": name}}
+                  for thread_id, name in list(self._thread_names.items())]
+        for name, start_ns, duration_ns, thread_id, label, args in list(self.events):
+            event_args = dict(args or {})
+            if label is not None:
+                event_args["run"] = label
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start_ns - self.epoch_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": thread_id,
+                "args": event_args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+# Shared by the GUI and the background job engine
+TRACER = Tracer()
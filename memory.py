@@ -0,0 +1,95 @@
+"""
+Process memory readings for long-running sessions.
+
+rss_bytes() and peak_rss_bytes() read the resident set size and its high
+watermark from the operating system (/proc on Linux, the process memory
+counters on Windows, getrusage elsewhere), so no extra package is needed.
+release_freed_memory() asks glibc to hand freed heap pages back to the
+system; without it, RSS stays at its peak after large screenshots have
+been released, which hides whether memory is really being reclaimed.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import sys
+import ctypes
+
+if os.name == "nt":
+    from ctypes import wintypes
+
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+else:
+    import resource
+
+try:
+    _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+except (OSError, AttributeError):
+    # Not glibc; other allocators return memory on their own
+    _malloc_trim = None
+
+
+def _windows_counters():
+    counters = _ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters),
+                                                    counters.cb):
+        return None
+    return counters
+
+
+def rss_bytes():
+    """Resident memory of this process in bytes, or None where it cannot be read"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if os.name == "nt":
+            counters = _windows_counters()
+            return counters.WorkingSetSize if counters else None
+    except (OSError, ValueError):
+        pass
+    # macOS and the BSDs only report the peak without extra packages
+    return None
+
+
+def peak_rss_bytes():
+    """Highest resident memory of this process so far in bytes, or None"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        if os.name == "nt":
+            counters = _windows_counters()
+            return counters.PeakWorkingSetSize if counters else None
+    except (OSError, ValueError):
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def release_freed_memory():
+    """Return freed heap memory to the operating system where the allocator keeps it"""
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+def format_bytes(size):
+    if size is None:
+        return "n/a"
+    return f"{size / (1024 * 1024):.0f} MB"
@@ -1,24 +1,77 @@
 import sys
 import os
-import pytesseract
+import time
+import contextlib
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, 
                             QWidget, QFileDialog, QTextEdit, QLabel, QMessageBox, QGroupBox,
-                            QCheckBox)
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt, QRect, QTimer
-from PIL import Image
-import pyperclip
-import mss
-import mss.tools
+                            QCheckBox, QProgressBar, QComboBox, QTreeWidget, QTreeWidgetItem,
+                            QSizePolicy, QLineEdit, QListWidget, QListWidgetItem, QShortcut,
+                            QGridLayout)
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QKeySequence
+from PyQt5.QtCore import Qt, QTimer, QSize, QBuffer, QIODevice, QEvent
 from datetime import datetime
-from alt_screenshot import ScreenCapture
+from startup import StartupLoader
+from instrumentation import TRACER
+from hotkeys import GlobalHotkey
+from previews import PreviewLoader, preview_box, fitted_size
+from text_output import TextOutput
+import postprocessing
+import memory
 
-# Set Tesseract executable path - adjust this path based on your installation location
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-# If you installed it in a different location, update the path accordingly
-# Examples:
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
-# pytesseract.pytesseract.tesseract_cmd = r'D:\Tesseract-OCR\tesseract.exe'
+# The OCR modules (NumPy, PIL, pytesseract and everything built on them) are
+# imported where they are first used, and preloaded in the background by
+# StartupLoader once the window is showing, so startup only pays for PyQt5.
+# Tesseract's executable path is configured in ocr_engines.py.
+
+# How often a watched region is re-captured
+WATCH_INTERVAL_MS = 1000
+
+# Quick capture: select a region and get its text on the clipboard. The
+# shortcut works inside the app, the hotkey system-wide when pynput is installed
+QUICK_CAPTURE_SHORTCUT = "Ctrl+Shift+Q"
+QUICK_CAPTURE_HOTKEY = "<ctrl>+<shift>+q"
+
+# Before capturing, the window is minimized and checked every MINIMIZE_POLL_MS
+# until it is off screen; window managers that never say so get MINIMIZE_TIMEOUT_MS
+MINIMIZE_POLL_MS = 10
+MINIMIZE_TIMEOUT_MS = 500
+
+# Memory allowed for cached image previews
+IMAGE_CACHE_BYTES = 32 * 1024 * 1024
+
+# How often the memory readout in the status bar is refreshed
+MEMORY_INTERVAL_MS = 2000
+
+# Longest side of the thumbnails kept in the extraction history
+HISTORY_THUMBNAIL_SIZE = 96
+
+# (label, Tesseract page segmentation mode); None picks it per image
+LAYOUT_OPTIONS = [
+    ("Auto", None),
+    ("Block of text", 6),
+    ("Single line", 7),
+    ("Sparse text", 11),
+    ("Full page", 3),
+]
+
+# Optional preprocessing steps shown in the UI, in pipeline order
+# (step, label, tooltip, on by default; matches preprocessing.DEFAULT_STEPS)
+PREPROCESS_OPTIONS = [
+    ("deskew", "Deskew", "Straighten slightly rotated text (slower)", False),
+    ("crop", "Crop", "Trim empty borders so Tesseract has fewer pixels to process", True),
+    ("upscale", "Upscale", "Enlarge captures with small text to a ~300 DPI equivalent", True),
+    ("threshold", "Binarize", "Convert to black and white with adaptive thresholding", True),
+]
+
+# (step, label, tooltip, on by default); run in postprocessing.STEP_ORDER
+POSTPROCESS_OPTIONS = [
+    ("whitespace", "Normalize spaces", "Collapse repeated spaces and blank lines", True),
+    ("dehyphenate", "Join hyphenated words",
+     "Rejoin words split with a hyphen at the end of a line", True),
+    ("correct", "Correct words",
+     "Fix words one common OCR confusion away from a dictionary word (e.g. 0/o, rn/m).\n"
+     "Uses the word list in OCR_DICTIONARY or the system word list", False),
+]
 
 class OCRApp(QMainWindow):
     def __init__(self):
@@ -28,10 +81,161 @@ class OCRApp(QMainWindow):
         self.setGeometry(100, 100, 800, 600)
         
         self.image_path = None
+        self.screenshot_image = None  # Captured QImage, kept in memory only
         self.extracted_text = ""
         self.is_screenshot = False  # Flag to track if current image is a screenshot
         
+        # Result cache, background OCR engine and history, created on first use
+        self._ocr_cache = None
+        self._ocr_engine = None
+        self._history = None
+        # Created on first use and reused for every screenshot and watch selection
+        self._screen_capture = None
+        self.watch_selector = None
+        
+        # Run once the window is minimized, before a screen capture
+        self.after_minimize = None
+        self.minimize_timer = QTimer(self)
+        self.minimize_timer.setSingleShot(True)
+        self.minimize_timer.setInterval(MINIMIZE_TIMEOUT_MS)
+        self.minimize_timer.timeout.connect(self.run_after_minimize)
+        
+        # The quick capture in progress: its timing run, the time its last
+        # stage ended, its OCR job and whether to bring the window back after
+        self.quick_capture_run = None
+        self.quick_capture_mark = 0
+        self.quick_capture_job = None
+        self.quick_capture_restore = False
+        self.global_hotkey = None
+        
+        self.structured_result = None  # Word boxes of the last structured extraction
+        # Maps job id -> (image source, is screenshot)
+        self.ocr_jobs = {}
+        self.document_jobs = set()  # Ids of multi-page jobs
+        self.preprocess_timings = {}  # job id -> {step: ms}
+        self.prepass_decisions = {}  # job id -> [prepass.Decision], one per page
+        self.job_traces = {}  # job id -> instrumentation.Run
+        self.job_settings = {}  # job id -> (config, language, engine), for the history
+        self.postprocessors = {}  # job id -> postprocessing.Postprocessor fed its text
+        
+        self.region_watcher = None
+        
+        # Previews are decoded at display size on a background thread
+        self.preview_loader = PreviewLoader(cache_bytes=IMAGE_CACHE_BYTES, parent=self)
+        self.preview_loader.preview_ready.connect(self.on_preview_ready)
+        self.preview_loader.preview_failed.connect(self.on_preview_failed)
+        self.preview_source = None  # Path or QImage being previewed
+        self.preview_image = None  # Its downscaled QImage, rescaled on resize
+        self.preview_request = None  # (request id, instrumentation.Run) being waited for
+        self.preview_resize_timer = QTimer(self)
+        self.preview_resize_timer.setSingleShot(True)
+        self.preview_resize_timer.setInterval(150)
+        self.preview_resize_timer.timeout.connect(self.refresh_preview)
+        
+        # The OCR engine is warmed up again once the engine or language settles
+        self.warm_up_timer = QTimer(self)
+        self.warm_up_timer.setSingleShot(True)
+        self.warm_up_timer.setInterval(500)
+        self.warm_up_timer.timeout.connect(self.warm_up_engine)
+        
+        # History searches run once typing pauses
+        self.history_search_timer = QTimer(self)
+        self.history_search_timer.setSingleShot(True)
+        self.history_search_timer.setInterval(150)
+        self.history_search_timer.timeout.connect(self.update_history_panel)
+        
         self.init_ui()
+        
+        # Resident memory readout, so growth over a long session is visible
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(MEMORY_INTERVAL_MS)
+        self.memory_timer.timeout.connect(self.update_memory_label)
+        self.memory_timer.start()
+        self.update_memory_label()
+        
+        # Load the OCR modules and check for Tesseract once the event loop runs
+        self.startup_loader = StartupLoader(self)
+        self.startup_loader.modules_loaded.connect(self.on_modules_loaded)
+        self.startup_loader.tesseract_checked.connect(self.on_tesseract_checked)
+        self.startup_loader.languages_found.connect(self.on_languages_found)
+        QTimer.singleShot(0, self.startup_loader.start)
+    
+    @property
+    def ocr_cache(self):
+        """Cache of previous results so repeat extractions skip tesseract"""
+        if self._ocr_cache is None:
+            from ocr_cache import OCRCache, default_cache_path
+            try:
+                self._ocr_cache = OCRCache(db_path=default_cache_path())
+            except Exception as e:
+                print(f"Error opening OCR cache, using memory only: {str(e)}")
+                self._ocr_cache = OCRCache()
+        return self._ocr_cache
+    
+    @property
+    def history(self):
+        """Searchable store of past extractions"""
+        if self._history is None:
+            from history import HistoryStore, default_history_path
+            try:
+                self._history = HistoryStore(default_history_path())
+            except Exception as e:
+                print(f"Error opening history, keeping it in memory only: {str(e)}")
+                self._history = HistoryStore(":memory:")
+        return self._history
+    
+    @property
+    def screen_capture(self):
+        """Screen capture session shared by all screenshots"""
+        if self._screen_capture is None:
+            from alt_screenshot import ScreenCapture
+            self._screen_capture = ScreenCapture()
+            self._screen_capture.screenshot_taken.connect(self.process_screenshot)
+        return self._screen_capture
+    
+    @property
+    def ocr_engine(self):
+        """Background OCR engine"""
+        if self._ocr_engine is None:
+            from ocr_jobs import OCRJobEngine
+            self._ocr_engine = OCRJobEngine(cache=self.ocr_cache, parent=self)
+            self._ocr_engine.job_progress.connect(self.on_ocr_progress)
+            self._ocr_engine.job_finished.connect(self.on_ocr_finished)
+            self._ocr_engine.job_failed.connect(self.on_ocr_failed)
+            self._ocr_engine.job_cancelled.connect(self.on_ocr_cancelled)
+            self._ocr_engine.job_timings.connect(self.on_ocr_timings)
+            self._ocr_engine.page_finished.connect(self.on_ocr_page)
+            self._ocr_engine.job_result.connect(self.on_ocr_result)
+            self._ocr_engine.job_prepass.connect(self.on_ocr_prepass)
+        return self._ocr_engine
+    
+    def on_modules_loaded(self, seconds):
+        import ocr_engines
+        
+        # Fill in the parts of the UI that depend on the OCR modules
+        self.engine_combo.addItems(ocr_engines.available_engines())
+        self.engine_combo.setCurrentText(ocr_engines.get_engine().name)
+        self.engine_combo.setEnabled(True)
+        self.ocr_engine  # Create the engine and cache now that imports are cheap
+        self.update_cache_stats()
+        QTimer.singleShot(0, self.prepare_quick_capture)
+    
+    def on_languages_found(self, languages):
+        typed = self.language_combo.currentText()
+        self.language_combo.clear()
+        self.language_combo.addItems(languages)
+        if typed:
+            self.language_combo.setCurrentText(typed)
+        elif "eng" in languages:
+            self.language_combo.setCurrentText("eng")
+    
+    def on_tesseract_checked(self, found, detail):
+        if not found:
+            self.statusBar().showMessage(
+                "Tesseract OCR was not found, so text extraction will fail. "
+                "See the README for installation instructions."
+            )
+            self.statusBar().setToolTip(detail)
     
     def init_ui(self):
         # Main layout
@@ -46,6 +250,8 @@ class OCRApp(QMainWindow):
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.setMinimumHeight(200)
         self.image_label.setStyleSheet("border: 1px solid #cccccc;")
+        # The preview follows the label's size, not the other way round
+        self.image_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
         image_layout.addWidget(self.image_label)
         
         # Image buttons
@@ -63,12 +269,28 @@ class OCRApp(QMainWindow):
         self.btn_extract = QPushButton("Extract Text")
         self.btn_extract.clicked.connect(self.extract_text)
         self.btn_extract.setEnabled(False)
+        self.btn_watch = QPushButton("Watch Region")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setToolTip(
+            "Select a screen region once and keep extracting its text whenever it changes.\n"
+            "Click again to stop watching."
+        )
+        self.btn_watch.toggled.connect(self.toggle_watch)
+        self.btn_quick_capture = QPushButton("Quick Capture")
+        self.btn_quick_capture.setToolTip(
+            f"Select a screen region and copy its text to the clipboard ({QUICK_CAPTURE_SHORTCUT})."
+        )
+        self.btn_quick_capture.clicked.connect(self.quick_capture)
+        QShortcut(QKeySequence(QUICK_CAPTURE_SHORTCUT), self, self.quick_capture,
+                  context=Qt.ApplicationShortcut)
         
         btn_layout.addWidget(self.btn_load_image)
         btn_layout.addWidget(self.btn_screenshot)
+        btn_layout.addWidget(self.btn_quick_capture)
         btn_layout.addWidget(self.btn_recapture)
         btn_layout.addWidget(self.btn_remove_image)
         btn_layout.addWidget(self.btn_extract)
+        btn_layout.addWidget(self.btn_watch)
         
         image_layout.addLayout(btn_layout)
         
@@ -76,22 +298,146 @@ class OCRApp(QMainWindow):
         self.auto_cleanup_checkbox = QCheckBox("Auto-remove screenshots after text extraction")
         self.auto_cleanup_checkbox.setChecked(True)  # Default to checked
         self.auto_cleanup_checkbox.setToolTip(
-            "When checked, screenshots taken with the app will be automatically deleted after text extraction.\n"
+            "When checked, screenshots taken with the app will be automatically removed after text extraction.\n"
             "This does not affect images loaded from files."
         )
         image_layout.addWidget(self.auto_cleanup_checkbox)
         
+        # Screenshots stay in memory unless the user asks to keep them
+        self.keep_screenshots_checkbox = QCheckBox("Save screenshots to disk")
+        self.keep_screenshots_checkbox.setChecked(False)
+        self.keep_screenshots_checkbox.setToolTip(
+            "When checked, each screenshot is also saved as screenshot_<timestamp>.png in the current folder.\n"
+            "Saved files are never deleted by the app."
+        )
+        image_layout.addWidget(self.keep_screenshots_checkbox)
+        
+        # OCR options in labelled rows: engine, preprocessing, image checks and output
+        options_layout = QGridLayout()
+        options_layout.setColumnStretch(1, 1)
+        engine_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("OCR engine:"), 0, 0)
+        self.engine_combo = QComboBox()
+        self.engine_combo.setEnabled(False)  # Filled in once the OCR modules are loaded
+        self.engine_combo.setToolTip(
+            "subprocess: starts tesseract for every extraction.\n"
+            "tesserocr: keeps Tesseract loaded between extractions (requires the tesserocr package)."
+        )
+        self.engine_combo.currentTextChanged.connect(self.warm_up_timer.start)
+        engine_layout.addWidget(self.engine_combo)
+        
+        # Language and layout; several languages are joined with "+"
+        engine_layout.addWidget(QLabel("Language:"))
+        self.language_combo = QComboBox()
+        self.language_combo.setEditable(True)
+        self.language_combo.setMinimumWidth(90)
+        self.language_combo.setToolTip(
+            "Installed Tesseract language. For mixed-language text, combine them\n"
+            "with \"+\", for example eng+deu. Leave empty for Tesseract's default."
+        )
+        self.language_combo.currentTextChanged.connect(self.warm_up_timer.start)
+        engine_layout.addWidget(self.language_combo)
+        engine_layout.addWidget(QLabel("Layout:"))
+        self.layout_combo = QComboBox()
+        for label, psm in LAYOUT_OPTIONS:
+            self.layout_combo.addItem(label, psm)
+        self.layout_combo.setToolTip(
+            "Auto reads one-line captures as a single line, which skips Tesseract's\n"
+            "page layout analysis, and everything else as a block of text."
+        )
+        engine_layout.addWidget(self.layout_combo)
+        engine_layout.addStretch()
+        options_layout.addLayout(engine_layout, 0, 1)
+        
+        # Optional preprocessing steps; grayscale conversion always runs
+        preprocess_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Preprocessing:"), 1, 0)
+        self.preprocess_checkboxes = {}
+        for step, label, tooltip, default in PREPROCESS_OPTIONS:
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(default)
+            checkbox.setToolTip(tooltip)
+            preprocess_layout.addWidget(checkbox)
+            self.preprocess_checkboxes[step] = checkbox
+        preprocess_layout.addStretch()
+        options_layout.addLayout(preprocess_layout, 1, 1)
+        
+        # How whole images are handled before OCR
+        images_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Images:"), 2, 0)
+        self.tile_checkbox = QCheckBox("Split large images")
+        self.tile_checkbox.setChecked(True)
+        self.tile_checkbox.setToolTip(
+            "Very large images are cut into bands between text lines and OCRed in parallel."
+        )
+        images_layout.addWidget(self.tile_checkbox)
+        self.prepass_checkbox = QCheckBox("Skip blank / fix rotation")
+        self.prepass_checkbox.setChecked(True)
+        self.prepass_checkbox.setToolTip(
+            "Check each image before OCR: blank captures and pictures without text are\n"
+            "skipped, and scans turned sideways or upside down are rotated upright\n"
+            "(needs Tesseract's osd.traineddata)."
+        )
+        images_layout.addWidget(self.prepass_checkbox)
+        images_layout.addStretch()
+        options_layout.addLayout(images_layout, 2, 1)
+        
+        output_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Output:"), 3, 0)
+        self.structured_checkbox = QCheckBox("Keep word positions")
+        self.structured_checkbox.setChecked(False)
+        self.structured_checkbox.setToolTip(
+            "Also record the position and confidence of every word, so the result can be\n"
+            "exported as JSON, hOCR or a searchable PDF. Not used for multi-page documents."
+        )
+        output_layout.addWidget(self.structured_checkbox)
+        output_layout.addStretch()
+        options_layout.addLayout(output_layout, 3, 1)
+        image_layout.addLayout(options_layout)
+        
+        # Extraction progress
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.btn_cancel = QPushButton("Cancel Extraction")
+        self.btn_cancel.clicked.connect(self.cancel_extraction)
+        self.btn_cancel.setEnabled(False)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.btn_cancel)
+        image_layout.addLayout(progress_layout)
+        
         image_group.setLayout(image_layout)
-        main_layout.addWidget(image_group)
+        main_layout.addWidget(image_group, 1)  # Extra height goes to the preview and text
         
         # Text group
         text_group = QGroupBox("Extracted Text")
         text_layout = QVBoxLayout()
         
-        # Text display
+        # Clean-up of the recognized text, applied before it is shown
+        postprocess_layout = QHBoxLayout()
+        postprocess_layout.addWidget(QLabel("Clean up:"))
+        self.postprocess_checkboxes = {}
+        for step, label, tooltip, default in POSTPROCESS_OPTIONS:
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(default)
+            checkbox.setToolTip(tooltip)
+            postprocess_layout.addWidget(checkbox)
+            self.postprocess_checkboxes[step] = checkbox
+        if postprocessing.dictionary_path() is None:
+            correct_checkbox = self.postprocess_checkboxes["correct"]
+            correct_checkbox.setChecked(False)
+            correct_checkbox.setEnabled(False)
+            correct_checkbox.setToolTip("No word list found. Set OCR_DICTIONARY to a file with "
+                                        "one word per line to enable correction.")
+        postprocess_layout.addStretch()
+        text_layout.addLayout(postprocess_layout)
+        
+        # Text display; updates rewrite only the paragraphs that changed
         self.text_display = QTextEdit()
         self.text_display.setReadOnly(False)
         self.text_display.setMinimumHeight(200)
+        self.text_output = TextOutput(self.text_display)
         text_layout.addWidget(self.text_display)
         
         # Text buttons
@@ -102,13 +448,91 @@ class OCRApp(QMainWindow):
         self.btn_save = QPushButton("Save to File")
         self.btn_save.clicked.connect(self.save_to_file)
         self.btn_save.setEnabled(False)
+        self.btn_export = QPushButton("Export Words...")
+        self.btn_export.setToolTip("Save word positions as JSON, hOCR or a searchable PDF")
+        self.btn_export.clicked.connect(self.export_structured)
+        self.btn_export.setEnabled(False)
         
         text_btn_layout.addWidget(self.btn_copy)
         text_btn_layout.addWidget(self.btn_save)
+        text_btn_layout.addWidget(self.btn_export)
         
         text_layout.addLayout(text_btn_layout)
         text_group.setLayout(text_layout)
-        main_layout.addWidget(text_group)
+        main_layout.addWidget(text_group, 1)
+        
+        # Timing panel, collapsed until checked
+        self.timing_group = QGroupBox("Timings")
+        self.timing_group.setCheckable(True)
+        self.timing_group.setChecked(False)
+        timing_layout = QVBoxLayout()
+        self.timing_tree = QTreeWidget()
+        self.timing_tree.setHeaderLabels(["Run / stage", "ms"])
+        self.timing_tree.setColumnWidth(0, 320)
+        self.timing_tree.setMinimumHeight(150)
+        timing_layout.addWidget(self.timing_tree)
+        
+        timing_btn_layout = QHBoxLayout()
+        self.btn_export_trace = QPushButton("Export Trace...")
+        self.btn_export_trace.setToolTip("Save the recorded timings in Chrome trace format "
+                                         "(open in chrome://tracing or ui.perfetto.dev)")
+        self.btn_export_trace.clicked.connect(self.export_trace)
+        self.btn_clear_timings = QPushButton("Clear")
+        self.btn_clear_timings.clicked.connect(self.clear_timings)
+        timing_btn_layout.addWidget(self.btn_export_trace)
+        timing_btn_layout.addWidget(self.btn_clear_timings)
+        timing_layout.addLayout(timing_btn_layout)
+        
+        self.timing_contents = QWidget()
+        self.timing_contents.setLayout(timing_layout)
+        self.timing_contents.setVisible(False)
+        self.timing_group.toggled.connect(self.toggle_timings)
+        group_layout = QVBoxLayout()
+        group_layout.addWidget(self.timing_contents)
+        self.timing_group.setLayout(group_layout)
+        main_layout.addWidget(self.timing_group)
+        
+        # History panel, collapsed until checked
+        self.history_group = QGroupBox("History")
+        self.history_group.setCheckable(True)
+        self.history_group.setChecked(False)
+        history_layout = QVBoxLayout()
+        self.history_search = QLineEdit()
+        self.history_search.setPlaceholderText("Search past extractions...")
+        self.history_search.setClearButtonEnabled(True)
+        self.history_search.textChanged.connect(self.history_search_timer.start)
+        history_layout.addWidget(self.history_search)
+        self.history_list = QListWidget()
+        self.history_list.setIconSize(QSize(HISTORY_THUMBNAIL_SIZE, HISTORY_THUMBNAIL_SIZE))
+        self.history_list.setMinimumHeight(150)
+        self.history_list.itemActivated.connect(self.show_history_entry)
+        self.history_list.itemClicked.connect(self.show_history_entry)
+        history_layout.addWidget(self.history_list)
+        
+        history_btn_layout = QHBoxLayout()
+        self.btn_delete_history = QPushButton("Delete")
+        self.btn_delete_history.setToolTip("Remove the selected extraction from the history")
+        self.btn_delete_history.clicked.connect(self.delete_history_entry)
+        self.btn_clear_history = QPushButton("Clear History")
+        self.btn_clear_history.clicked.connect(self.clear_history)
+        history_btn_layout.addWidget(self.btn_delete_history)
+        history_btn_layout.addWidget(self.btn_clear_history)
+        history_layout.addLayout(history_btn_layout)
+        
+        self.history_contents = QWidget()
+        self.history_contents.setLayout(history_layout)
+        self.history_contents.setVisible(False)
+        self.history_group.toggled.connect(self.toggle_history)
+        group_layout = QVBoxLayout()
+        group_layout.addWidget(self.history_contents)
+        self.history_group.setLayout(group_layout)
+        main_layout.addWidget(self.history_group)
+        
+        # Cache statistics in the status bar
+        self.cache_label = QLabel("Cache: loading...")
+        self.statusBar().addPermanentWidget(self.cache_label)
+        self.memory_label = QLabel("Memory: n/a")
+        self.statusBar().addPermanentWidget(self.memory_label)
         
         # Set central widget
         central_widget = QWidget()
@@ -116,13 +540,17 @@ class OCRApp(QMainWindow):
         self.setCentralWidget(central_widget)
     
     def load_image(self):
+        import ocr_core
+        
         file_dialog = QFileDialog()
+        patterns = " ".join(f"*{ext}" for ext in ocr_core.IMAGE_EXTENSIONS)
         image_path, _ = file_dialog.getOpenFileName(
-            self, "Open Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp *.tiff)"
+            self, "Open Image", "", f"Image Files ({patterns});;PDF Documents (*.pdf)"
         )
         
         if image_path:
             self.image_path = image_path
+            self.screenshot_image = None
             self.is_screenshot = False  # Mark as not a screenshot
             self.display_image(image_path)
             self.btn_extract.setEnabled(True)
@@ -131,63 +559,82 @@ class OCRApp(QMainWindow):
     
     def take_screenshot(self):
         # Minimize the window to avoid it being in the screenshot
+        self.minimize_then(self._take_screenshot)
+    
+    def minimize_then(self, callback):
+        """Minimize the window and call callback as soon as it is off screen"""
+        self.after_minimize = callback
+        if not self.isVisible() or self.isMinimized():
+            self.check_minimized()
+            return
         self.showMinimized()
-        
-        # Add a small delay to ensure the window is minimized
-        QTimer.singleShot(500, self._take_screenshot)
+        self.minimize_timer.start()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange and self.isMinimized():
+            self.check_minimized()
+    
+    def check_minimized(self):
+        if self.after_minimize is None:
+            return
+        # The state changes when minimizing starts; wait until nothing is shown
+        handle = self.windowHandle()
+        if not self.isVisible() or handle is None or not handle.isExposed():
+            self.run_after_minimize()
+        else:
+            QTimer.singleShot(MINIMIZE_POLL_MS, self.check_minimized)
+    
+    def run_after_minimize(self):
+        self.minimize_timer.stop()
+        callback, self.after_minimize = self.after_minimize, None
+        if callback is not None:
+            callback()
     
     def recapture_screenshot(self):
         """Recapture a screenshot if the previous one was not satisfactory"""
-        # First remove the current screenshot if it exists
-        if self.is_screenshot and self.image_path and os.path.exists(self.image_path):
-            try:
-                os.remove(self.image_path)
-            except Exception as e:
-                print(f"Error deleting previous screenshot: {str(e)}")
-        
-        # Now take a new screenshot
+        # The previous capture only lives in memory, so it is simply replaced
         self.take_screenshot()
     
     def _take_screenshot(self):
-        self.screen_capture = ScreenCapture()
-        self.screen_capture.screenshot_taken.connect(self.process_screenshot)
         self.screen_capture.start()
     
     def process_screenshot(self, screenshot):
+        quick = self.quick_capture_run is not None
+        if quick:
+            self.quick_capture_stage("select")
         if screenshot is not None:
-            # Generate a temporary filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            temp_path = f"screenshot_{timestamp}.png"
-            
-            # Save the screenshot
-            screenshot.save(temp_path)
-            self.image_path = temp_path
+            # Keep the captured pixels in memory; preview and OCR both use them
+            self.screenshot_image = screenshot
+            self.image_path = None
             self.is_screenshot = True  # Mark as a screenshot
-            self.display_image(temp_path)
+            
+            # Only write a file when the user asked to keep screenshots
+            if self.keep_screenshots_checkbox.isChecked():
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                temp_path = f"screenshot_{timestamp}.png"
+                if screenshot.save(temp_path):
+                    self.image_path = temp_path
+                else:
+                    print(f"Error saving screenshot file: {temp_path}")
+            
+            self.display_image(screenshot)
             self.btn_extract.setEnabled(True)
             self.btn_remove_image.setEnabled(True)
             self.btn_recapture.setEnabled(True)  # Enable recapture for screenshots
+            if quick:
+                self.quick_capture_job = self.extract_text()
+        elif quick:
+            self.end_quick_capture("cancelled")
         
-        # Restore window state
-        self.showNormal()
-        self.activateWindow()  # Bring window to front
+        # Restore window state; a quick capture started while minimized stays out of the way
+        if not quick or self.quick_capture_restore:
+            self.showNormal()
+            self.activateWindow()  # Bring window to front
     
     def remove_image(self):
-        # Store screenshot path before clearing
-        screenshot_to_delete = None
-        if self.is_screenshot and self.image_path and os.path.exists(self.image_path):
-            screenshot_to_delete = self.image_path
-        
         # Clear the image
-        self.image_path = None
-        self.is_screenshot = False
-        self.image_label.setText("No image selected")
-        self.image_label.setPixmap(QPixmap())  # Clear the pixmap
-        
-        # Disable buttons that require an image
-        self.btn_extract.setEnabled(False)
-        self.btn_remove_image.setEnabled(False)
-        self.btn_recapture.setEnabled(False)
+        self.clear_image()
         
         # Also clear text if there was any
         if self.text_display.toPlainText():
@@ -197,79 +644,639 @@ class OCRApp(QMainWindow):
                 self.text_display.clear()
                 self.btn_copy.setEnabled(False)
                 self.btn_save.setEnabled(False)
+    
+    def clear_image(self):
+        """Forget the current image and reset the preview"""
+        self.image_path = None
+        self.screenshot_image = None
+        self.is_screenshot = False
+        self.preview_source = None
+        self.preview_image = None
+        self.preview_request = None
+        self.image_label.setText("No image selected")
+        self.image_label.setPixmap(QPixmap())  # Clear the pixmap
+        
+        # Disable buttons that require an image
+        self.btn_extract.setEnabled(False)
+        self.btn_remove_image.setEnabled(False)
+        self.btn_recapture.setEnabled(False)
+    
+    def display_image(self, source):
+        """Show a preview of an image file path or an in-memory QImage"""
+        import documents
         
-        # Delete the screenshot file if it exists
-        if screenshot_to_delete:
+        if not isinstance(source, QImage) and documents.is_pdf(source):
+            # PDFs are only rendered page by page during extraction
             try:
-                os.remove(screenshot_to_delete)
+                pages = documents.page_count(source)
+                self.image_label.setText(f"{os.path.basename(source)}\n{pages} page(s)")
             except Exception as e:
-                print(f"Error deleting screenshot file: {str(e)}")
-    
-    def display_image(self, image_path):
-        pixmap = QPixmap(image_path)
+                self.image_label.setText(f"{os.path.basename(source)}\n{str(e)}")
+            self.image_label.setPixmap(QPixmap())
+            self.preview_source = None
+            self.preview_image = None
+            self.preview_request = None
+            return
         
-        # Scale pixmap to fit the label while maintaining aspect ratio
-        scaled_pixmap = pixmap.scaled(
-            self.image_label.width(), self.image_label.height(), 
-            Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-        )
+        self.preview_source = source
+        self.preview_image = None
+        self.request_preview()
+    
+    def request_preview(self):
+        """Show the cached preview for the current size, or decode one in the background"""
+        source = self.preview_source
+        run = TRACER.begin_run("preview " + ("screenshot" if isinstance(source, QImage)
+                                             else os.path.basename(source)))
+        if not isinstance(source, QImage):
+            cached = self.preview_loader.cached(source, self.image_label.size())
+            if cached is not None:
+                self.preview_request = None
+                self.show_preview(cached, run)
+                return
         
-        self.image_label.setPixmap(scaled_pixmap)
+        if self.preview_image is None:
+            self.image_label.setPixmap(QPixmap())
+            self.image_label.setText("Loading preview...")
+        request_id = self.preview_loader.request(source, self.image_label.size(), trace=run)
+        self.preview_request = (request_id, run)
+    
+    def on_preview_ready(self, request_id, image):
+        if self.preview_request is None or self.preview_request[0] != request_id:
+            return  # The image was changed or removed meanwhile
+        _, run = self.preview_request
+        self.preview_request = None
+        self.show_preview(image, run)
+    
+    def on_preview_failed(self, request_id, message):
+        if self.preview_request is None or self.preview_request[0] != request_id:
+            return
+        _, run = self.preview_request
+        self.preview_request = None
+        run.finish("failed")
+        self.image_label.setPixmap(QPixmap())
+        self.image_label.setText(f"Cannot preview this image\n{message}")
+    
+    def show_preview(self, image, run=None):
+        """Scale a decoded preview to the label while maintaining aspect ratio"""
+        self.preview_image = image
+        scaled = image.scaled(self.image_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                              Qt.TransformationMode.SmoothTransformation)
+        self.image_label.setPixmap(QPixmap.fromImage(scaled))
         self.image_label.setAlignment(Qt.AlignCenter)
+        if run is not None:
+            run.finish()
+            self.update_timing_panel()
+    
+    def refresh_preview(self):
+        """After a resize, decode a sharper preview if the label outgrew the current one"""
+        if self.preview_source is None or self.preview_image is None:
+            return
+        if isinstance(self.preview_source, QImage):
+            needed = fitted_size(self.preview_source.size(), preview_box(self.image_label.size()))
+            if (self.preview_image.width() < needed.width()
+                    and self.preview_image.height() < needed.height()):
+                self.request_preview()
+        else:
+            # Served from the preview cache unless a larger decode is needed
+            self.request_preview()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.preview_image is not None:
+            # Rescale the small in-memory preview; nothing is read from disk
+            self.show_preview(self.preview_image)
+            self.preview_resize_timer.start()
     
     def extract_text(self):
-        if not self.image_path:
+        source = self.screenshot_image if self.is_screenshot else self.image_path
+        if source is None:
             QMessageBox.warning(self, "Warning", "No image selected.")
             return
         
+        # Timed from here to the text being shown; finished in finish_job
+        run = TRACER.begin_run("extract " + ("screenshot" if self.is_screenshot
+                                             else os.path.basename(source)))
+        
+        # Hand the image to the background engine; results arrive via signals
+        if not self.is_screenshot and self.is_document(source):
+            # Multi-page files stream into the text box page by page
+            job_id = self.ocr_engine.submit_document(source, config=self.ocr_config(),
+                                                     lang=self.ocr_language(),
+                                                     engine=self.engine_combo.currentText() or None,
+                                                     steps=self.preprocess_steps(), trace=run,
+                                                     prepass=self.prepass_checkbox.isChecked())
+            self.document_jobs.add(job_id)
+            self.text_display.clear()
+        else:
+            job_id = self.ocr_engine.submit(source, config=self.ocr_config(),
+                                            lang=self.ocr_language(),
+                                            engine=self.engine_combo.currentText() or None,
+                                            steps=self.preprocess_steps(),
+                                            tile=self.tile_checkbox.isChecked(),
+                                            structured=self.structured_checkbox.isChecked(),
+                                            trace=run,
+                                            prepass=self.prepass_checkbox.isChecked())
+        self.ocr_jobs[job_id] = (source, self.is_screenshot)
+        self.job_traces[job_id] = run
+        self.job_settings[job_id] = (self.ocr_config(), self.ocr_language(),
+                                     self.engine_combo.currentText() or None)
+        # Clean-up settings are fixed when the job starts; pages stream through one processor
+        self.postprocessors[job_id] = self.make_postprocessor()
+        self.progress_bar.setValue(0)
+        self.update_job_status()
+        return job_id
+    
+    def is_document(self, path):
+        import documents
+        
+        try:
+            return documents.is_document(path)
+        except Exception as e:
+            print(f"Error reading document: {str(e)}")
+            return False
+    
+    def on_ocr_page(self, job_id, index, total, text):
+        if job_id not in self.ocr_jobs:
+            return
+        with self.job_stage(job_id, "postprocess"):
+            # Append the page at the end without re-laying out earlier pages. Lines
+            # the processor holds back, such as a word hyphenated across the page
+            # break, come out with the next page or when the job finishes
+            header = f"--- Page {index + 1} of {total} ---\n"
+            lines = self.postprocessors[job_id].feed(text.rstrip("\n\f") + "\n")
+            self.text_output.append((header if index == 0 else "\n" + header)
+                                    + "".join(line + "\n" for line in lines))
+        self.btn_copy.setEnabled(True)
+        self.btn_save.setEnabled(True)
+    
+    def ocr_language(self):
+        """Language selected in the UI, e.g. "eng+deu", or None for the default"""
+        return self.language_combo.currentText().strip() or None
+    
+    def ocr_config(self):
+        import ocr_core
+        
+        return ocr_core.make_config(psm=self.layout_combo.currentData())
+    
+    def make_postprocessor(self):
+        """A Postprocessor for the clean-up steps selected in the UI"""
+        steps = [step for step, checkbox in self.postprocess_checkboxes.items()
+                 if checkbox.isChecked()]
+        dictionary = None
+        if "correct" in steps:
+            path = postprocessing.dictionary_path()
+            dictionary = postprocessing.load_dictionary(path) if path else None
+        return postprocessing.Postprocessor(steps, dictionary)
+    
+    def postprocess(self, text, processor=None):
+        """Clean up a complete text, with a job's processor or one for the current settings"""
+        processor = processor or self.make_postprocessor()
+        if not processor.stages:
+            return text
+        lines = processor.feed(text)
+        lines.extend(processor.finish())
+        return "\n".join(lines)
+    
+    def preprocess_steps(self):
+        """Preprocessing steps selected in the UI, in pipeline order"""
+        return ["grayscale"] + [step for step, checkbox in self.preprocess_checkboxes.items()
+                                if checkbox.isChecked()]
+    
+    def cancel_extraction(self):
+        """Cancel every queued or running OCR job"""
+        self.ocr_engine.cancel_all()
+    
+    def update_job_status(self):
+        in_flight = len(self.ocr_jobs)
+        self.btn_cancel.setEnabled(in_flight > 0)
+        if in_flight:
+            self.statusBar().showMessage(f"Extracting text... ({in_flight} job(s) in progress)")
+        else:
+            self.statusBar().clearMessage()
+    
+    def update_cache_stats(self):
+        stats = self.ocr_cache.stats()
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        self.cache_label.setText(f"Cache: {hits} hits / {stats['misses']} misses")
+        self.cache_label.setToolTip(
+            f"Memory hits: {stats['memory_hits']}\n"
+            f"Disk hits: {stats['disk_hits']}\n"
+            f"Misses: {stats['misses']}\n"
+            f"Memory entries: {stats['memory_entries']} ({stats['memory_bytes'] // 1024} KB)\n"
+            f"Disk entries: {stats.get('disk_entries', 0)} ({stats.get('disk_bytes', 0) // 1024} KB)"
+        )
+    
+    def update_memory_label(self):
+        rss = memory.rss_bytes()
+        peak = memory.peak_rss_bytes()
+        self.memory_label.setText(f"Memory: {memory.format_bytes(rss)} "
+                                  f"(peak {memory.format_bytes(peak)})")
+        cache = self.preview_loader.cache
+        waiting = sum(1 for source, _ in self.ocr_jobs.values() if isinstance(source, QImage))
+        self.memory_label.setToolTip(
+            "Resident memory of the app now, and the most it has used.\n"
+            f"Preview cache: {memory.format_bytes(cache.total_bytes())} "
+            f"of {memory.format_bytes(cache.max_bytes)}\n"
+            f"Screenshots waiting for OCR: {waiting}"
+        )
+    
+    def on_ocr_progress(self, job_id, percent):
+        # Only the most recent job drives the progress bar
+        if self.ocr_jobs and job_id == max(self.ocr_jobs):
+            self.progress_bar.setValue(percent)
+    
+    def on_ocr_finished(self, job_id, text):
+        if job_id not in self.ocr_jobs:
+            return
+        source, is_screenshot = self.ocr_jobs[job_id]
+        
+        # Update text display; documents were already streamed in page by page
+        processor = self.postprocessors.get(job_id)
+        if job_id in self.document_jobs:
+            with self.job_stage(job_id, "postprocess"):
+                held_back = processor.finish() if processor is not None else []
+                if held_back:
+                    self.text_output.append("".join(line + "\n" for line in held_back))
+            self.extracted_text = self.text_display.toPlainText()
+        else:
+            with self.job_stage(job_id, "postprocess"):
+                self.extracted_text = self.postprocess(text, processor)
+                self.text_output.set_text(self.extracted_text)
+        
+        # Word positions only belong to the job that produced them
+        if self.structured_result is not None and self.structured_result[0] != job_id:
+            self.structured_result = None
+        self.btn_export.setEnabled(self.structured_result is not None)
+        
+        # Enable buttons
+        self.btn_copy.setEnabled(True)
+        self.btn_save.setEnabled(True)
+        
+        # Recorded before auto cleanup, which drops the preview used as thumbnail
+        self.record_history(job_id, source, self.extracted_text)
+        
+        # Auto cleanup screenshot if enabled and it's a screenshot
+        if self.auto_cleanup_checkbox.isChecked() and is_screenshot and self.screenshot_image is source:
+            self.clear_image()
+        
+        timings = self.preprocess_timings.get(job_id, {})
+        decisions = self.prepass_decisions.get(job_id, [])
+        is_document = job_id in self.document_jobs
+        is_quick_capture = job_id == self.quick_capture_job
+        self.finish_job(job_id)
+        self.update_cache_stats()
+        if is_quick_capture:
+            self.finish_quick_capture()
+            return
+        
+        skipped = [decision for decision in decisions if decision.skip]
+        rotated = [decision for decision in decisions if decision.rotation]
+        if skipped and not is_document:
+            self.statusBar().showMessage(f"No text found, OCR skipped: {skipped[0]}", 5000)
+            return
+        message = "Text extracted successfully!"
+        if rotated:
+            message += (f" Turned {len(rotated)} page(s) upright." if is_document
+                        else f" Rotated {rotated[0].rotation}° to read it upright.")
+        if skipped:
+            message += f" Skipped {len(skipped)} blank page(s)."
+        if timings:
+            steps = ", ".join(f"{step} {ms:.0f} ms" for step, ms in timings.items())
+            message += f" Preprocessing: {steps}"
+        self.statusBar().showMessage(message, 5000)
+    
+    def on_ocr_result(self, job_id, result):
+        if job_id in self.ocr_jobs:
+            self.structured_result = (job_id, result)
+    
+    def on_ocr_prepass(self, job_id, decision):
+        if job_id in self.ocr_jobs:
+            self.prepass_decisions.setdefault(job_id, []).append(decision)
+    
+    def on_ocr_timings(self, job_id, timings):
+        if job_id in self.ocr_jobs:
+            self.preprocess_timings[job_id] = timings
+    
+    def on_ocr_failed(self, job_id, message):
+        if job_id not in self.ocr_jobs:
+            return
+        self.finish_job(job_id, "failed")
+        QMessageBox.critical(self, "Error", f"Failed to extract text: {message}")
+    
+    def on_ocr_cancelled(self, job_id):
+        if job_id not in self.ocr_jobs:
+            return
+        self.finish_job(job_id, "cancelled")
+        self.statusBar().showMessage("Text extraction cancelled", 5000)
+    
+    def finish_job(self, job_id, status="ok"):
+        """Forget a completed job, releasing its image"""
+        del self.ocr_jobs[job_id]
+        if job_id == self.quick_capture_job and status != "ok":
+            self.end_quick_capture(status)
+        self.preprocess_timings.pop(job_id, None)
+        self.prepass_decisions.pop(job_id, None)
+        self.job_settings.pop(job_id, None)
+        self.postprocessors.pop(job_id, None)
+        self.document_jobs.discard(job_id)
+        run = self.job_traces.pop(job_id, None)
+        if run is not None:
+            run.finish(status)
+            self.update_timing_panel()
+        if not self.ocr_jobs:
+            self.progress_bar.setValue(0)
+            # Images of finished jobs are gone; let the allocator give their pages back
+            memory.release_freed_memory()
+        self.update_job_status()
+    
+    def job_stage(self, job_id, name):
+        """Time a GUI-side stage of a job, if it is being traced"""
+        run = self.job_traces.get(job_id)
+        return run.stage(name) if run is not None else contextlib.nullcontext()
+    
+    def toggle_timings(self, checked):
+        self.timing_contents.setVisible(checked)
+        if checked:
+            self.update_timing_panel()
+    
+    def update_timing_panel(self):
+        """Show the most recent runs, each expandable into its stages"""
+        if not self.timing_group.isChecked():
+            return  # Rebuilt when the panel is opened
+        self.timing_tree.clear()
+        for run in TRACER.recent_runs():
+            label = run.label if run.status == "ok" else f"{run.label} ({run.status})"
+            item = QTreeWidgetItem([label, f"{run.total_ms:.1f}"])
+            stage_items = {}
+            for stage, ms in run.stages.items():
+                # "preprocess.crop" is shown under "preprocess"
+                parent_name, _, child_name = stage.rpartition(".")
+                parent = stage_items.get(parent_name, item)
+                stage_items[stage] = QTreeWidgetItem([child_name if parent is not item else stage,
+                                                      f"{ms:.1f}"])
+                parent.addChild(stage_items[stage])
+            self.timing_tree.addTopLevelItem(item)
+    
+    def clear_timings(self):
+        TRACER.clear()
+        self.timing_tree.clear()
+    
+    def export_trace(self):
+        file_dialog = QFileDialog()
+        file_path, _ = file_dialog.getSaveFileName(
+            self, "Export Trace", "ocr_trace.json", "Chrome Trace (*.json)"
+        )
+        if not file_path:
+            return
         try:
-            # Perform OCR with improved image processing
-            image = Image.open(self.image_path)
-            
-            # Improve image for better OCR results
-            # Convert to grayscale for better text recognition
-            # pytesseract works better with grayscale images
-            image = image.convert('L')
-            
-            # Use psm mode 6 (assuming a single uniform block of text)
-            # and oem mode 3 (default, based on what's available)
-            config = '--psm 6 --oem 3'
-            self.extracted_text = pytesseract.image_to_string(image, config=config)
-            
-            # Update text display
-            self.text_display.setText(self.extracted_text)
-            
-            # Enable buttons
-            self.btn_copy.setEnabled(True)
-            self.btn_save.setEnabled(True)
-            
-            # Auto cleanup screenshot if enabled and it's a screenshot
-            if self.auto_cleanup_checkbox.isChecked() and self.is_screenshot:
-                screenshot_path = self.image_path
-                self.image_path = None
-                self.is_screenshot = False
-                self.image_label.setText("No image selected")
-                self.image_label.setPixmap(QPixmap())  # Clear the pixmap
-                self.btn_extract.setEnabled(False)
-                self.btn_remove_image.setEnabled(False)
-                self.btn_recapture.setEnabled(False)
-                
-                # Delete the screenshot file
-                try:
-                    os.remove(screenshot_path)
-                except Exception as e:
-                    print(f"Error deleting screenshot file: {str(e)}")
+            TRACER.export_chrome_trace(file_path)
+            self.statusBar().showMessage(f"Trace saved to {file_path}", 5000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export trace: {str(e)}")
+    
+    def record_history(self, job_id, source, text):
+        """Queue a finished extraction for the history; written in the background"""
+        if not text.strip():
+            return
+        config, lang, engine = self.job_settings.get(job_id, (None, None, None))
+        label = "screenshot" if isinstance(source, QImage) else source
+        try:
+            self.history.add(text, label, config=config, lang=lang, engine=engine,
+                             thumbnail=self.history_thumbnail(source))
+        except Exception as e:
+            print(f"Error recording history: {str(e)}")
+            return
+        if self.history_group.isChecked():
+            self.history_search_timer.start()
+    
+    def history_thumbnail(self, source):
+        """JPEG bytes of a small picture of a job's image, or None"""
+        if self.preview_image is not None and (
+                self.preview_source is source
+                or (not isinstance(source, QImage) and self.preview_source == source)):
+            image = self.preview_image
+        elif isinstance(source, QImage):
+            image = source
+        else:
+            return None  # Not on screen any more, and not worth decoding again
+        thumbnail = image.scaled(HISTORY_THUMBNAIL_SIZE, HISTORY_THUMBNAIL_SIZE,
+                                 Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        thumbnail.save(buffer, "JPG", 80)
+        return bytes(buffer.data())
+    
+    def toggle_history(self, checked):
+        self.history_contents.setVisible(checked)
+        if checked:
+            self.update_history_panel()
+    
+    def update_history_panel(self):
+        """List past extractions matching the search box, newest first"""
+        if not self.history_group.isChecked():
+            return  # Listed when the panel is opened
+        try:
+            entries = self.history.search(self.history_search.text())
+            thumbnails = self.history.thumbnails(entry.entry_id for entry in entries)
+        except Exception as e:
+            print(f"Error searching history: {str(e)}")
+            return
+        self.history_list.clear()
+        for entry in entries:
+            when = datetime.fromtimestamp(entry.created).strftime("%Y-%m-%d %H:%M")
+            snippet = " ".join(entry.snippet.split())
+            item = QListWidgetItem(f"{when}  {os.path.basename(entry.source)}\n{snippet}")
+            item.setData(Qt.UserRole, entry.entry_id)
+            item.setToolTip(f"{entry.source}\nLanguage: {entry.lang or 'default'}, "
+                            f"engine: {entry.engine or 'default'}, options: {entry.config}")
+            data = thumbnails.get(entry.entry_id)
+            if data:
+                item.setIcon(QIcon(QPixmap.fromImage(QImage.fromData(data))))
+            self.history_list.addItem(item)
+    
+    def show_history_entry(self, item):
+        """Put the text of a past extraction back into the text box"""
+        text = self.history.text(item.data(Qt.UserRole))
+        if text is None:
+            self.update_history_panel()
+            return
+        self.extracted_text = text
+        self.text_output.set_text(text)
+        # Word positions belong to the last extraction, not this one
+        self.structured_result = None
+        self.btn_export.setEnabled(False)
+        self.btn_copy.setEnabled(True)
+        self.btn_save.setEnabled(True)
+    
+    def delete_history_entry(self):
+        item = self.history_list.currentItem()
+        if item is None:
+            return
+        self.history.delete(item.data(Qt.UserRole))
+        self.history_list.takeItem(self.history_list.row(item))
+    
+    def clear_history(self):
+        if QMessageBox.question(self, "Clear History",
+                                "Do you want to delete every saved extraction?",
+                                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            self.history.clear()
+            self.history_list.clear()
+    
+    def toggle_watch(self, checked):
+        if checked:
+            # Select the region the same way as a screenshot
+            self.minimize_then(self._select_watch_region)
+        else:
+            self.stop_watch()
+    
+    def _select_watch_region(self):
+        if self.watch_selector is None:
+            from alt_screenshot import ScreenSelector
             
-            QMessageBox.information(self, "Success", "Text extracted successfully!")
+            self.watch_selector = ScreenSelector()
+            self.watch_selector.region_selected.connect(self.start_watch)
+        self.watch_selector.start()
+    
+    def start_watch(self, region):
+        from region_watch import RegionWatcher
         
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to extract text: {str(e)}")
+        self.showNormal()
+        self.activateWindow()
+        
+        if region is None:
+            self.btn_watch.setChecked(False)
+            return
+        
+        self.region_watcher = RegionWatcher(self.ocr_engine, region,
+                                            interval_ms=WATCH_INTERVAL_MS,
+                                            engine_name=self.engine_combo.currentText() or None,
+                                            steps=self.preprocess_steps(),
+                                            lang=self.ocr_language(),
+                                            config=self.ocr_config(),
+                                            prepass=self.prepass_checkbox.isChecked(),
+                                            parent=self)
+        self.region_watcher.text_changed.connect(self.on_watch_text)
+        self.region_watcher.frame_checked.connect(self.on_watch_frame)
+        self.region_watcher.failed.connect(self.on_watch_failed)
+        self.region_watcher.start()
+        self.btn_watch.setText("Stop Watching")
+    
+    def stop_watch(self):
+        if self.region_watcher is not None:
+            self.region_watcher.stop()
+            self.region_watcher.deleteLater()
+            self.region_watcher = None
+            self.statusBar().showMessage("Stopped watching region", 5000)
+        self.btn_watch.setText("Watch Region")
+        if self.btn_watch.isChecked():
+            self.btn_watch.setChecked(False)
+    
+    def on_watch_text(self, text):
+        # Only the lines that changed since the last read are rewritten
+        self.extracted_text = self.postprocess(text)
+        self.text_output.set_text(self.extracted_text)
+        self.btn_copy.setEnabled(True)
+        self.btn_save.setEnabled(True)
+        self.update_cache_stats()
+    
+    def on_watch_frame(self, changed):
+        watcher = self.region_watcher
+        if watcher is not None:
+            self.statusBar().showMessage(
+                f"Watching region: {watcher.frames_ocred} changes read, "
+                f"{watcher.frames_skipped} unchanged frames skipped"
+            )
+    
+    def on_watch_failed(self, message):
+        self.stop_watch()
+        QMessageBox.critical(self, "Error", f"Failed to extract text: {message}")
     
     def copy_to_clipboard(self):
         if self.text_display.toPlainText():
-            pyperclip.copy(self.text_display.toPlainText())
+            run = TRACER.begin_run("clipboard")
+            self.copy_text(self.text_display.toPlainText(), run)
+            run.finish()
+            self.update_timing_panel()
             QMessageBox.information(self, "Success", "Text copied to clipboard!")
     
+    def copy_text(self, text, run):
+        """Put text on the clipboard, timed as the "copy" stage of run"""
+        import pyperclip
+        with run.stage("copy"):
+            pyperclip.copy(text)
+    
+    def prepare_quick_capture(self):
+        """Get the selection overlays and the OCR engine ready before the first quick capture"""
+        self.screen_capture.prepare()
+        self.warm_up_engine()
+        if self.global_hotkey is None:
+            self.global_hotkey = GlobalHotkey(QUICK_CAPTURE_HOTKEY, self)
+            self.global_hotkey.activated.connect(self.quick_capture)
+            if self.global_hotkey.start():
+                self.btn_quick_capture.setToolTip(
+                    "Select a screen region and copy its text to the clipboard "
+                    f"({QUICK_CAPTURE_SHORTCUT}, also when the app is in the background)."
+                )
+    
+    def warm_up_engine(self):
+        """Load the selected OCR engine and language now, not in the next extraction"""
+        self.warm_up_timer.stop()
+        if not self.engine_combo.isEnabled():
+            return  # The OCR modules are still loading
+        self.ocr_engine.warm_up(self.ocr_config(), lang=self.ocr_language(),
+                                engine=self.engine_combo.currentText() or None)
+    
+    def quick_capture(self):
+        """Select a region, extract its text and copy it to the clipboard, timing each step"""
+        if self.quick_capture_run is not None or self.after_minimize is not None:
+            return  # A capture is already under way
+        self.quick_capture_run = TRACER.begin_run("quick capture")
+        self.quick_capture_mark = self.quick_capture_run.start_ns
+        self.quick_capture_restore = self.isVisible() and not self.isMinimized()
+        self.minimize_then(self._quick_capture_select)
+    
+    def _quick_capture_select(self):
+        self.quick_capture_stage("minimize")
+        self.screen_capture.start()
+        self.quick_capture_stage("overlay")
+    
+    def quick_capture_stage(self, name):
+        """Record the time since the previous quick capture stage as the named stage"""
+        now = time.perf_counter_ns()
+        self.quick_capture_run.add(name, self.quick_capture_mark, now - self.quick_capture_mark)
+        self.quick_capture_mark = now
+    
+    def finish_quick_capture(self):
+        run = self.quick_capture_run
+        self.quick_capture_stage("ocr")
+        text = self.extracted_text
+        if text.strip():
+            try:
+                self.copy_text(text, run)
+            except Exception as e:
+                self.end_quick_capture("failed")
+                QMessageBox.critical(self, "Error", f"Failed to copy text: {str(e)}")
+                return
+        self.end_quick_capture("ok")
+        
+        # The user's own selection time is left out of the latency
+        stages = run.stages
+        latency = stages.get("ocr", 0) + stages.get("copy", 0)
+        ready = stages.get("minimize", 0) + stages.get("overlay", 0)
+        if text.strip():
+            message = f"Copied {len(text)} characters to the clipboard"
+        else:
+            message = "No text found, clipboard unchanged"
+        self.statusBar().showMessage(f"{message} {latency:.0f} ms after selecting; "
+                                     f"selection was ready {ready:.0f} ms after the shortcut", 10000)
+    
+    def end_quick_capture(self, status):
+        run, self.quick_capture_run = self.quick_capture_run, None
+        self.quick_capture_job = None
+        if run is not None:
+            run.finish(status)
+            self.update_timing_panel()
+    
     def save_to_file(self):
         if not self.text_display.toPlainText():
             QMessageBox.warning(self, "Warning", "No text to save.")
@@ -287,6 +1294,50 @@ class OCRApp(QMainWindow):
                 QMessageBox.information(self, "Success", f"Text saved to {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
+    
+    def export_structured(self):
+        if self.structured_result is None:
+            QMessageBox.warning(self, "Warning", "No word positions to export.")
+            return
+        _, result = self.structured_result
+        
+        file_dialog = QFileDialog()
+        file_path, selected_filter = file_dialog.getSaveFileName(
+            self, "Export Words", "",
+            "JSON (*.json);;hOCR (*.hocr *.html);;Searchable PDF (*.pdf)"
+        )
+        
+        if file_path:
+            try:
+                extension = os.path.splitext(file_path)[1].lower()
+                if extension == ".pdf" or (not extension and selected_filter.startswith("Searchable")):
+                    with open(file_path, 'wb') as file:
+                        file.write(result.to_pdf())
+                elif extension in (".hocr", ".html") or (not extension and selected_filter.startswith("hOCR")):
+                    with open(file_path, 'w', encoding='utf-8') as file:
+                        file.write(result.to_hocr())
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as file:
+                        file.write(result.to_json())
+                QMessageBox.information(self, "Success", f"Words exported to {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to export words: {str(e)}")
+    
+    def closeEvent(self, event):
+        # Drop queued jobs instead of waiting for them on exit
+        self.stop_watch()
+        if self.global_hotkey is not None:
+            self.global_hotkey.stop()
+        self.preview_loader.shutdown()
+        if self._ocr_engine is not None:
+            self._ocr_engine.shutdown()
+        if "ocr_engines" in sys.modules:
+            sys.modules["ocr_engines"].close_engines()
+        if self._ocr_cache is not None:
+            self._ocr_cache.close()
+        if self._history is not None:
+            self._history.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,152 @@
+"""
+Content-addressed cache for OCR results.
+
+Entries are keyed on a hash of the preprocessed pixels plus the tesseract
+config and language, so the same image always maps to the same entry no
+matter where it came from. A small in-memory LRU tier sits in front of an
+SQLite tier on disk; both evict least recently used entries once they grow
+past their size limits.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def default_cache_path():
+    """Location of the on-disk cache in the user's cache directory"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "ocr_app", "ocr_cache.sqlite3")
+
+
+class OCRCache:
+    """Two-tier LRU cache of OCR text. Safe to share between threads"""
+
+    def __init__(self, db_path=None, memory_limit=16 * 1024 * 1024, disk_limit=64 * 1024 * 1024):
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()  # key -> text, oldest first
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_cache ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ocr_cache_lru ON ocr_cache (last_used)")
+
+    @staticmethod
+    def make_key(image, config, lang=None, engine=None):
+        """
+        Hash the pixels of a PIL image together with the OCR settings and the
+        name of the engine, whose output differs in whitespace and detail
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{image.mode}|{image.size}|{config}|{lang}|{engine}|".encode())
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _entry_size(key, text):
+        return len(key) + len(text.encode("utf-8"))
+
+    def get(self, key):
+        """Return cached text for a key, or None on a miss"""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+
+            if self._db is not None:
+                row = self._db.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE ocr_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ocr_cache (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, text, self._entry_size(key, text), time.time()),
+                )
+                self._evict_disk()
+
+    def _remember(self, key, text):
+        if key in self._memory:
+            self._memory_size -= self._entry_size(key, self._memory.pop(key))
+        self._memory[key] = text
+        self._memory_size += self._entry_size(key, text)
+        while self._memory_size > self.memory_limit and len(self._memory) > 1:
+            old_key, old_text = self._memory.popitem(last=False)
+            self._memory_size -= self._entry_size(old_key, old_text)
+
+    def _evict_disk(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.disk_limit:
+            return
+        # Walk entries from least recently used and drop them until under the limit
+        excess = total - self.disk_limit
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM ocr_cache ORDER BY last_used"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM ocr_cache WHERE key = ?", doomed)
+
+    def stats(self):
+        """Hit/miss counters and tier sizes for tuning"""
+        with self._lock:
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+            }
+            if self._db is not None:
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM ocr_cache")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
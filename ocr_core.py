@@ -0,0 +1,105 @@
+"""
+Core OCR routines shared by the GUI and the background job engine.
+This module must stay free of PyQt5 imports.
+"""
+
+import re
+
+import numpy as np
+from PIL import Image
+
+import ocr_engines
+import preprocessing
+from structured import OCRResult
+
+# Use psm mode 6 (assuming a single uniform block of text)
+# and oem mode 3 (default, based on what's available)
+TESSERACT_CONFIG = '--psm 6 --oem 3'
+
+# With "--psm auto" the mode is chosen per image by choose_psm: single line
+# captures skip Tesseract's block layout analysis
+AUTO_PSM_CONFIG = '--psm auto --oem 3'
+PSM_SINGLE_BLOCK = 6
+PSM_SINGLE_LINE = 7
+
+# Image formats accepted by the GUI file dialog and the batch CLI
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+def load_image(source):
+    """Return a PIL image for a file path or an already loaded image"""
+    if isinstance(source, Image.Image):
+        return source
+    return Image.open(source)
+
+
+def preprocess_image(image, steps=None, timings=None, geometry=None):
+    """
+    Improve an image for better OCR results. steps names the preprocessing
+    steps to run (see preprocessing.STEPS); timings, if given, is filled
+    with milliseconds per step, and a preprocessing.Geometry passed as
+    geometry records how the steps moved the pixels.
+    """
+    if steps is None:
+        steps = preprocessing.DEFAULT_STEPS
+    return preprocessing.run_pipeline(image, steps=steps, timings=timings, geometry=geometry)
+
+
+def make_config(psm=None, oem=3):
+    """Tesseract command line options; psm None means choose per image"""
+    return f"--psm {'auto' if psm is None else psm} --oem {oem}"
+
+
+def choose_psm(image):
+    """Single line mode for images holding one line of text, block mode otherwise"""
+    gray = np.asarray(image if image.mode == 'L' else image.convert('L'))
+    if preprocessing.count_text_lines(gray) == 1:
+        return PSM_SINGLE_LINE
+    return PSM_SINGLE_BLOCK
+
+
+def resolve_config(image, config):
+    """Replace "--psm auto" in a config with the mode chosen for this image"""
+    if not re.search(r"--psm\s+auto\b", config or ""):
+        return config
+    return re.sub(r"--psm\s+auto\b", f"--psm {choose_psm(image)}", config)
+
+
+def recognize(image, config=TESSERACT_CONFIG, lang=None, engine=None, cache=None):
+    """Run Tesseract on a preprocessed image and return the text"""
+    config = resolve_config(image, config)
+    ocr_engine = ocr_engines.get_engine(engine)
+    if cache is None:
+        return ocr_engine.recognize(image, config, lang=lang)
+    
+    # Identical pixels with identical settings always give the same text
+    key = cache.make_key(image, config, lang, ocr_engine.name)
+    text = cache.get(key)
+    if text is None:
+        text = ocr_engine.recognize(image, config, lang=lang)
+        cache.put(key, text)
+    return text
+
+
+def recognize_structured(image, config=TESSERACT_CONFIG, lang=None, engine=None, cache=None,
+                         source=None, geometry=None):
+    """
+    Run Tesseract on a preprocessed image and return word boxes as an OCRResult.
+    Given source, the image preprocessing started from, and the Geometry it
+    recorded, the boxes are moved onto source and exports show source.
+    """
+    config = resolve_config(image, config)
+    ocr_engine = ocr_engines.get_engine(engine)
+    if cache is None:
+        tsv = ocr_engine.recognize_data(image, config, lang=lang)
+    else:
+        # Stored apart from plain text results of the same image
+        key = cache.make_key(image, f"{config} [tsv]", lang, ocr_engine.name)
+        tsv = cache.get(key)
+        if tsv is None:
+            tsv = ocr_engine.recognize_data(image, config, lang=lang)
+            cache.put(key, tsv)
+    result = OCRResult.from_tsv(tsv, image.size, image=image)
+    if source is None:
+        return result
+    return result.on_source(geometry or preprocessing.Geometry(), source)
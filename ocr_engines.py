@@ -0,0 +1,397 @@
+"""
+Interchangeable OCR engines.
+
+The subprocess engine is the classic pytesseract path: every call starts a
+new tesseract process and reloads the language data. The tesserocr engine
+keeps initialised Tesseract instances alive in a pool and reuses them, so
+small images skip the startup cost entirely.
+The tesseract executable and its tessdata folder are discovered on first
+use (environment variables, the PATH, then the usual install locations).
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import re
+import glob
+import queue
+import shlex
+import shutil
+import threading
+import subprocess
+from collections import OrderedDict
+
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+DEFAULT_ENGINE = os.environ.get("OCR_ENGINE", "subprocess")
+
+# Set Tesseract executable path - adjust this path based on your installation location
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# If you installed it in a different location, update the path accordingly
+# Examples:
+# TESSERACT_CMD = r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
+# TESSERACT_CMD = r'D:\Tesseract-OCR\tesseract.exe'
+# The TESSERACT_CMD environment variable overrides it. When neither exists,
+# tesseract is looked up on the PATH and then in these locations:
+TESSERACT_LOCATIONS = (
+    "/usr/bin/tesseract",
+    "/usr/local/bin/tesseract",
+    "/opt/homebrew/bin/tesseract",
+    "/snap/bin/tesseract",
+    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+)
+
+# Where Linux packages and source builds put the language data
+TESSDATA_LOCATIONS = (
+    "/usr/share/tesseract-ocr/*/tessdata",
+    "/usr/share/tesseract-ocr/tessdata",
+    "/usr/share/tessdata",
+    "/usr/local/share/tessdata",
+    "/usr/local/share/tesseract-ocr/tessdata",
+    "/opt/homebrew/share/tessdata",
+)
+
+# Warm tesserocr instances are released, least recently used first, when the
+# system has less free memory than this (Linux) or too many languages are loaded
+MIN_FREE_MEMORY = 512 * 1024 * 1024
+MAX_WARM_LANGUAGES = 4
+
+_discovery = {}
+_discovery_lock = threading.Lock()
+
+
+def find_tesseract():
+    """Path of the tesseract executable, or None if it cannot be found"""
+    with _discovery_lock:
+        if "cmd" not in _discovery:
+            candidates = [os.environ.get("TESSERACT_CMD"), TESSERACT_CMD, shutil.which("tesseract")]
+            candidates.extend(TESSERACT_LOCATIONS)
+            _discovery["cmd"] = next((path for path in candidates
+                                      if path and os.path.isfile(path)), None)
+        return _discovery["cmd"]
+
+
+def configure_tesseract():
+    """Point pytesseract at the discovered executable"""
+    cmd = find_tesseract()
+    if cmd:
+        pytesseract.pytesseract.tesseract_cmd = cmd
+    return cmd
+
+
+def find_tessdata():
+    """The tessdata folder holding the language files, or None"""
+    with _discovery_lock:
+        if "tessdata" in _discovery:
+            return _discovery["tessdata"]
+
+    candidates = [os.environ.get("TESSDATA_PREFIX")]
+    cmd = find_tesseract()
+    if cmd:
+        # tesseract reports the folder it actually uses
+        try:
+            output = subprocess.run([cmd, "--list-langs"], capture_output=True, text=True,
+                                    timeout=10).stdout
+            match = re.search(r'in "(.+?)"', output)
+            if match:
+                candidates.append(match.group(1))
+        except (OSError, subprocess.SubprocessError):
+            pass
+        # Windows installs keep tessdata next to the executable
+        candidates.append(os.path.join(os.path.dirname(cmd), "tessdata"))
+    for pattern in TESSDATA_LOCATIONS:
+        candidates.extend(sorted(glob.glob(pattern), reverse=True))
+
+    tessdata = None
+    for path in candidates:
+        if not path:
+            continue
+        # TESSDATA_PREFIX may name the folder or its parent
+        for folder in (path, os.path.join(path, "tessdata")):
+            if glob.glob(os.path.join(folder, "*.traineddata")):
+                tessdata = os.path.normpath(folder)
+                break
+        if tessdata:
+            break
+
+    with _discovery_lock:
+        _discovery["tessdata"] = tessdata
+    return tessdata
+
+
+def available_languages():
+    """Installed language codes, e.g. ['deu', 'eng'], without the osd data"""
+    tessdata = find_tessdata()
+    if not tessdata:
+        return []
+    names = (os.path.splitext(os.path.basename(path))[0]
+             for path in glob.glob(os.path.join(tessdata, "*.traineddata")))
+    return sorted(name for name in names if name != "osd")
+
+
+def has_osd():
+    """Whether the orientation and script detection data (osd.traineddata) is installed"""
+    tessdata = find_tessdata()
+    return bool(tessdata) and os.path.isfile(os.path.join(tessdata, "osd.traineddata"))
+
+
+def free_memory():
+    """Bytes of memory available to new allocations, or None where unknown"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+configure_tesseract()
+
+
+def parse_config(config):
+    """
+    Split a tesseract command line config into (psm, oem, variables). psm is
+    None when it is not set or is "auto" (chosen per image by ocr_core).
+    """
+    psm = None
+    oem = None
+    variables = {}
+    args = shlex.split(config or "")
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--psm" and i + 1 < len(args):
+            psm = None if args[i + 1] == "auto" else int(args[i + 1])
+            i += 1
+        elif arg == "--oem" and i + 1 < len(args):
+            oem = int(args[i + 1])
+            i += 1
+        elif arg == "-c" and i + 1 < len(args):
+            name, _, value = args[i + 1].partition("=")
+            variables[name] = value
+            i += 1
+        i += 1
+    return psm, oem, variables
+
+
+class SubprocessEngine:
+    """Runs the tesseract executable once per call through pytesseract"""
+    name = "subprocess"
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def recognize(self, image, config, lang=None):
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize_data(self, image, config, lang=None):
+        """Word-level TSV output (tesseract's image_to_data)"""
+        return pytesseract.image_to_data(image, lang=lang, config=config)
+
+    def warm_up(self, config, lang=None):
+        # Nothing stays loaded; every call starts a new tesseract process
+        pass
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    """
+    Keeps warm Tesseract instances through the tesserocr C API bindings.
+
+    Instances are pooled per (language set, oem) because both are fixed when
+    an instance is initialised; page segmentation mode and variables are set
+    per call, so one warm instance serves every psm. Variables get their
+    previous values back after each call, so results never depend on what
+    an instance ran before. Each instance is used by one thread at a time.
+    Pools are kept in least recently used order and the oldest are released
+    when memory runs low or too many are loaded.
+    """
+    name = "tesserocr"
+
+    def __init__(self, max_idle=None, tessdata_path=None, max_languages=MAX_WARM_LANGUAGES,
+                 min_free_memory=MIN_FREE_MEMORY):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.max_idle = max_idle or os.cpu_count() or 2
+        self.tessdata_path = tessdata_path or find_tessdata()
+        self.max_languages = max_languages
+        self.min_free_memory = min_free_memory
+        self._pools = OrderedDict()  # (lang, oem) -> LifoQueue of idle instances
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available():
+        return tesserocr is not None
+
+    def _pool(self, key):
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = queue.LifoQueue(maxsize=self.max_idle)
+            self._pools.move_to_end(key)
+            return self._pools[key]
+
+    def _make_room(self, key):
+        """Release the least recently used pools before loading another instance"""
+        while True:
+            with self._lock:
+                others = [other for other in self._pools if other != key]
+                if not others:
+                    return
+                free = free_memory()
+                if len(self._pools) <= self.max_languages and (
+                        free is None or free >= self.min_free_memory):
+                    return
+                pool = self._pools.pop(others[0])
+            self._end_all(pool)
+
+    @staticmethod
+    def _end_all(pool):
+        while True:
+            try:
+                pool.get_nowait().End()
+            except queue.Empty:
+                break
+
+    def warm_languages(self):
+        """(lang, oem) pairs with loaded instances, least recently used first"""
+        with self._lock:
+            return list(self._pools)
+
+    def _acquire(self, lang, oem):
+        try:
+            return self._pool((lang, oem)).get_nowait()
+        except queue.Empty:
+            self._make_room((lang, oem))
+            kwargs = {"lang": lang, "oem": oem}
+            if self.tessdata_path:
+                kwargs["path"] = self.tessdata_path
+            return tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _release(self, lang, oem, api):
+        api.Clear()
+        try:
+            self._pool((lang, oem)).put_nowait(api)
+        except queue.Full:
+            api.End()
+
+    def warm_up(self, config, lang=None):
+        """Load an instance for these settings now, so the first recognition does not wait"""
+        _, oem, _ = parse_config(config)
+        lang = lang or "eng"
+        oem = tesserocr.OEM.DEFAULT if oem is None else oem
+        self._release(lang, oem, self._acquire(lang, oem))
+
+    def recognize(self, image, config, lang=None):
+        return self._run(image, config, lang, lambda api: api.GetUTF8Text())
+
+    def recognize_data(self, image, config, lang=None):
+        """Word-level TSV output, the same columns as tesseract's image_to_data"""
+        return self._run(image, config, lang, lambda api: api.GetTSVText(0))
+
+    def _run(self, image, config, lang, read_result):
+        psm, oem, variables = parse_config(config)
+        lang = lang or "eng"
+        oem = tesserocr.OEM.DEFAULT if oem is None else oem
+
+        api = self._acquire(lang, oem)
+        previous = {}  # Values the -c variables had, restored before the instance is pooled
+        try:
+            api.SetPageSegMode(tesserocr.PSM.AUTO if psm is None else psm)
+            for name, value in variables.items():
+                old = api.GetVariableAsString(name)
+                if api.SetVariable(name, value):
+                    previous[name] = old
+            api.SetImage(image)
+            return read_result(api)
+        finally:
+            if self._restore_variables(api, previous):
+                self._release(lang, oem, api)
+            else:
+                api.End()
+
+    @staticmethod
+    def _restore_variables(api, previous):
+        """Undo a call's -c variables so they cannot leak into later calls; False if that failed"""
+        try:
+            for name, value in previous.items():
+                if value is not None and not api.SetVariable(name, value):
+                    return False
+        except Exception as e:
+            print(f"Could not reset Tesseract variables: {str(e)}")
+            return False
+        return True
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            self._end_all(pool)
+
+
+ENGINES = {
+    SubprocessEngine.name: SubprocessEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def tesseract_version():
+    """Return the installed Tesseract version; raises if the binary is missing"""
+    return str(pytesseract.get_tesseract_version())
+
+
+def detect_orientation(image, min_characters=10):
+    """
+    Tesseract's orientation and script detection. Returns (degrees to turn
+    the image clockwise to make it upright, confidence, script), or None
+    when there is too little text to decide.
+    """
+    try:
+        output = pytesseract.image_to_osd(
+            image, config=f"--psm 0 -c min_characters_to_try={min_characters}")
+    except pytesseract.TesseractError:
+        return None
+    rotate = re.search(r"Rotate:\s*(\d+)", output)
+    confidence = re.search(r"Orientation confidence:\s*([\d.]+)", output)
+    script = re.search(r"Script:\s*(\S+)", output)
+    if not rotate or not confidence:
+        return None
+    return (int(rotate.group(1)) % 360, float(confidence.group(1)),
+            script.group(1) if script else None)
+
+
+def available_engines():
+    """Names of engines that can run in this environment"""
+    return [name for name, cls in ENGINES.items() if cls.is_available()]
+
+
+def get_engine(name=None):
+    """Return the shared engine instance for a name, falling back to subprocess"""
+    name = name or DEFAULT_ENGINE
+    if name not in ENGINES or not ENGINES[name].is_available():
+        name = SubprocessEngine.name
+
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = ENGINES[name]()
+        return _instances[name]
+
+
+def close_engines():
+    with _instances_lock:
+        engines = list(_instances.values())
+        _instances.clear()
+    for engine in engines:
+        engine.close()
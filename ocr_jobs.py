@@ -0,0 +1,325 @@
+import os
+import time
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+
+import ocr_core
+import ocr_engines
+import preprocessing
+import tiling
+import prepass
+import documents
+import instrumentation
+from structured import OCRResult
+from image_bridge import qimage_to_pil
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+
+class OCRJob:
+    """A single OCR request tracked by the job engine"""
+
+    def __init__(self, job_id, source, config, lang, engine, steps, tile, structured=False,
+                 trace=None, prepass=False):
+        self.job_id = job_id
+        self.source = source
+        self.config = config
+        self.lang = lang
+        self.engine = engine
+        self.steps = steps
+        self.tile = tile
+        self.structured = structured
+        self.prepass = prepass
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.trace = trace  # instrumentation.Run covering the job from submission
+        self.owns_trace = trace is None  # Finish the run here, not in the caller
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+
+class OCRJobEngine(QObject):
+    """
+    Runs OCR jobs on a thread pool so the GUI thread never blocks.
+
+    Tesseract runs as a separate process, so worker threads spend most of
+    their time waiting on it and several jobs can be in flight at once.
+    Signals are emitted from the worker threads and delivered to receivers
+    in the GUI thread through queued connections.
+    """
+    job_started = pyqtSignal(int)
+    job_progress = pyqtSignal(int, int)  # job id, percent
+    job_finished = pyqtSignal(int, str)  # job id, extracted text
+    job_failed = pyqtSignal(int, str)  # job id, error message
+    job_cancelled = pyqtSignal(int)
+    job_timings = pyqtSignal(int, object)  # job id, {preprocessing step: ms}
+    page_finished = pyqtSignal(int, int, int, str)  # job id, page index, page count, text
+    job_result = pyqtSignal(int, object)  # job id, structured.OCRResult
+    job_prepass = pyqtSignal(int, object)  # job id, prepass.Decision (once per page for documents)
+
+    def __init__(self, max_workers=None, cache=None, tracer=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.tracer = tracer or instrumentation.TRACER
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="ocr-worker")
+        # Pages of documents run on their own pool, so a document job waiting
+        # on its pages never blocks the workers those pages need
+        self._page_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                 thread_name_prefix="ocr-page")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, source, config=ocr_core.TESSERACT_CONFIG, lang=None, engine=None, steps=None,
+               tile=False, structured=False, trace=None, prepass=False):
+        """
+        Queue an image path, QImage or PIL image for OCR and return its job id.
+        With tile set, very large images are split into bands OCRed in parallel.
+        With structured set, word boxes are read instead of plain text and
+        job_result is emitted with the OCRResult before job_finished.
+        With prepass set, blank images finish with no text without running
+        OCR, and rotated ones are turned upright first (see prepass.classify).
+        The job's stages are timed into trace (an instrumentation.Run) if
+        given, and the caller finishes it; otherwise the engine keeps its own.
+        """
+        job = OCRJob(next(self._ids), source, config, lang, engine, steps, tile, structured, trace,
+                     prepass)
+        return self._start(job, self._run)
+
+    def submit_document(self, path, config=ocr_core.TESSERACT_CONFIG, lang=None, engine=None,
+                        steps=None, trace=None, prepass=False):
+        """
+        Queue a multi-page TIFF or PDF for OCR and return its job id.
+        Pages are decoded lazily and OCRed concurrently; page_finished is
+        emitted for each page in page order, then job_finished with all text.
+        With prepass set, blank pages are skipped and rotated ones turned upright.
+        """
+        job = OCRJob(next(self._ids), path, config, lang, engine, steps, False, trace=trace,
+                     prepass=prepass)
+        return self._start(job, self._run_document)
+
+    def _start(self, job, run):
+        if job.trace is None:
+            job.trace = self.tracer.begin_run(f"job #{job.job_id} {source_label(job.source)}")
+        with self._lock:
+            self._jobs[job.job_id] = job
+        # A job that finished before its done callback is attached would run the
+        # callback on this thread, emitting job_finished before the caller has
+        # seen the job id; so the worker waits until the callback is in place
+        attached = threading.Event()
+
+        def run_when_attached(job):
+            attached.wait()
+            return run(job)
+
+        job.future = self._executor.submit(run_when_attached, job)
+        job.future.add_done_callback(lambda future, job=job: self._on_done(job, future))
+        attached.set()
+        return job.job_id
+
+    def warm_up(self, config=ocr_core.TESSERACT_CONFIG, lang=None, engine=None):
+        """Load the OCR engine for these settings on a worker, ahead of the first job"""
+        self._executor.submit(self._warm_up, config, lang, engine)
+
+    @staticmethod
+    def _warm_up(config, lang, engine):
+        try:
+            ocr_engines.get_engine(engine).warm_up(config, lang=lang)
+        except Exception as e:
+            print(f"Error warming up the OCR engine: {str(e)}")
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if it already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel_event.set()
+        # A queued job never starts; a running one stops at its next checkpoint.
+        # A job already inside tesseract finishes that call, but its result is dropped.
+        job.future.cancel()
+        return True
+
+    def cancel_all(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def active_jobs(self):
+        """Return the ids of jobs that are queued or running"""
+        with self._lock:
+            return list(self._jobs)
+
+    def shutdown(self, wait=False):
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._page_executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _record_queue_wait(self, job):
+        trace = job.trace
+        trace.add("queue", trace.start_ns, time.perf_counter_ns() - trace.start_ns)
+
+    def _preprocess(self, job, image, timings=None, geometry=None):
+        timings = {} if timings is None else timings
+        with job.trace.stage("preprocess") as span:
+            image = ocr_core.preprocess_image(image, steps=job.steps, timings=timings,
+                                              geometry=geometry)
+        # The grayscale conversion runs first, then the steps in order
+        order = ["grayscale"] + [step for step in timings if step != "grayscale"]
+        job.trace.add_sequence("preprocess", span.start_ns,
+                               [(step, timings[step]) for step in order if step in timings])
+        return image
+
+    def _prepass(self, job, image):
+        """Classify an image before OCR; returns the decision and the image to OCR"""
+        with job.trace.stage("prepass") as span:
+            decision = prepass.classify(image)
+            span.args["decision"] = str(decision)
+        self.job_prepass.emit(job.job_id, decision)
+        return decision, prepass.apply(image, decision)
+
+    def _run(self, job):
+        self._record_queue_wait(job)
+        job.check_cancelled()
+        self.job_started.emit(job.job_id)
+
+        with job.trace.stage("decode"):
+            if isinstance(job.source, QImage):
+                # In-memory capture; the job keeps the QImage alive while PIL views it
+                image = qimage_to_pil(job.source)
+            else:
+                image = ocr_core.load_image(job.source)
+                image.load()
+        job.check_cancelled()
+        self.job_progress.emit(job.job_id, 20)
+
+        if job.prepass:
+            decision, image = self._prepass(job, image)
+            job.check_cancelled()
+            if decision.skip:
+                self.job_progress.emit(job.job_id, 100)
+                if job.structured:
+                    empty = OCRResult.from_tsv("", image.size, image=image)
+                    self.job_result.emit(job.job_id, empty)
+                return ""
+
+        # Word boxes are reported on the image as it was before preprocessing;
+        # a capture's pixels are copied so the result does not outlive them
+        source = image.copy() if job.structured and isinstance(job.source, QImage) else image
+        geometry = preprocessing.Geometry()
+        timings = {}
+        image = self._preprocess(job, image, timings, geometry)
+        job.check_cancelled()
+        self.job_timings.emit(job.job_id, timings)
+        self.job_progress.emit(job.job_id, 40)
+
+        if job.structured:
+            with job.trace.stage("ocr"):
+                result = ocr_core.recognize_structured(image, config=job.config, lang=job.lang,
+                                                       engine=job.engine, cache=self.cache,
+                                                       source=source, geometry=geometry)
+            job.check_cancelled()
+            self.job_result.emit(job.job_id, result)
+            text = result.text()
+        else:
+            with job.trace.stage("ocr"):
+                text = self._recognize(job, image)
+        job.check_cancelled()
+        self.job_progress.emit(job.job_id, 100)
+        return text
+
+    def _recognize(self, job, image):
+        if job.tile and tiling.should_tile(image):
+            return tiling.recognize_tiled(image, config=job.config, lang=job.lang,
+                                          engine=job.engine, cache=self.cache)
+        return ocr_core.recognize(image, config=job.config, lang=job.lang,
+                                  engine=job.engine, cache=self.cache)
+
+    def _run_document(self, job):
+        self._record_queue_wait(job)
+        job.check_cancelled()
+        self.job_started.emit(job.job_id)
+        total = documents.page_count(job.source)
+
+        def ocr_page(image):
+            job.check_cancelled()
+            if job.prepass:
+                decision, image = self._prepass(job, image)
+                if decision.skip:
+                    return ""
+            image = self._preprocess(job, image)
+            job.check_cancelled()
+            with job.trace.stage("ocr"):
+                return self._recognize(job, image)
+
+        def decode_pages():
+            # Time each page's decoding separately from handing it on
+            pages = documents.iter_pages(job.source)
+            try:
+                while True:
+                    with job.trace.stage("decode"):
+                        page = next(pages, None)
+                    if page is None:
+                        return
+                    yield page
+            finally:
+                pages.close()
+
+        texts = []
+        pages = documents.ocr_pages(decode_pages(), self._page_executor,
+                                    ocr_page, max_in_flight=self.max_workers,
+                                    should_stop=job.cancel_event.is_set)
+        for index, text in pages:
+            job.check_cancelled()
+            texts.append(text)
+            self.page_finished.emit(job.job_id, index, total, text)
+            self.job_progress.emit(job.job_id, int(100 * (index + 1) / total))
+        job.check_cancelled()
+        return "\n".join(texts)
+
+    def _on_done(self, job, future):
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+
+        try:
+            text = future.result()
+        except (CancelledError, JobCancelled):
+            self._finish_trace(job, "cancelled")
+            self.job_cancelled.emit(job.job_id)
+        except Exception as e:
+            self._finish_trace(job, "failed")
+            self.job_failed.emit(job.job_id, str(e))
+        else:
+            if job.cancel_event.is_set():
+                self._finish_trace(job, "cancelled")
+                self.job_cancelled.emit(job.job_id)
+            else:
+                self._finish_trace(job, "ok")
+                self.job_finished.emit(job.job_id, text)
+        # The future's callback and the job refer to each other; break the cycle
+        # so the image is freed now instead of at the next garbage collection
+        job.source = None
+        job.future = None
+
+    def _finish_trace(self, job, status):
+        if job.owns_trace:
+            job.trace.finish(status)
+
+
+def source_label(source):
+    """Short description of a job source for timing labels"""
+    if isinstance(source, QImage):
+        return "screenshot"
+    if isinstance(source, str):
+        return os.path.basename(source)
+    return "image"
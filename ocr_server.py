@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+
+"""
+Local OCR server.
+Accepts images over HTTP on localhost or a Unix socket and runs them
+through the same preprocessing and Tesseract config as the GUI. Requests
+wait in a bounded queue. A worker that takes a request also takes the
+queued requests identical to it and OCRs them only once; different
+requests stay queued for the other workers. The server answers 503 when
+the queue is full instead of letting work pile up.
+This module never imports PyQt5.
+
+Usage: python run.py serve --port 8765
+       curl --data-binary @shot.png http://127.0.0.1:8765/ocr
+       curl http://127.0.0.1:8765/metrics
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import queue
+import socket
+import hashlib
+import argparse
+import threading
+import collections
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import ocr_core
+import preprocessing
+from ocr_cache import OCRCache
+
+# Latencies kept for the percentiles on /metrics
+LATENCY_WINDOW = 1000
+
+# Largest accepted request body
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class QueueFull(Exception):
+    pass
+
+
+class OCRRequest:
+    """One queued image and the settings it should be OCRed with"""
+
+    def __init__(self, data, lang=None, engine=None, steps=None, structured=False, config=None):
+        self.data = data
+        self.config = config  # None for the service's config
+        self.lang = lang
+        self.engine = engine
+        self.steps = steps
+        self.structured = structured
+        self.queued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.error_status = None  # HTTP status for the error
+        self._batch_key = None
+
+    def batch_key(self):
+        """Requests with the same key produce the same result"""
+        if self._batch_key is None:
+            digest = hashlib.blake2b(self.data, digest_size=16).hexdigest()
+            steps = None if self.steps is None else tuple(self.steps)
+            self._batch_key = (digest, self.config, self.lang, self.engine, steps,
+                               self.structured)
+        return self._batch_key
+
+
+class RequestQueue:
+    """
+    Bounded FIFO of requests. Unlike queue.Queue it lets a worker take the
+    waiting requests that match the one it already has, wherever they are
+    in the queue, without holding up the requests in between.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = collections.deque()
+        self._ready = threading.Condition()
+
+    def put_nowait(self, request):
+        with self._ready:
+            if len(self._items) >= self.maxsize:
+                raise queue.Full()
+            self._items.append(request)
+            self._ready.notify()
+
+    def put_stop(self):
+        """Queue a stop marker (None) for one worker; it is never refused"""
+        with self._ready:
+            self._items.append(None)
+            self._ready.notify()
+
+    def get(self):
+        with self._ready:
+            while not self._items:
+                self._ready.wait()
+            return self._items.popleft()
+
+    def take_matching(self, key, limit):
+        """Remove and return up to limit queued requests whose batch_key() is key"""
+        with self._ready:
+            matching = [request for request in self._items
+                        if request is not None and request.batch_key() == key][:limit]
+            for request in matching:
+                self._items.remove(request)
+            return matching
+
+    def qsize(self):
+        with self._ready:
+            return len(self._items)
+
+
+class OCRService:
+    """Bounded request queue served by a fixed set of worker threads"""
+
+    def __init__(self, workers=None, max_queue=64, batch_size=8, cache=None,
+                 config=ocr_core.TESSERACT_CONFIG):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.cache = cache
+        self.config = config
+        self._queue = RequestQueue(max_queue)
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._counts = collections.Counter()
+        self._in_flight = 0
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"ocr-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put_stop()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def submit(self, request):
+        """Queue a request; raises QueueFull rather than waiting for space"""
+        request.batch_key()  # Hash the image here, not while the queue is locked
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            with self._lock:
+                self._counts["rejected"] += 1
+            raise QueueFull() from None
+        return request
+
+    def _work(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            # Identical requests waiting behind this one share its result; the
+            # others stay queued so idle workers can start on them right away
+            batch = [request] + self._queue.take_matching(request.batch_key(),
+                                                          self.batch_size - 1)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """OCR the first of a batch of identical requests and answer them all"""
+        with self._lock:
+            self._in_flight += len(batch)
+            self._counts["batches"] += 1
+            self._counts["batched_requests"] += len(batch)
+            self._counts["deduplicated"] += len(batch) - 1
+
+        status = None
+        try:
+            result, error = self._recognize(batch[0]), None
+        except ValueError as e:
+            result, error, status = None, str(e), 422
+        except Exception as e:
+            result, error, status = None, str(e), 500
+
+        finished = time.perf_counter()
+        with self._lock:
+            for request in batch:
+                self._latencies.append(finished - request.queued_at)
+                self._counts["failed" if error else "completed"] += 1
+            self._in_flight -= len(batch)
+        for request in batch:
+            request.result, request.error, request.error_status = result, error, status
+            request.done.set()
+
+    def _recognize(self, request):
+        start = time.perf_counter()
+        try:
+            image = ocr_core.load_image(io.BytesIO(request.data))
+            image.load()
+        except OSError:
+            raise ValueError("The request body is not a supported image") from None
+        source = image
+        geometry = preprocessing.Geometry()
+        image = ocr_core.preprocess_image(image, steps=request.steps, geometry=geometry)
+        config = request.config or self.config
+        result = {}
+        if request.structured:
+            # Word boxes refer to the image as it was sent
+            ocr_result = ocr_core.recognize_structured(image, config=config, lang=request.lang,
+                                                       engine=request.engine, cache=self.cache,
+                                                       source=source, geometry=geometry)
+            result["text"] = ocr_result.text()
+            result["words"] = ocr_result.to_dict()
+        else:
+            result["text"] = ocr_core.recognize(image, config=config, lang=request.lang,
+                                                engine=request.engine, cache=self.cache)
+        result["ocr_seconds"] = round(time.perf_counter() - start, 4)
+        return result
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counts = dict(self._counts)
+            in_flight = self._in_flight
+        batches = counts.get("batches", 0)
+        metrics = {
+            "queue_depth": self._queue.qsize(),
+            "queue_limit": self._queue.maxsize,
+            "in_flight": in_flight,
+            "workers": self.workers,
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "rejected": counts.get("rejected", 0),
+            "batches": batches,
+            "mean_batch_size": round(counts.get("batched_requests", 0) / batches, 2) if batches else 0,
+            "deduplicated": counts.get("deduplicated", 0),
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": percentile(latencies, 50),
+                "p99": percentile(latencies, 99),
+            },
+        }
+        if self.cache is not None:
+            metrics["cache"] = self.cache.stats()
+        return metrics
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of sorted seconds, in milliseconds"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return round(sorted_values[rank - 1] * 1000, 2)
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    server_version = "OCRServer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self.send_json(200, self.server.service.metrics())
+        elif path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.send_json(404, {"error": f"Unknown path {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self.send_json(400, {"error": "Send the image file as the request body"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_json(413, {"error": "Image is too large"})
+            self.close_connection = True
+            return
+        data = self.rfile.read(length)
+        if url.path != "/ocr":
+            self.send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        try:
+            request = OCRRequest(
+                data,
+                lang=params.get("lang", [None])[0],
+                engine=params.get("engine", [None])[0],
+                steps=parse_steps(params.get("preprocess", [None])[0]),
+                structured=params.get("structured", ["0"])[0] in ("1", "true", "yes"),
+                config=parse_psm(params.get("psm", [None])[0]),
+            )
+            self.server.service.submit(request)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except QueueFull:
+            self.send_json(503, {"error": "Server is busy, try again shortly"}, {"Retry-After": "1"})
+            return
+
+        if not request.done.wait(self.server.request_timeout):
+            self.send_json(504, {"error": "OCR did not finish in time"})
+            return
+        if request.error:
+            self.send_json(request.error_status, {"error": request.error})
+            return
+        result = dict(request.result)
+        result["seconds"] = round(time.perf_counter() - request.queued_at, 4)
+        self.send_json(200, result)
+
+
+def parse_psm(value):
+    """Config for a psm query value ("auto" or a mode number), or None for the default"""
+    if value is None:
+        return None
+    if value == "auto":
+        return ocr_core.make_config()
+    if not value.isdigit():
+        raise ValueError(f"Invalid psm: {value}")
+    return ocr_core.make_config(psm=int(value))
+
+
+def parse_steps(value):
+    """Preprocessing steps from a comma separated list, or None for the defaults"""
+    if value is None:
+        return None
+    steps = [step for step in value.split(",") if step]
+    unknown = [step for step in steps if step not in preprocessing.STEPS]
+    if unknown:
+        raise ValueError(f"Unknown preprocessing steps: {', '.join(unknown)}")
+    return steps
+
+
+class OCRHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, request_timeout=60, quiet=False):
+        super().__init__(address, OCRRequestHandler)
+        self.service = service
+        self.request_timeout = request_timeout
+        self.quiet = quiet
+
+
+if hasattr(socket, "AF_UNIX"):
+    class OCRUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path, service, request_timeout=60, quiet=False):
+            if os.path.exists(path):
+                os.unlink(path)  # Left over from a previous run
+            super().__init__(path, OCRRequestHandler)
+            self.service = service
+            self.request_timeout = request_timeout
+            self.quiet = quiet
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None, request_timeout=60,
+                quiet=False):
+    """Create the HTTP server on a TCP port, or on a Unix socket if socket_path is set"""
+    if socket_path:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not supported on this platform")
+        return OCRUnixServer(socket_path, service, request_timeout, quiet)
+    return OCRHTTPServer((host, port), service, request_timeout, quiet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="run.py serve",
+                                     description="Serve OCR requests on localhost.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of a TCP port")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="OCR worker threads (default: number of CPUs)")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="requests allowed to wait before the server answers 503")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="most identical queued requests answered by one OCR run")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds a request may wait for its result")
+    parser.add_argument("--cache-db", help="SQLite result cache to share, e.g. the GUI's cache")
+    parser.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = parser.parse_args(argv)
+
+    cache = OCRCache(db_path=args.cache_db) if args.cache_db else OCRCache()
+    service = OCRService(workers=args.workers, max_queue=args.max_queue,
+                         batch_size=args.batch_size, cache=cache)
+    server = make_server(service, args.host, args.port, args.socket, args.timeout, args.quiet)
+    service.start()
+
+    where = args.socket or "http://%s:%d" % server.server_address[:2]
+    print(f"Serving OCR on {where} with {service.workers} workers (Ctrl+C to stop)",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Clean-up of recognized text.
+
+Each step is a small stateful stage registered with the @step decorator.
+Stages see the text one line at a time and hand on lines as soon as they
+are done with them, holding back only what they still need (a line ending
+in a hyphen, a run of blank lines). A Postprocessor chains the selected
+stages over text that arrives in chunks, such as the pages of a document,
+so cleaning up never needs the whole result as one string.
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import re
+import functools
+
+STEPS = {}
+
+# Steps in the order they run; a Postprocessor keeps this order whatever it is given
+STEP_ORDER = ("whitespace", "dehyphenate", "correct")
+
+# Word lists tried when OCR_DICTIONARY is not set
+SYSTEM_DICTIONARIES = ("/usr/share/dict/words", "/usr/dict/words")
+
+# Character sequences OCR commonly reads in place of the letters they resemble
+CONFUSIONS = (
+    ("0", "o"), ("1", "l"), ("1", "i"), ("5", "s"), ("8", "b"), ("|", "l"),
+    ("rn", "m"), ("vv", "w"), ("cl", "d"), ("l", "i"), ("i", "l"),
+)
+
+# Shorter words are never corrected; too many of them are valid by accident
+MIN_CORRECTED_LENGTH = 3
+
+_WORD = re.compile(r"[\w|]+")
+_HYPHENATED = re.compile(r"[^\W\d_]-$")
+_CONTINUATION = re.compile(r"[^\W\d_A-Z]\w*[,.;:!?]?\s*")
+
+
+def step(name):
+    """Register a post-processing stage class under a name"""
+    def register(cls):
+        STEPS[name] = cls
+        return cls
+    return register
+
+
+class Stage:
+    """Takes lines one at a time; feed() and flush() return the lines ready to pass on"""
+
+    def __init__(self, dictionary=None):
+        self.dictionary = dictionary
+
+    def feed(self, line):
+        return [line]
+
+    def flush(self):
+        return []
+
+
+@step("whitespace")
+class NormalizeWhitespace(Stage):
+    """Collapse runs of spaces and tabs, and runs of blank lines into one"""
+
+    def __init__(self, dictionary=None):
+        super().__init__(dictionary)
+        self.started = False
+        self.blank = False
+
+    def feed(self, line):
+        line = " ".join(line.split())
+        if not line:
+            # Only emitted once the next text line shows it is not trailing
+            self.blank = self.started
+            return []
+        lines = [""] if self.blank else []
+        self.started = True
+        self.blank = False
+        lines.append(line)
+        return lines
+
+
+@step("dehyphenate")
+class Dehyphenate(Stage):
+    """Join words split with a hyphen at the end of a line"""
+
+    def __init__(self, dictionary=None):
+        super().__init__(dictionary)
+        self.pending = None  # Line ending in a hyphen, waiting for the next one
+
+    def feed(self, line):
+        if self.pending is None:
+            if _HYPHENATED.search(line.rstrip()):
+                self.pending = line.rstrip()
+                return []
+            return [line]
+
+        previous, self.pending = self.pending, None
+        match = _CONTINUATION.match(line.lstrip())
+        if match is None:
+            # A capital or a digit: a real hyphen, as in "Jean-\nPaul" or "COVID-\n19"
+            return [previous] + self.feed(line)
+        # The rest of the word (and its punctuation) moves up to the first line
+        line = line.lstrip()
+        joined = previous[:-1] + line[:match.end()].rstrip()
+        rest = line[match.end():]
+        return [joined] + (self.feed(rest) if rest else [])
+
+    def flush(self):
+        lines = [self.pending] if self.pending is not None else []
+        self.pending = None
+        return lines
+
+
+@step("correct")
+class CorrectWords(Stage):
+    """
+    Replace words missing from the dictionary with a dictionary word one
+    common OCR confusion away, e.g. "he1lo" -> "hello" or "rnodern" -> "modern"
+    """
+
+    def __init__(self, dictionary=None):
+        super().__init__(dictionary)
+        self.cache = {}
+
+    def feed(self, line):
+        if not self.dictionary:
+            return [line]
+        return [_WORD.sub(self.replace, line)]
+
+    def replace(self, match):
+        word = match.group(0)
+        if word not in self.cache:
+            self.cache[word] = self.correct(word)
+        return self.cache[word]
+
+    def correct(self, word):
+        lower = word.lower()
+        if (len(word) < MIN_CORRECTED_LENGTH or lower in self.dictionary
+                or not any(c.isalpha() for c in word) or word.isupper()):
+            return word
+        for wrong, right in CONFUSIONS:
+            start = lower.find(wrong)
+            while start != -1:
+                candidate = lower[:start] + right + lower[start + len(wrong):]
+                if candidate in self.dictionary:
+                    return match_case(candidate, word)
+                start = lower.find(wrong, start + 1)
+        return word
+
+
+def match_case(word, original):
+    """word capitalized like original"""
+    return word.capitalize() if original[:1].isupper() else word
+
+
+class Postprocessor:
+    """
+    Runs the named steps over text fed in chunks. feed() returns the lines
+    every stage is done with; finish() returns what the stages held back.
+    """
+
+    def __init__(self, steps, dictionary=None):
+        self.stages = [STEPS[name](dictionary) for name in STEP_ORDER if name in steps]
+        self.partial = ""  # Text after the last line break, until the line is complete
+
+    def feed(self, text):
+        *lines, self.partial = (self.partial + text).split("\n")
+        return self._run(lines, flush=False)
+
+    def finish(self):
+        lines = [self.partial] if self.partial else []
+        self.partial = ""
+        return self._run(lines, flush=True)
+
+    def _run(self, lines, flush):
+        for stage in self.stages:
+            passed = []
+            for line in lines:
+                passed.extend(stage.feed(line))
+            if flush:
+                passed.extend(stage.flush())
+            lines = passed
+        return lines
+
+
+def postprocess_text(text, steps, dictionary=None):
+    """Clean up a complete text in one go; unchanged when no steps are selected"""
+    if not steps:
+        return text
+    processor = Postprocessor(steps, dictionary)
+    lines = processor.feed(text)
+    lines.extend(processor.finish())
+    return "\n".join(lines)
+
+
+def dictionary_path():
+    """The word list used for correction: OCR_DICTIONARY, else a system word list, else None"""
+    candidates = [os.environ.get("OCR_DICTIONARY"), *SYSTEM_DICTIONARIES]
+    return next((path for path in candidates if path and os.path.isfile(path)), None)
+
+
+@functools.lru_cache(maxsize=4)
+def load_dictionary(path):
+    """Lower-cased words of a word list with one word per line"""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
@@ -0,0 +1,180 @@
+"""
+Cheap checks that run before the full OCR call.
+
+classify() looks at a small grayscale copy of the image. A text-density
+pass decides in a few milliseconds whether there is anything text-like at
+all: blank captures and busy pictures without any line structure are
+skipped instead of paying for a recognition pass that returns noise.
+Images whose ink runs in columns rather than rows, and page-sized scans,
+also go through Tesseract's orientation detection (OSD) on a downscaled
+copy and are turned upright before recognition.
+This module must stay free of PyQt5 imports.
+"""
+
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+import ocr_engines
+import preprocessing
+
+# Longest side of the copy the density checks look at
+ANALYSIS_SIZE = 1024
+
+# Longest side of the copy handed to orientation detection
+OSD_SIZE = 2000
+
+# Less ink than this, as a fraction of all pixels, counts as blank
+MIN_INK_FRACTION = 0.0005
+
+# Text always leaves some rows or columns of its inked area empty (between
+# lines, words or letters); this much ink without such gaps is a picture.
+# Rows and columns with up to EMPTY_LINE_INK ink count as empty (specks).
+DENSE_INK_FRACTION = 0.2
+MIN_GAP_FRACTION = 0.05
+EMPTY_LINE_INK = 0.01
+
+# Gray levels a stroke must differ from its neighbourhood by to count as text
+STROKE_CONTRAST = 30
+
+# Smaller images (pixels per side) are never judged text-free
+MIN_JUDGED_SIZE = 32
+
+# Ink whose column profile is this much more structured than its row profile
+# looks like text turned on its side; so does a strip this many times taller
+# than wide
+ROTATION_RATIO = 1.5
+TALL_STRIP_RATIO = 4
+
+# Orientation detection runs on every image this large, so upside-down scans are caught
+PAGE_PIXELS = 2_000_000
+
+# OSD orientation confidence needed before an image is rotated
+MIN_OSD_CONFIDENCE = 2.0
+
+# Transposes (counterclockwise) that apply OSD's clockwise "Rotate" degrees
+_UPRIGHT = {
+    90: Image.ROTATE_270,
+    180: Image.ROTATE_180,
+    270: Image.ROTATE_90,
+}
+
+
+class Decision(namedtuple("Decision", "skip rotation reason ms")):
+    """Whether to skip OCR, degrees to turn the image clockwise, why, and what deciding cost"""
+    __slots__ = ()
+
+    def __str__(self):
+        if self.skip:
+            action = "skip OCR"
+        elif self.rotation:
+            action = f"rotate {self.rotation}°"
+        else:
+            action = "OCR"
+        return f"{action}: {self.reason} ({self.ms:.1f} ms)"
+
+
+def small_gray(image, max_side):
+    """Grayscale copy of a PIL image whose longest side is about max_side at most"""
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGB")
+    factor = math.ceil(max(image.size) / max_side)
+    if factor > 1:
+        # Box averaging; much cheaper than resampling the full image
+        image = image.reduce(factor)
+    return image.convert("L")
+
+
+def profile_contrast(profile):
+    """Coefficient of variation of a projection profile"""
+    mean = profile.mean()
+    return float(profile.std() / mean) if mean else 0.0
+
+
+def ink_box(mask):
+    """The mask cropped to the rows and columns that contain ink, or None"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return None
+    return mask[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+
+def gap_fraction(box):
+    """The larger of the fractions of (nearly) empty rows and empty columns"""
+    height, width = box.shape
+    row_gaps = np.mean(box.sum(axis=1) <= EMPTY_LINE_INK * width)
+    col_gaps = np.mean(box.sum(axis=0) <= EMPTY_LINE_INK * height)
+    return float(max(row_gaps, col_gaps))
+
+
+def looks_vertical(box):
+    """
+    Whether inked text seems to run top to bottom. Several lines give a far
+    more structured profile across them than along them; a single line only
+    shows as a tall strip, where neither profile dominates.
+    """
+    height, width = box.shape
+    across = profile_contrast(box.sum(axis=0))
+    along = profile_contrast(box.sum(axis=1))
+    if across > ROTATION_RATIO * along:
+        return True
+    return height >= TALL_STRIP_RATIO * width and along <= ROTATION_RATIO * across
+
+
+def is_text_free(gray, mask):
+    """Dense ink without the gaps text leaves between lines, words or letters"""
+    if mask.mean() < DENSE_INK_FRACTION or gap_fraction(ink_box(mask)) >= MIN_GAP_FRACTION:
+        return False
+    # Gradients and uneven backgrounds also look dense against the border
+    # colour, so check again for strokes that stand out from their surroundings
+    local = ink_box(preprocessing.adaptive_threshold(gray, offset=STROKE_CONTRAST) < 128)
+    return local is None or gap_fraction(local) < MIN_GAP_FRACTION
+
+
+def classify(image, orientation=True):
+    """
+    Decide how to OCR a PIL image before the expensive call. With
+    orientation set, tesseract's OSD is consulted for text that may be
+    rotated, when the osd language data is installed.
+    """
+    start = time.perf_counter()
+
+    def decision(skip, rotation, reason):
+        return Decision(skip, rotation, reason, (time.perf_counter() - start) * 1000)
+
+    # The blur averages out scanner noise that would otherwise count as ink
+    small = small_gray(image, ANALYSIS_SIZE).filter(ImageFilter.BoxBlur(1))
+    gray = np.asarray(small)
+    mask = preprocessing.ink_mask(gray)
+    ink = float(mask.mean())
+
+    if ink < MIN_INK_FRACTION:
+        return decision(True, 0, f"blank, {ink:.2%} ink")
+    if min(gray.shape) >= MIN_JUDGED_SIZE and is_text_free(gray, mask):
+        return decision(True, 0, f"no text lines, {ink:.0%} ink without gaps")
+
+    width, height = image.size
+    vertical = looks_vertical(ink_box(mask))
+    if not orientation or not (vertical or width * height >= PAGE_PIXELS):
+        return decision(False, 0, f"text-like, {ink:.1%} ink")
+    hint = "vertical text lines" if vertical else "page-sized"
+    if not ocr_engines.has_osd():
+        return decision(False, 0, f"{hint}, orientation unknown without osd.traineddata")
+
+    osd = ocr_engines.detect_orientation(small_gray(image, OSD_SIZE))
+    if osd is None:
+        return decision(False, 0, f"{hint}, too little text for orientation detection")
+    rotation, confidence, script = osd
+    if rotation and confidence >= MIN_OSD_CONFIDENCE:
+        return decision(False, rotation, f"{hint}, OSD confidence {confidence:.1f}, {script}")
+    return decision(False, 0, f"{hint}, upright or unsure (OSD confidence {confidence:.1f})")
+
+
+def apply(image, decision):
+    """The image turned upright as decided; unchanged when no rotation is needed"""
+    transpose = _UPRIGHT.get(decision.rotation)
+    return image if transpose is None else image.transpose(transpose)
@@ -0,0 +1,274 @@
+"""
+Image preprocessing ahead of Tesseract.
+
+Each step takes and returns a 2-D uint8 grayscale NumPy array, so steps can
+be combined freely and new ones registered with the @step decorator. Steps
+that move pixels (cropping, scaling, rotating) return (array, matrix) with
+the 3x3 affine matrix of that move, so word boxes found on the result can
+be mapped back onto the original image through a Geometry. Cropping
+and binarization run before OCR to cut down the pixels Tesseract has to
+process; upscaling only kicks in for captures whose text is too small to
+read reliably.
+This module must stay free of PyQt5 imports.
+"""
+
+import time
+import numpy as np
+from PIL import Image
+
+STEPS = {}
+
+# Steps run when no explicit list is given, in this order
+DEFAULT_STEPS = ("grayscale", "crop", "upscale", "threshold")
+
+# Rows binarized at a time by adaptive_threshold
+THRESHOLD_BAND_ROWS = 256
+
+# Difference from the background brightness that counts as ink
+INK_TOLERANCE = 40
+
+
+def step(name):
+    """Register a preprocessing step under a name"""
+    def register(func):
+        STEPS[name] = func
+        return func
+    return register
+
+
+class Geometry:
+    """
+    Affine map from the coordinates of the image that entered the pipeline to
+    those of the image it returned, built up from the matrices of the steps.
+    """
+
+    def __init__(self):
+        self.matrix = np.eye(3)
+
+    def then(self, matrix):
+        self.matrix = matrix @ self.matrix
+
+    def is_identity(self):
+        return np.allclose(self.matrix, np.eye(3))
+
+    def to_source(self, boxes):
+        """
+        Map (left, top, right, bottom) boxes on the preprocessed image back onto
+        the original; a rotated box becomes the box around its corners
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        inverse = np.linalg.inv(self.matrix)
+        xs = boxes[:, [0, 2, 2, 0]]
+        ys = boxes[:, [1, 1, 3, 3]]
+        source_x = inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]
+        source_y = inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]
+        return np.stack((source_x.min(axis=1), source_y.min(axis=1),
+                         source_x.max(axis=1), source_y.max(axis=1)), axis=1)
+
+
+def translation(dx, dy):
+    return np.array([[1.0, 0.0, dx], [0.0, 1.0, dy], [0.0, 0.0, 1.0]])
+
+
+def scaling(fx, fy):
+    return np.diag([fx, fy, 1.0])
+
+
+def rotation(angle, size, rotated_size):
+    """
+    Matrix of PIL's Image.rotate(angle, expand=True): counter-clockwise about
+    the centre of an image of size (width, height), re-centred in rotated_size
+    """
+    radians = np.deg2rad(angle)
+    cos, sin = np.cos(radians), np.sin(radians)
+    turn = np.array([[cos, sin, 0.0], [-sin, cos, 0.0], [0.0, 0.0, 1.0]])
+    return (translation(rotated_size[0] / 2, rotated_size[1] / 2) @ turn
+            @ translation(-size[0] / 2, -size[1] / 2))
+
+
+def background_level(gray):
+    """Estimate the background brightness from the image border"""
+    border = np.concatenate((gray[0], gray[-1], gray[:, 0], gray[:, -1]))
+    return int(np.median(border))
+
+
+def ink_mask(gray, tolerance=INK_TOLERANCE):
+    """Pixels that differ clearly from the background"""
+    return np.abs(gray.astype(np.int16) - background_level(gray)) > tolerance
+
+
+@step("grayscale")
+def grayscale(gray):
+    # Conversion happens when the image enters the pipeline; the step is
+    # kept so its cost shows up in the timings
+    return gray
+
+
+@step("crop")
+def crop_borders(gray, margin=8):
+    """Trim uniform borders and whitespace around the text"""
+    mask = ink_mask(gray)
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return gray
+
+    top = max(rows[0] - margin, 0)
+    bottom = min(rows[-1] + margin + 1, gray.shape[0])
+    left = max(cols[0] - margin, 0)
+    right = min(cols[-1] + margin + 1, gray.shape[1])
+    return gray[top:bottom, left:right], translation(-left, -top)
+
+
+def ink_row_runs(gray):
+    """Start and end rows of each run of rows that contain ink"""
+    has_ink = ink_mask(gray).any(axis=1).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], has_ink, [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def estimate_line_height(gray):
+    """Median height of runs of rows that contain ink, or None without text"""
+    starts, ends = ink_row_runs(gray)
+    if starts.size == 0:
+        return None
+    return float(np.median(ends - starts))
+
+
+def count_text_lines(gray):
+    """
+    Number of text lines, counting runs of inked rows separated by gaps of
+    at least a third of the line height (smaller gaps split accents and
+    dots from their letters, not lines)
+    """
+    starts, ends = ink_row_runs(gray)
+    if starts.size == 0:
+        return 0
+    line_height = np.median(ends - starts)
+    gaps = starts[1:] - ends[:-1]
+    return int(1 + np.count_nonzero(gaps >= line_height / 3))
+
+
+@step("upscale")
+def upscale_small_text(gray, target_line_height=32, max_factor=4.0):
+    """
+    Enlarge captures whose text lines are shorter than what a 10-12pt font
+    measures at ~300 DPI. Screenshots are usually ~96 DPI, which is far too
+    small for Tesseract's recogniser.
+    """
+    line_height = estimate_line_height(gray)
+    if not line_height or line_height >= target_line_height:
+        return gray
+
+    factor = min(target_line_height / line_height, max_factor)
+    height, width = gray.shape
+    size = (int(round(width * factor)), int(round(height * factor)))
+    enlarged = np.asarray(Image.fromarray(gray).resize(size, Image.LANCZOS))
+    return enlarged, scaling(size[0] / width, size[1] / height)
+
+
+@step("threshold")
+def adaptive_threshold(gray, block_size=31, offset=10):
+    """
+    Binarize against the local mean of each block_size window, computed with
+    an integral image. Light text on a dark background is inverted so the
+    result is always dark text on white.
+    """
+    background = background_level(gray)
+    # Same test as ink_mask(gray).any(), without a full-size temporary
+    if gray.max() <= background + INK_TOLERANCE and gray.min() >= background - INK_TOLERANCE:
+        # Nothing but background; skip the box filter entirely
+        return np.full_like(gray, 255)
+
+    height, width = gray.shape
+    radius = block_size // 2
+
+    y0 = np.clip(np.arange(height) - radius, 0, height)
+    y1 = np.clip(np.arange(height) + radius + 1, 0, height)
+    x0 = np.clip(np.arange(width) - radius, 0, width)
+    x1 = np.clip(np.arange(width) + radius + 1, 0, width)
+
+    widths = (x1 - x0).astype(np.int32)
+    dark_background = background < 128
+
+    # One row band at a time, each with its own integral image over the rows its
+    # windows reach, so the temporaries stay small next to the image
+    result = np.empty_like(gray)
+    for top in range(0, height, THRESHOLD_BAND_ROWS):
+        bottom = min(top + THRESHOLD_BAND_ROWS, height)
+        first, last = y0[top], y1[bottom - 1]
+        columns = np.zeros((last - first + 1, width), dtype=np.int32)
+        np.cumsum(gray[first:last], axis=0, dtype=np.int32, out=columns[1:])
+        vertical = columns[y1[top:bottom] - first] - columns[y0[top:bottom] - first]
+        rows = np.zeros((bottom - top, width + 1), dtype=np.int32)
+        np.cumsum(vertical, axis=1, dtype=np.int32, out=rows[:, 1:])
+        window_sum = rows[:, x1] - rows[:, x0]
+        area = (y1[top:bottom] - y0[top:bottom]).astype(np.int32)[:, None] * widths[None, :]
+        # pixel < mean - offset, compared as pixel * area < sum - offset * area to stay in integers
+        scaled = gray[top:bottom] * area
+        margin = offset * area
+        if dark_background:
+            text = scaled > window_sum + margin
+        else:
+            text = scaled < window_sum - margin
+        result[top:bottom] = np.where(text, 0, 255)
+    return result
+
+
+@step("deskew")
+def deskew(gray, max_angle=5.0, angle_step=0.5):
+    """
+    Straighten slightly rotated text. The angle whose horizontal projection
+    has the sharpest peaks (text lines aligned with rows) wins; it is searched
+    on a downscaled copy to keep the cost low.
+    """
+    mask = ink_mask(gray)
+    if not mask.any():
+        return gray
+
+    small = Image.fromarray(mask.astype(np.uint8) * 255)
+    scale = min(1.0, 800 / max(gray.shape))
+    if scale < 1.0:
+        small = small.resize((max(int(gray.shape[1] * scale), 1),
+                              max(int(gray.shape[0] * scale), 1)), Image.BILINEAR)
+
+    best_angle = 0.0
+    best_score = -1.0
+    for angle in np.arange(-max_angle, max_angle + angle_step / 2, angle_step):
+        rotated = np.asarray(small.rotate(float(angle), resample=Image.NEAREST, expand=True))
+        score = float(np.var(rotated.sum(axis=1, dtype=np.int64)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+
+    if abs(best_angle) < angle_step / 2:
+        return gray
+    rotated = Image.fromarray(gray).rotate(best_angle, resample=Image.BICUBIC, expand=True,
+                                           fillcolor=background_level(gray))
+    return np.asarray(rotated), rotation(best_angle, (gray.shape[1], gray.shape[0]), rotated.size)
+
+
+def run_pipeline(image, steps=DEFAULT_STEPS, timings=None, geometry=None):
+    """
+    Run a PIL image through the named steps and return a grayscale PIL image.
+    If a dict is passed as timings, it is filled with milliseconds per step;
+    a Geometry passed as geometry is given the moves of the steps.
+    """
+    start = time.perf_counter()
+    gray = np.asarray(image.convert('L'))
+    convert_ms = (time.perf_counter() - start) * 1000
+
+    for name in steps:
+        if name not in STEPS:
+            raise ValueError(f"Unknown preprocessing step: {name}")
+        start = time.perf_counter()
+        gray = STEPS[name](gray)
+        if isinstance(gray, tuple):
+            gray, matrix = gray
+            if geometry is not None:
+                geometry.then(matrix)
+        if timings is not None:
+            timings[name] = (time.perf_counter() - start) * 1000
+    if timings is not None:
+        timings["grayscale"] = timings.get("grayscale", 0.0) + convert_ms
+
+    return Image.fromarray(np.ascontiguousarray(gray))
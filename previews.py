@@ -0,0 +1,184 @@
+"""
+Downscaled image previews, decoded off the GUI thread.
+
+Files are decoded at (roughly) the size they are shown at, using
+QImageReader.setScaledSize, which lets the JPEG decoder skip most of the
+work, or Pillow's draft mode when Qt cannot read the file. A 100 MP scan
+then never exists in memory at full resolution just to be previewed.
+Previews are cached per file and size bucket in a small LRU, so going
+back to an image or resizing the window does not touch the disk again.
+"""
+
+import os
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+# Preview sizes are rounded up to multiples of this, so small resizes reuse them
+SIZE_STEP = 256
+
+# Memory allowed for cached previews
+CACHE_BYTES = 64 * 1024 * 1024
+
+
+def preview_box(size):
+    """Round a display size up to the size bucket previews are decoded at"""
+    width = max(-(-size.width() // SIZE_STEP), 1) * SIZE_STEP
+    height = max(-(-size.height() // SIZE_STEP), 1) * SIZE_STEP
+    return QSize(width, height)
+
+
+def fitted_size(original, box):
+    """The size original is shown at inside box; never larger than original"""
+    size = original.scaled(box, Qt.KeepAspectRatio)
+    if size.width() >= original.width() or size.height() >= original.height():
+        return QSize(original)
+    return QSize(max(size.width(), 1), max(size.height(), 1))
+
+
+def file_identity(path):
+    """Cache key part that changes when the file is replaced or edited"""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+class PreviewCache:
+    """LRU of (preview QImage, original size) per file, bounded by bytes"""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, identity, box):
+        """A cached preview at least as detailed as box needs, or None"""
+        with self._lock:
+            entry = self._entries.get(identity)
+            if entry is None:
+                return None
+            image, original = entry
+            needed = fitted_size(original, box)
+            if image.width() < needed.width() and image.height() < needed.height():
+                return None
+            self._entries.move_to_end(identity)
+            return image
+
+    def put(self, identity, image, original):
+        with self._lock:
+            old = self._entries.pop(identity, None)
+            if old is not None:
+                self._bytes -= old[0].sizeInBytes()
+            self._entries[identity] = (image, original)
+            self._bytes += image.sizeInBytes()
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class PreviewLoader(QObject):
+    """
+    Produces previews on a small thread pool. request() returns an id;
+    preview_ready or preview_failed is emitted with it when the preview
+    is done. Results of superseded requests are still emitted, so callers
+    should ignore ids they no longer wait for.
+    """
+    preview_ready = pyqtSignal(int, object)  # request id, QImage
+    preview_failed = pyqtSignal(int, str)  # request id, error message
+
+    def __init__(self, max_workers=2, cache_bytes=CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.cache = PreviewCache(cache_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="preview")
+        self._ids = itertools.count(1)
+
+    def cached(self, path, size):
+        """The cached preview of a file for a display size, or None"""
+        try:
+            return self.cache.get(file_identity(path), preview_box(size))
+        except OSError:
+            return None
+
+    def request(self, source, size, trace=None):
+        """
+        Queue a preview of an image path or QImage for a display size. The
+        decode is timed into trace (an instrumentation.Run) if given.
+        """
+        request_id = next(self._ids)
+        self._executor.submit(self._load, request_id, source, preview_box(size), trace)
+        return request_id
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, request_id, source, box, trace):
+        try:
+            if trace is not None:
+                with trace.stage("decode"):
+                    image = self._decode(source, box)
+            else:
+                image = self._decode(source, box)
+        except Exception as e:
+            self.preview_failed.emit(request_id, str(e))
+        else:
+            self.preview_ready.emit(request_id, image)
+
+    def _decode(self, source, box):
+        if isinstance(source, QImage):
+            # Already in memory; only the scaling is moved off the GUI thread
+            return source.scaled(fitted_size(source.size(), box), Qt.KeepAspectRatio,
+                                 Qt.SmoothTransformation)
+
+        identity = file_identity(source)
+        image = self.cache.get(identity, box)
+        if image is not None:
+            return image
+
+        reader = QImageReader(source)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            # The decoder produces the reduced image directly
+            reader.setScaledSize(fitted_size(original, box))
+            image = reader.read()
+        else:
+            # The format does not report its size up front
+            image = reader.read()
+            if not image.isNull():
+                original = image.size()
+                image = image.scaled(fitted_size(original, box), Qt.KeepAspectRatio,
+                                     Qt.SmoothTransformation)
+        if image.isNull():
+            image, original = self._decode_with_pil(source, box)
+
+        self.cache.put(identity, image, original)
+        return image
+
+    @staticmethod
+    def _decode_with_pil(path, box):
+        """Fallback for files Qt cannot read, e.g. TIFF without the Qt plugin"""
+        from PIL import Image
+
+        with Image.open(path) as image:
+            original = QSize(*image.size)
+            # Draft mode lets JPEG decode at 1/2, 1/4 or 1/8 scale
+            image.draft("RGB", (box.width(), box.height()))
+            image.thumbnail((box.width(), box.height()))
+            image = image.convert("RGBA")
+            data = image.tobytes()
+        preview = QImage(data, image.width, image.height, 4 * image.width,
+                         QImage.Format_RGBA8888)
+        return preview.copy(), original  # Own the pixels once data goes away
@@ -0,0 +1,127 @@
+import numpy as np
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage
+
+import ocr_core
+from alt_screenshot import grab_region
+from image_bridge import qimage_to_array
+
+# Frames are compared at 1/SIGNATURE_SCALE of their size in each direction, so
+# the signature grows with the region and a single changed glyph stays visible
+SIGNATURE_SCALE = 2
+# Largest per-cell brightness change (0-255) still treated as "no change";
+# absorbs compression noise and subpixel flicker but not a changed glyph
+CHANGE_THRESHOLD = 12
+
+
+def frame_signature(qimage, scale=SIGNATURE_SCALE):
+    """Reduce a frame to a grayscale copy averaged over scale x scale cells"""
+    gray = qimage.convertToFormat(QImage.Format_Grayscale8)
+    pixels = qimage_to_array(gray)
+    height, width = pixels.shape
+    if height < scale or width < scale:
+        return pixels.astype(np.int16)
+    # Edge rows and columns that do not fill a whole cell are dropped
+    cells = pixels[:height - height % scale, :width - width % scale].reshape(
+        height // scale, scale, width // scale, scale)
+    return (cells.sum(axis=(1, 3), dtype=np.int32) // (scale * scale)).astype(np.int16)
+
+
+def frames_differ(previous, current, threshold=CHANGE_THRESHOLD):
+    if previous is None or previous.shape != current.shape:
+        return True
+    return int(np.abs(current - previous).max()) > threshold
+
+
+class RegionWatcher(QObject):
+    """
+    Re-captures a fixed screen region on a timer and OCRs it when it changes.
+
+    Frames whose signature matches the last OCRed frame are dropped before
+    any OCR work, so a static screen costs one small grab per tick. Only one
+    OCR job is in flight at a time, and text is emitted only when it differs
+    from the last emitted text.
+    """
+    text_changed = pyqtSignal(str)
+    frame_checked = pyqtSignal(bool)  # True when the frame was sent to OCR
+    failed = pyqtSignal(str)
+
+    def __init__(self, ocr_engine, region, interval_ms=1000, engine_name=None, steps=None,
+                 lang=None, config=ocr_core.TESSERACT_CONFIG, prepass=False, parent=None):
+        super().__init__(parent)
+        self.ocr_engine = ocr_engine
+        self.region = region
+        self.engine_name = engine_name
+        self.steps = steps
+        self.lang = lang
+        self.config = config
+        self.prepass = prepass
+        self.last_signature = None
+        self.last_text = None
+        self.pending_job = None
+        self.frames_skipped = 0
+        self.frames_ocred = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check_region)
+
+        self.ocr_engine.job_finished.connect(self.on_job_finished)
+        self.ocr_engine.job_failed.connect(self.on_job_failed)
+        self.ocr_engine.job_cancelled.connect(self.on_job_cancelled)
+
+    def start(self):
+        self.check_region()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        if self.pending_job is not None:
+            self.ocr_engine.cancel(self.pending_job)
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def check_region(self):
+        # Let the previous frame finish instead of queueing a backlog
+        if self.pending_job is not None:
+            return
+
+        try:
+            frame = grab_region(*self.region)
+        except Exception as e:
+            print(f"Watch capture error: {str(e)}")
+            return
+
+        signature = frame_signature(frame)
+        if not frames_differ(self.last_signature, signature):
+            self.frames_skipped += 1
+            self.frame_checked.emit(False)
+            return
+
+        self.last_signature = signature
+        self.frames_ocred += 1
+        self.pending_job = self.ocr_engine.submit(frame, config=self.config, lang=self.lang,
+                                                  engine=self.engine_name, steps=self.steps,
+                                                  prepass=self.prepass)
+        self.frame_checked.emit(True)
+
+    def on_job_finished(self, job_id, text):
+        if job_id != self.pending_job:
+            return
+        self.pending_job = None
+        if text != self.last_text:
+            self.last_text = text
+            self.text_changed.emit(text)
+
+    def on_job_failed(self, job_id, message):
+        if job_id == self.pending_job:
+            self.pending_job = None
+            self.stop()
+            self.failed.emit(message)
+
+    def on_job_cancelled(self, job_id):
+        if job_id == self.pending_job:
+            self.pending_job = None
+            # Retry this region on the next tick
+            self.last_signature = None
@@ -3,64 +3,153 @@
 """
 OCR GUI Application Launcher
 This script launches the OCR GUI application.
+Run "python run.py batch --help" for headless batch OCR,
+"python run.py serve --help" for the local OCR server, or
+"python run.py --profile-startup" to see where startup time goes.
 """
 
 import sys
-import os
-import subprocess
+import time
+import builtins
 import platform
+import threading
+import importlib.util
 
-def check_tesseract():
-    """Check if Tesseract is installed and provide installation instructions if not."""
-    try:
-        import pytesseract
-        # Skip version check - we'll rely on the explicit path in ocr_app.py
-        return True
-    except Exception:
-        print("Tesseract OCR is not installed or not properly configured.")
-        system = platform.system()
-        
-        if system == "Windows":
-            print("\nInstallation instructions for Windows:")
-            print("1. Download Tesseract installer from: https://github.com/UB-Mannheim/tesseract/wiki")
-            print("2. Run the installer and complete the installation")
-            print("3. Ensure the Tesseract installation directory is in your PATH")
-            print("\nAlternatively, you can edit ocr_app.py to set the correct path to tesseract.exe")
-        elif system == "Darwin":  # macOS
-            print("\nInstallation instructions for macOS:")
-            print("1. Install Homebrew if not already installed: /bin/bash -c \"$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)\"")
-            print("2. Install Tesseract: brew install tesseract")
-        elif system == "Linux":
-            print("\nInstallation instructions for Linux (Ubuntu/Debian):")
-            print("1. Install Tesseract: sudo apt install tesseract-ocr")
-            print("\nFor other Linux distributions, please check your package manager.")
-        
-        return False
+def print_tesseract_instructions():
+    """Print installation instructions for Tesseract OCR."""
+    print("Tesseract OCR is not installed or not properly configured.")
+    system = platform.system()
+    
+    if system == "Windows":
+        print("\nInstallation instructions for Windows:")
+        print("1. Download Tesseract installer from: https://github.com/UB-Mannheim/tesseract/wiki")
+        print("2. Run the installer and complete the installation")
+        print("3. Ensure the Tesseract installation directory is in your PATH")
+        print("\nAlternatively, you can edit ocr_engines.py to set the correct path to tesseract.exe")
+    elif system == "Darwin":  # macOS
+        print("\nInstallation instructions for macOS:")
+        print("1. Install Homebrew if not already installed: /bin/bash -c \"$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)\"")
+        print("2. Install Tesseract: brew install tesseract")
+    elif system == "Linux":
+        print("\nInstallation instructions for Linux (Ubuntu/Debian):")
+        print("1. Install Tesseract: sudo apt install tesseract-ocr")
+        print("\nFor other Linux distributions, please check your package manager.")
 
 def check_dependencies():
     """Check if all required Python packages are installed."""
-    try:
-        # Try to import each package directly
-        import PIL
-        import pytesseract
-        import PyQt5
-        import pyperclip
-        import mss
-        return True
-    except ImportError as e:
-        print(f"Missing dependency: {str(e)}")
-        print("\nYou can install all dependencies with:")
-        print("pip install -r requirements.txt")
-        return False
+    # Only locate the packages; importing them here would slow down startup
+    for package in ("PIL", "numpy", "pytesseract", "PyQt5", "pyperclip", "mss"):
+        if importlib.util.find_spec(package) is None:
+            print(f"Missing dependency: {package}")
+            print("\nYou can install all dependencies with:")
+            print("pip install -r requirements.txt")
+            return False
+    return True
+
+class ImportProfiler:
+    """Records how long each module takes to import, including its own imports"""
+    
+    def __init__(self):
+        self.timings = []  # (seconds, depth, module name, thread name)
+        self._original_import = builtins.__import__
+        self._local = threading.local()
+    
+    def install(self):
+        builtins.__import__ = self._import
+    
+    def uninstall(self):
+        builtins.__import__ = self._original_import
+    
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only first-time imports are interesting; cached ones cost nothing
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._local.depth = depth
+            self.timings.append((time.perf_counter() - start, depth, name,
+                                 threading.current_thread().name))
+    
+    def report(self, limit=15):
+        # Imports on the GUI thread are the ones that delay the first paint
+        main_thread = threading.main_thread().name
+        top_level = sorted((t for t in self.timings if t[1] == 0 and t[3] == main_thread),
+                           reverse=True)
+        print(f"\nSlowest imports on the GUI thread (of {len(self.timings)} modules loaded):")
+        for seconds, _, name, _ in top_level[:limit]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+def profile_startup():
+    """Launch the GUI, report where startup time goes, then exit."""
+    start = time.perf_counter()
+    profiler = ImportProfiler()
+    profiler.install()
+    
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent
+    marks = [("PyQt5 imported", time.perf_counter())]
+    
+    app = QApplication(sys.argv)
+    marks.append(("QApplication created", time.perf_counter()))
+    
+    from ocr_app import OCRApp
+    window = OCRApp()
+    marks.append(("main window constructed", time.perf_counter()))
+    
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "first paint" not in dict(marks):
+                marks.append(("first paint", time.perf_counter()))
+            return False
+    
+    paint_filter = FirstPaintFilter()
+    app.installEventFilter(paint_filter)
+    
+    def on_loaded(seconds):
+        marks.append((f"OCR modules loaded in background ({seconds * 1000:.0f} ms)",
+                      time.perf_counter()))
+    
+    def on_checked(found, detail):
+        marks.append((f"Tesseract probed ({detail if found else 'not found'})",
+                      time.perf_counter()))
+        app.quit()
+    
+    window.startup_loader.modules_loaded.connect(on_loaded)
+    window.startup_loader.tesseract_checked.connect(on_checked)
+    window.show()
+    app.exec_()
+    profiler.uninstall()
+    app.removeEventFilter(paint_filter)
+    
+    print("Startup timeline (ms since launch):")
+    for label, moment in sorted(marks, key=lambda mark: mark[1]):
+        print(f"  {(moment - start) * 1000:8.1f}  {label}")
+    profiler.report()
+    print("\nBackground preload (startup-loader thread):")
+    for name, seconds in window.startup_loader.timings:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
 
 def main():
     """Main function to launch the OCR application."""
+    # Headless batch and server modes never load PyQt5
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from batch_ocr import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from ocr_server import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+    
     # Check dependencies
     if not check_dependencies():
         return
     
-    # Check if Tesseract is installed
-    if not check_tesseract():
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profile_startup()
         return
     
     # Launch the OCR application
@@ -70,10 +159,14 @@ def main():
         
         app = QApplication(sys.argv)
         window = OCRApp()
+        # Tesseract is probed in the background once the window is up
+        window.startup_loader.tesseract_checked.connect(
+            lambda found, detail: found or print_tesseract_instructions()
+        )
         window.show()
         sys.exit(app.exec_())
     except Exception as e:
         print(f"Error launching the application: {str(e)}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
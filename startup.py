@@ -0,0 +1,66 @@
+"""
+Background loading of the heavy OCR modules after the main window is up.
+Only PyQt5.QtCore and the standard library may be imported here, so the
+window can paint before NumPy, PIL or pytesseract are loaded.
+"""
+
+import time
+import importlib
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Modules the OCR pipeline needs, imported in the background in this order
+HEAVY_MODULES = (
+    "numpy",
+    "PIL.Image",
+    "pytesseract",
+    "ocr_engines",
+    "ocr_core",
+    "ocr_cache",
+    "ocr_jobs",
+    "alt_screenshot",
+    "region_watch",
+    "documents",
+)
+
+
+class StartupLoader(QObject):
+    """Imports the OCR modules, probes the Tesseract binary and lists its languages off the GUI thread"""
+    modules_loaded = pyqtSignal(float)  # seconds spent importing
+    tesseract_checked = pyqtSignal(bool, str)  # found, version or error message
+    languages_found = pyqtSignal(object)  # list of installed language codes
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self.timings = []  # (module name, seconds) for each preloaded module
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="startup-loader", daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        start = time.perf_counter()
+        for name in HEAVY_MODULES:
+            module_start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                self.timings.append((name, time.perf_counter() - module_start))
+            except Exception as e:
+                # The failure resurfaces with context when the feature is used
+                print(f"Error preloading {name}: {str(e)}")
+        self.modules_loaded.emit(time.perf_counter() - start)
+
+        try:
+            import ocr_engines
+            version = ocr_engines.tesseract_version()
+            self.tesseract_checked.emit(True, version)
+        except Exception as e:
+            self.tesseract_checked.emit(False, str(e))
+            return
+
+        try:
+            self.languages_found.emit(ocr_engines.available_languages())
+        except Exception as e:
+            print(f"Error listing Tesseract languages: {str(e)}")
@@ -0,0 +1,237 @@
+"""
+Structured OCR output built from Tesseract's TSV data.
+
+OCRResult stores one row per recognised word as parallel NumPy columns
+(positions, confidences, layout numbers) rather than a dict per word, and
+can be exported as JSON, hOCR or a searchable PDF without re-running OCR.
+This module must stay free of PyQt5 imports.
+"""
+
+import io
+import json
+import zlib
+from html import escape
+
+import numpy as np
+
+# Integer columns of Tesseract's TSV output kept for every word
+INT_COLUMNS = ("page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height")
+WORD_LEVEL = 5
+
+
+class OCRResult:
+    """Word boxes, confidences and layout of one OCRed image, stored by column"""
+
+    def __init__(self, columns, words, image_size, image=None):
+        self.columns = columns  # name -> np.ndarray, one entry per word
+        self.words = words  # np.ndarray of str
+        self.image_size = image_size
+        self.image = image  # The image the boxes refer to, if kept
+
+    @classmethod
+    def from_tsv(cls, tsv, image_size, image=None):
+        rows = []
+        for line in tsv.splitlines():
+            fields = line.split("\t")
+            # Skip the header, non-word levels and empty words
+            if len(fields) < 12 or not fields[0].isdigit() or int(fields[0]) != WORD_LEVEL:
+                continue
+            if not fields[11].strip():
+                continue
+            rows.append(fields)
+
+        columns = {}
+        for offset, name in enumerate(INT_COLUMNS, start=1):
+            columns[name] = np.array([int(row[offset]) for row in rows], dtype=np.int32)
+        columns["conf"] = np.array([float(row[10]) for row in rows], dtype=np.float32)
+        words = np.array([row[11] for row in rows], dtype=object)
+        return cls(columns, words, image_size, image)
+
+    def on_source(self, geometry, source):
+        """
+        This result with its boxes moved back onto source, the image that
+        preprocessing started from, through the preprocessing.Geometry it
+        recorded; source is kept as the image for exports
+        """
+        c = self.columns
+        boxes = np.stack((c["left"], c["top"], c["left"] + c["width"], c["top"] + c["height"]),
+                         axis=1)
+        width, height = source.size
+        mapped = geometry.to_source(boxes)
+        # Outward to whole pixels, inside the source image
+        left = np.clip(np.floor(mapped[:, 0] + 1e-6), 0, width).astype(np.int32)
+        top = np.clip(np.floor(mapped[:, 1] + 1e-6), 0, height).astype(np.int32)
+        right = np.clip(np.ceil(mapped[:, 2] - 1e-6), 0, width).astype(np.int32)
+        bottom = np.clip(np.ceil(mapped[:, 3] - 1e-6), 0, height).astype(np.int32)
+        columns = dict(c, left=left, top=top, width=right - left, height=bottom - top)
+        return OCRResult(columns, self.words, source.size, source)
+
+    def __len__(self):
+        return len(self.words)
+
+    def line_breaks(self):
+        """Indices where a new line starts, plus which of those start a new paragraph"""
+        c = self.columns
+        if not len(self):
+            return np.array([], dtype=np.intp), np.array([], dtype=bool)
+        par_key = np.stack((c["page_num"], c["block_num"], c["par_num"]), axis=1)
+        new_par = np.ones(len(self), dtype=bool)
+        new_par[1:] = (par_key[1:] != par_key[:-1]).any(axis=1)
+        new_line = new_par.copy()
+        new_line[1:] |= c["line_num"][1:] != c["line_num"][:-1]
+        starts = np.flatnonzero(new_line)
+        return starts, new_par[starts]
+
+    def lines(self):
+        """Per-line text, bounding boxes (left, top, right, bottom) and mean confidence"""
+        starts, _ = self.line_breaks()
+        if not starts.size:
+            return [], np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        c = self.columns
+        right = c["left"] + c["width"]
+        bottom = c["top"] + c["height"]
+        boxes = np.stack((np.minimum.reduceat(c["left"], starts),
+                          np.minimum.reduceat(c["top"], starts),
+                          np.maximum.reduceat(right, starts),
+                          np.maximum.reduceat(bottom, starts)), axis=1)
+        counts = np.diff(np.append(starts, len(self)))
+        confidences = np.add.reduceat(c["conf"], starts) / counts
+        ends = starts + counts
+        texts = [" ".join(self.words[start:end]) for start, end in zip(starts, ends)]
+        return texts, boxes, confidences
+
+    def text(self):
+        """Plain text with one line per OCR line and blank lines between paragraphs"""
+        texts, _, _ = self.lines()
+        _, new_par = self.line_breaks()
+        parts = []
+        for index, line in enumerate(texts):
+            if index and new_par[index]:
+                parts.append("")
+            parts.append(line)
+        return "\n".join(parts) + ("\n" if parts else "")
+
+    def to_dict(self):
+        """Columnar, JSON-friendly representation"""
+        data = {name: values.tolist() for name, values in self.columns.items()}
+        data["text"] = list(self.words)
+        return {"image_size": list(self.image_size), "words": data}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def to_hocr(self):
+        """Render as an hOCR document with page, paragraph, line and word boxes"""
+        width, height = self.image_size
+        c = self.columns
+        starts, new_par = self.line_breaks()
+        texts, boxes, _ = self.lines()
+        ends = np.append(starts[1:], len(self))
+
+        body = [f"  <div class='ocr_page' id='page_1' title='bbox 0 0 {width} {height}'>"]
+        par_open = False
+        for line_index, (start, end) in enumerate(zip(starts, ends)):
+            if new_par[line_index]:
+                if par_open:
+                    body.append("   </p>")
+                body.append("   <p class='ocr_par'>")
+                par_open = True
+            left, top, right, bottom = boxes[line_index]
+            body.append(f"    <span class='ocr_line' title='bbox {left} {top} {right} {bottom}'>")
+            for i in range(start, end):
+                word_right = c["left"][i] + c["width"][i]
+                word_bottom = c["top"][i] + c["height"][i]
+                body.append(
+                    f"     <span class='ocrx_word' title='bbox {c['left'][i]} {c['top'][i]} "
+                    f"{word_right} {word_bottom}; x_wconf {int(round(float(c['conf'][i])))}'>"
+                    f"{escape(self.words[i])}</span>"
+                )
+            body.append("    </span>")
+        if par_open:
+            body.append("   </p>")
+        body.append("  </div>")
+
+        return (
+            "<?xml version='1.0' encoding='UTF-8'?>\n"
+            "<!DOCTYPE html PUBLIC '-//W3C//DTD XHTML 1.0 Transitional//EN' "
+            "'http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd'>\n"
+            "<html xmlns='http://www.w3.org/1999/xhtml' xml:lang='en' lang='en'>\n"
+            " <head>\n"
+            "  <title></title>\n"
+            "  <meta http-equiv='Content-Type' content='text/html;charset=utf-8'/>\n"
+            "  <meta name='ocr-system' content='tesseract'/>\n"
+            "  <meta name='ocr-capabilities' content='ocr_page ocr_par ocr_line ocrx_word'/>\n"
+            " </head>\n"
+            " <body>\n" + "\n".join(body) + "\n </body>\n</html>\n"
+        )
+
+    def to_pdf(self, image=None, dpi=300):
+        """
+        Render a searchable PDF: the image as the visible page and every word
+        as invisible text placed over its bounding box.
+        """
+        image = image if image is not None else self.image
+        if image is None:
+            raise ValueError("No image to render the PDF page from")
+        width, height = self.image_size
+        page_width = width * 72 / dpi
+        page_height = height * 72 / dpi
+        scale = 72 / dpi
+
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        jpeg = io.BytesIO()
+        image.save(jpeg, format="JPEG", quality=85)
+        color_space = "/DeviceGray" if image.mode == "L" else "/DeviceRGB"
+
+        c = self.columns
+        content = [f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q", "BT 3 Tr"]
+        for i in range(len(self)):
+            word = _pdf_string(self.words[i])
+            font_size = max(c["height"][i] * scale, 1.0)
+            # Helvetica glyphs average about half an em wide
+            natural_width = max(len(self.words[i]) * font_size * 0.5, 0.1)
+            stretch = 100 * c["width"][i] * scale / natural_width
+            x = c["left"][i] * scale
+            y = page_height - (c["top"][i] + c["height"][i]) * scale
+            content.append(f"/F1 {font_size:.2f} Tf {stretch:.1f} Tz "
+                           f"1 0 0 1 {x:.2f} {y:.2f} Tm ({word}) Tj")
+        content.append("ET")
+        stream = zlib.compress("\n".join(content).encode("latin-1"))
+
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+             f"/Resources << /XObject << /Im0 4 0 R >> /Font << /F1 5 0 R >> >> "
+             f"/Contents 6 0 R >>").encode(),
+            (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+             f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode "
+             f"/Length {jpeg.getbuffer().nbytes} >>\nstream\n").encode()
+            + jpeg.getvalue() + b"\nendstream",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode()
+            + stream + b"\nendstream",
+        ]
+
+        pdf = io.BytesIO()
+        pdf.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(pdf.tell())
+            pdf.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+        xref = pdf.tell()
+        pdf.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            pdf.write(f"{offset:010d} 00000 n \n".encode())
+        pdf.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+                  f"startxref\n{xref}\n%%EOF\n".encode())
+        return pdf.getvalue()
+
+
+def _pdf_string(text):
+    """Encode text as a PDF literal string body in WinAnsi encoding"""
+    raw = text.encode("cp1252", errors="replace").decode("latin-1")
+    return raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
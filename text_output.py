@@ -0,0 +1,108 @@
+"""
+Diff-aware updates of the extracted text box.
+
+Replacing a QTextEdit's whole text re-lays out every paragraph and jumps
+back to the top, which hurts with long documents and with a watched
+region that is re-read every second. TextOutput compares the new text
+with what is shown, paragraph by paragraph, and rewrites only the
+paragraphs that changed, in one undoable edit. Scrolling stays where the
+user left it, or at the end when they were following the end.
+"""
+
+import difflib
+
+
+def common_ends(old, new):
+    """Lengths of the common prefix and (non-overlapping) common suffix of two lists"""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+class TextOutput:
+    """Keeps a QTextEdit showing a text while touching as few paragraphs as possible"""
+
+    def __init__(self, text_edit):
+        self.text_edit = text_edit
+
+    def set_text(self, text):
+        """Show text, rewriting only the paragraphs that differ from what is shown"""
+        old = self.text_edit.toPlainText().split("\n")
+        new = text.split("\n")
+        if old == new:
+            return
+        prefix, suffix = common_ends(old, new)
+        # Only the differing middle goes through the (quadratic) matcher
+        matcher = difflib.SequenceMatcher(None, old[prefix:len(old) - suffix],
+                                          new[prefix:len(new) - suffix], autojunk=False)
+        changes = [(i1 + prefix, i2 + prefix, new[j1 + prefix:j2 + prefix])
+                   for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+        with self.keep_scroll():
+            cursor = self.text_edit.textCursor()
+            cursor.beginEditBlock()
+            # From the end, so earlier paragraph numbers stay valid
+            for first, last, lines in reversed(changes):
+                self.replace_paragraphs(cursor, first, last, lines)
+            cursor.endEditBlock()
+
+    def append(self, text):
+        """Add text at the end without touching what is shown"""
+        with self.keep_scroll():
+            cursor = self.text_edit.textCursor()
+            cursor.movePosition(cursor.End)
+            cursor.insertText(text)
+
+    def clear(self):
+        self.text_edit.clear()
+
+    def replace_paragraphs(self, cursor, first, last, lines):
+        """Replace paragraphs first..last-1 (none for an insertion) with lines"""
+        document = self.text_edit.document()
+        count = document.blockCount()
+        if first < last:
+            start = document.findBlockByNumber(first).position()
+            end_block = document.findBlockByNumber(last - 1)
+            end = end_block.position() + end_block.length() - 1
+            text = "\n".join(lines)
+            if not lines:
+                # Also remove a paragraph separator
+                if last < count:
+                    end += 1
+                elif first > 0:
+                    start -= 1
+        elif first < count:
+            start = end = document.findBlockByNumber(first).position()
+            text = "\n".join(lines) + "\n"
+        else:
+            last_block = document.lastBlock()
+            start = end = last_block.position() + last_block.length() - 1
+            text = "\n" + "\n".join(lines)
+        cursor.setPosition(start)
+        cursor.setPosition(end, cursor.KeepAnchor)
+        cursor.insertText(text)
+
+    def keep_scroll(self):
+        return _ScrollKeeper(self.text_edit.verticalScrollBar())
+
+
+class _ScrollKeeper:
+    """Restores a scroll bar after an edit, following the end if it was there"""
+
+    def __init__(self, scroll_bar):
+        self.scroll_bar = scroll_bar
+        self.value = 0
+        self.at_end = False
+
+    def __enter__(self):
+        self.value = self.scroll_bar.value()
+        self.at_end = self.value >= self.scroll_bar.maximum() > 0
+        return self
+
+    def __exit__(self, *exc_info):
+        self.scroll_bar.setValue(self.scroll_bar.maximum() if self.at_end else self.value)
+        return False
@@ -0,0 +1,91 @@
+"""
+Tile-parallel OCR for very large images.
+
+The image is cut into full-width horizontal bands. Cuts are only made in
+the middle of rows that contain no ink, so no text line is ever split.
+The bands are OCRed concurrently and their text is joined top to bottom,
+which is the reading order for the single-block layout Tesseract is run
+with (--psm 6).
+This module must stay free of PyQt5 imports.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import ocr_core
+from preprocessing import ink_mask
+
+# Images with more pixels than this are tiled when tiling is enabled
+TILE_MIN_PIXELS = 4_000_000
+# Bands shorter than this are not worth a separate tesseract run
+MIN_BAND_HEIGHT = 200
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Separate from the job engine's pool, so jobs waiting on their bands
+    # can never starve the bands of workers
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                           thread_name_prefix="ocr-tile")
+        return _executor
+
+
+def should_tile(image, min_pixels=TILE_MIN_PIXELS):
+    width, height = image.size
+    return width * height > min_pixels
+
+
+def find_cut_rows(gray):
+    """Rows in the middle of each run of ink-free rows; safe places to cut"""
+    blank = ~ink_mask(gray).any(axis=1)
+    edges = np.diff(np.concatenate(([0], blank.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return (starts + ends) // 2
+
+
+def find_bands(gray, bands=None, min_band_height=MIN_BAND_HEIGHT):
+    """
+    Split a grayscale array into about `bands` (top, bottom) row ranges of
+    similar height, cutting only at blank rows.
+    """
+    height = gray.shape[0]
+    bands = bands or os.cpu_count() or 2
+    target = max(height / bands, min_band_height)
+    cuts = find_cut_rows(gray)
+
+    ranges = []
+    top = 0
+    for cut in cuts:
+        if cut - top >= target and height - cut >= min_band_height:
+            ranges.append((top, int(cut)))
+            top = int(cut)
+    ranges.append((top, height))
+    return ranges
+
+
+def recognize_tiled(image, config=ocr_core.TESSERACT_CONFIG, lang=None, engine=None, cache=None,
+                    bands=None):
+    """OCR a preprocessed PIL image band by band in parallel and stitch the text"""
+    gray = np.asarray(image.convert('L'))
+    ranges = find_bands(gray, bands=bands)
+    if len(ranges) == 1:
+        return ocr_core.recognize(image, config=config, lang=lang, engine=engine, cache=cache)
+
+    width = image.size[0]
+    futures = [
+        _get_executor().submit(ocr_core.recognize, image.crop((0, top, width, bottom)),
+                               config=config, lang=lang, engine=engine, cache=cache)
+        for top, bottom in ranges
+    ]
+    # Results are collected in submission order, which is reading order
+    texts = [future.result().strip("\n\f") for future in futures]
+    return "\n".join(text for text in texts if text) + "\n"